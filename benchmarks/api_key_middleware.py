@@ -0,0 +1,116 @@
+"""
+Requests/sec of a minimal route: no auth vs. the previous
+`@app.middleware("http")` check vs. ApiKeyMiddleware.
+
+Calls the ASGI app directly, without a server or network, so the numbers
+show the per-request cost of the middleware itself.
+
+    PYTHONPATH=src python benchmarks/api_key_middleware.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import secrets
+from time import perf_counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from rest_api_test.infrastructure.fastapi.middlewares.api_key import (
+    ApiKeyMiddleware,
+    ApiKeyRing,
+    hash_api_key,
+)
+
+HEADER = "x-api-key"
+KEY = "benchmark-key"
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, bool]:
+        return {"ok": True}
+
+    return app
+
+
+def with_http_middleware() -> FastAPI:
+    app = make_app()
+
+    @app.middleware("http")
+    async def _(request: Request, call_next):
+        supplied_key = request.headers.get(HEADER)
+        if not supplied_key or not secrets.compare_digest(supplied_key, KEY):
+            return JSONResponse({"detail": "Invalid or missing API key"}, 401)
+        return await call_next(request)
+
+    return app
+
+
+def with_asgi_middleware(keys: int) -> FastAPI:
+    app = make_app()
+    # The benchmark key plus other valid keys, the lookup doesn't depend on it
+    ring = {hash_api_key(f"other-{i}"): f"key-{i}" for i in range(keys - 1)}
+    ring[hash_api_key(KEY)] = "benchmark"
+    app.add_middleware(ApiKeyMiddleware, header_name=HEADER, key_ring=ApiKeyRing(ring))
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(HEADER.encode(), KEY.encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    for _ in range(min(requests, 100)):
+        await app({**scope}, receive, send)
+    statuses.clear()
+    started = perf_counter()
+    for _ in range(requests):
+        await app({**scope}, receive, send)
+    elapsed = perf_counter() - started
+    assert set(statuses) == {200}, set(statuses)
+    return requests / elapsed
+
+
+async def main(requests: int, keys: int) -> None:
+    variants = (
+        ("no auth", make_app()),
+        ('@app.middleware("http")', with_http_middleware()),
+        (f"ApiKeyMiddleware, {keys} keys", with_asgi_middleware(keys)),
+    )
+    baseline = None
+    for name, app in variants:
+        # Best of 3 runs, the slower ones are mostly noise of the machine
+        rps = max([await run(app, requests) for _ in range(3)])
+        baseline = baseline or rps
+        overhead_us = (1 / rps - 1 / baseline) * 1e6
+        print(f"{name:<32} {rps:9.0f} req/s  {overhead_us:+7.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=1_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.keys))
@@ -0,0 +1,94 @@
+"""
+Cached value encodings: encode/decode CPU vs. bytes stored per page.
+
+Builds pages of organizations like `serialization.py` and compares the JSON
+body the response cache stores today with msgpack, each raw and compressed
+by every codec available in this environment (zstd/lz4 need the
+`cache-compression` extra). Encode of the msgpack rows includes dumping the
+page to Python objects, decode includes the JSON rendering a cache hit would
+need to answer with it.
+
+    PYTHONPATH=src python benchmarks/cache_codec.py --page 100 --rounds 200
+"""
+
+import argparse
+from collections.abc import Callable
+from statistics import mean
+from time import perf_counter
+
+from pydantic import TypeAdapter
+from serialization import make_page  # type: ignore[reportMissingImports]
+
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+from rest_api_test.infrastructure.redis.codec import CacheCodec, available_compressions
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _timed(run: Callable[[], object], rounds: int) -> tuple[float, object]:
+    run()
+    timings = []
+    for _ in range(rounds):
+        started = perf_counter()
+        result = run()
+        timings.append(perf_counter() - started)
+    return mean(timings), result
+
+
+def main(
+    page_size: int,
+    rounds: int,
+    depth: int,
+    fanout: int,
+    min_size: int,
+    level: int | None,
+) -> None:
+    page = make_page(page_size, depth, fanout)
+    serializer = JsonSerializer(Organization)
+    adapter = TypeAdapter(list[Organization])
+    as_json = TypeAdapter(list)
+
+    formats: dict[str, tuple[Callable[[], bytes], Callable[[bytes], bytes]]] = {
+        "json": (lambda: serializer.many(page).body, lambda body: body)
+    }
+    if msgpack is not None:
+        formats["msgpack"] = (
+            lambda: msgpack.packb(adapter.dump_python(page, mode="json")),
+            lambda packed: as_json.dump_json(msgpack.unpackb(packed)),
+        )
+
+    print(f"page of {page_size} organizations, activity trees {fanout}^{depth + 1}")
+    print(
+        f"{'format':<16} {'bytes':>9} {'ratio':>6} {'encode ms':>10} {'decode ms':>10}"
+    )
+    json_size = len(serializer.many(page).body)
+    for fmt, (dump, render) in formats.items():
+        for compression in available_compressions():
+            codec = CacheCodec(compression, min_size=min_size, level=level)
+            encode_s, stored = _timed(lambda c=codec, d=dump: c.encode(d()), rounds)
+            decode_s, _ = _timed(
+                lambda c=codec, r=render, s=stored: r(c.decode(s)), rounds
+            )
+            print(
+                f"{fmt + '+' + compression:<16} {len(stored):9} "
+                f"{len(stored) / json_size:6.2f} "
+                f"{encode_s * 1000:10.3f} {decode_s * 1000:10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2, help="ACTIVITIES_DEPTH")
+    parser.add_argument("--fanout", type=int, default=2)
+    parser.add_argument(
+        "--min-size", type=int, default=1024, help="CACHE_COMPRESSION_MIN_BYTES"
+    )
+    parser.add_argument("--level", type=int, help="CACHE_COMPRESSION_LEVEL")
+    args = parser.parse_args()
+    main(args.page, args.rounds, args.depth, args.fanout, args.min_size, args.level)
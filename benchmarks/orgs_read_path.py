@@ -0,0 +1,96 @@
+"""
+Organizations read path: ORM + pydantic vs. JSON built by Postgres.
+
+Runs both paths of `GET /organizations` / `GET /organizations/{id}` against the
+database from `.env` (seed it with `POST /api/v1/filler/fill` first) and reports
+latency, statements per request and response size.
+
+    PYTHONPATH=src python benchmarks/orgs_read_path.py --limit 50 --rounds 200
+"""
+
+import argparse
+import asyncio
+import json
+from statistics import mean, quantiles
+from time import perf_counter
+
+from sqlalchemy import event
+
+from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.organizations.dto import OrganizationsQuery
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.infrastructure.di.container import Container
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+from rest_api_test.infrastructure.sqlalchemy.setup.engine import async_engine
+
+statements = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_statement(*_) -> None:
+    global statements
+    statements += 1
+
+
+async def measure(name: str, rounds: int, run) -> None:
+    global statements
+    await run()  # warm up connections and statement caches
+    timings = []
+    statements = 0
+    size = 0
+    for _ in range(rounds):
+        started = perf_counter()
+        body = await run()
+        timings.append(perf_counter() - started)
+        size = len(body)
+    cuts = quantiles(timings, n=20)
+    p50, p95 = cuts[9] * 1000, cuts[18] * 1000
+    print(
+        f"{name:<14} mean {mean(timings) * 1000:7.2f} ms  p50 {p50:7.2f} ms  "
+        f"p95 {p95:7.2f} ms  {statements / rounds:4.1f} queries  {size} bytes"
+    )
+
+
+async def main(limit: int, rounds: int) -> None:
+    service = Container().orgs_service()
+    pagination = Pagination(limit=limit)
+    query = OrganizationsQuery()
+    serializer = JsonSerializer(Organization)
+
+    async def orm_page() -> bytes:
+        orgs = await service.get_all(pagination, query)
+        return serializer.many(orgs).body
+
+    async def json_page() -> bytes:
+        page = await service.get_all_json(pagination, query)
+        return page.items
+
+    orm_docs = json.loads(await orm_page())
+    json_docs = json.loads(await json_page())
+    assert [o["id"] for o in orm_docs] == [o["id"] for o in json_docs]
+    if not orm_docs:
+        print("No organizations, seed the database first")
+        return
+    org_id = orm_docs[0]["id"]
+
+    async def orm_detail() -> bytes:
+        org = await service.get_by_id(org_id)
+        return serializer.one(org).body
+
+    async def json_detail() -> bytes:
+        return await service.get_by_id_json(org_id)
+
+    print(f"page of {len(orm_docs)} organizations, {rounds} rounds")
+    await measure("list / orm", rounds, orm_page)
+    await measure("list / json", rounds, json_page)
+    await measure("detail / orm", rounds, orm_detail)
+    await measure("detail / json", rounds, json_detail)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.rounds))
@@ -0,0 +1,104 @@
+"""
+Latency of a rate limit check: LocalRateLimiter vs. RedisRateLimiter.
+
+Checks are paced to --rps in total and spread over --keys API keys (each key
+is busy, its lease is refilled in the background before it runs out) and
+then over --sparse-keys keys (each key is seen less often than once per
+lease TTL, so its lease has always expired, like for most low-rate
+integrations). Limits are high enough that nothing is rejected. The Redis
+limiter is only measured with --redis.
+
+    PYTHONPATH=src python benchmarks/rate_limit.py --redis redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from redis.asyncio import Redis
+
+from rest_api_test.application.interfaces.common.rate_limiter import (
+    RateLimit,
+    RateLimiter,
+)
+from rest_api_test.infrastructure.memory.rate_limiter import LocalRateLimiter
+from rest_api_test.infrastructure.redis.rate_limiter import RedisRateLimiter
+
+# Checks per pacing step: the loop sleeps after each batch to keep --rps
+_BATCH = 50
+
+
+async def run(
+    limiter: RateLimiter, checks: int, keys: int, rps: int
+) -> tuple[list[float], int]:
+    """Sorted latencies in seconds and the number of rejected checks."""
+    limit = RateLimit(rate_per_s=rps, burst=rps)
+    latencies: list[float] = []
+    rejected = 0
+    started = perf_counter()
+    for i in range(checks):
+        key = f"key-{i % keys}:route"
+        check_started = perf_counter()
+        decision = await limiter.acquire(key, limit)
+        latencies.append(perf_counter() - check_started)
+        rejected += not decision.allowed
+        if i % _BATCH == _BATCH - 1:
+            await asyncio.sleep(max(0.0, started + (i + 1) / rps - perf_counter()))
+    latencies.sort()
+    return latencies, rejected
+
+
+def report(name: str, latencies: list[float], rejected: int) -> None:
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1e6
+
+    print(
+        f"{name:<36} p50 {percentile(0.5):7.1f} us  p99 {percentile(0.99):7.1f} us"
+        f"  max {latencies[-1] * 1e6:8.1f} us  rejected {rejected}"
+    )
+
+
+async def main(
+    checks: int, keys: int, sparse_keys: int, rps: int, lease_size: int, dsn: str | None
+) -> None:
+    scenarios = ((f"{keys} keys", keys), (f"{sparse_keys} keys", sparse_keys))
+    for scenario, key_count in scenarios:
+        latencies, rejected = await run(LocalRateLimiter(), checks, key_count, rps)
+        report(f"LocalRateLimiter, {scenario}", latencies, rejected)
+    if dsn is None:
+        return
+
+    redis = Redis.from_url(dsn)
+    prefix = "rate-limit-benchmark"
+    try:
+        for scenario, key_count in scenarios:
+            limiter = RedisRateLimiter(
+                redis, LocalRateLimiter(), lease_size=lease_size, prefix=prefix
+            )
+            latencies, rejected = await run(limiter, checks, key_count, rps)
+            report(f"RedisRateLimiter, {scenario}", latencies, rejected)
+    finally:
+        async for key in redis.scan_iter(f"{prefix}:*"):
+            await redis.delete(key)
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=int, default=50_000)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--sparse-keys", type=int, default=20_000)
+    parser.add_argument("--rps", type=int, default=5_000, help="checks/s in total")
+    parser.add_argument("--lease-size", type=int, default=5)
+    parser.add_argument("--redis", help="Redis DSN, only the local limiter without")
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.checks,
+            args.keys,
+            args.sparse_keys,
+            args.rps,
+            args.lease_size,
+            args.redis,
+        )
+    )
@@ -0,0 +1,95 @@
+"""
+Per-page encode time of organizations: previous pipeline vs. JsonSerializer.
+
+Before: domain -> OrganizationOut.model_validate in the service, then FastAPI
+validates against response_model and renders with the stdlib encoder.
+After: domain dataclasses are dumped to bytes by a precompiled TypeAdapter.
+
+    PYTHONPATH=src python benchmarks/serialization.py --page 100 --rounds 200
+"""
+
+import argparse
+import asyncio
+from itertools import count
+from statistics import mean
+from time import perf_counter
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from rest_api_test.application.organizations.dto import OrganizationOut
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+
+_ids = count(1)
+
+
+def _uuid() -> UUID:
+    return UUID(int=next(_ids))
+
+
+def _activity(parent_id: UUID | None, depth: int, fanout: int) -> Activity:
+    act_id = _uuid()
+    children = None
+    if depth:
+        children = [_activity(act_id, depth - 1, fanout) for _ in range(fanout)]
+    return Activity(
+        id=act_id, name=f"Activity {act_id.int}", parent_id=parent_id, children=children
+    )
+
+
+def make_page(size: int, depth: int, fanout: int) -> list[Organization]:
+    return [
+        Organization(
+            id=_uuid(),
+            name=f"Organization {i}",
+            phone_numbers=[
+                PhoneNumber(id=_uuid(), phone_number=f"8-800-555-35-{i % 100:02}")
+                for _ in range(2)
+            ],
+            activities=[_activity(None, depth, fanout) for _ in range(fanout)],
+            building_id=_uuid(),
+        )
+        for i in range(size)
+    ]
+
+
+async def main(page_size: int, rounds: int, depth: int, fanout: int) -> None:
+    page = make_page(page_size, depth, fanout)
+    field = create_model_field("Response", list[OrganizationOut], mode="serialization")
+    serializer = JsonSerializer(Organization)
+
+    async def before() -> bytes:
+        dtos = [OrganizationOut.model_validate(o, from_attributes=True) for o in page]
+        content = await serialize_response(field=field, response_content=dtos)
+        return JSONResponse(content).body
+
+    async def after() -> bytes:
+        return serializer.many(page).body
+
+    print(f"page of {page_size} organizations, activity trees {fanout}^{depth + 1}")
+    for name, run in (("before", before), ("after", after)):
+        await run()
+        timings = []
+        for _ in range(rounds):
+            started = perf_counter()
+            body = await run()
+            timings.append(perf_counter() - started)
+        print(
+            f"{name:<7} mean {mean(timings) * 1000:7.3f} ms  "
+            f"min {min(timings) * 1000:7.3f} ms  {len(body)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2, help="ACTIVITIES_DEPTH")
+    parser.add_argument("--fanout", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.page, args.rounds, args.depth, args.fanout))
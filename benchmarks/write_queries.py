@@ -0,0 +1,98 @@
+"""
+Statements per write of organizations and activities.
+
+Creates a throwaway building, phone number, activities and an organization in
+the database from `.env`, runs every write endpoint's service call once,
+prints how many statements it sent (BEGIN/COMMIT not included) and removes
+what it created.
+
+    PYTHONPATH=src python benchmarks/write_queries.py
+"""
+
+import asyncio
+from contextlib import suppress
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from rest_api_test.application.activities.dto import ActivityIn, ActivityUpdate
+from rest_api_test.application.buildings.dto import BuildingIn
+from rest_api_test.application.exceptions.app_error import NotFound
+from rest_api_test.application.organizations.dto import (
+    OrganizationIn,
+    OrganizationUpdate,
+)
+from rest_api_test.application.phone_numbers.dto import PhoneNumberIn
+from rest_api_test.infrastructure.di.container import Container
+from rest_api_test.infrastructure.sqlalchemy.setup.engine import async_engine
+
+statements = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_statement(*_) -> None:
+    global statements
+    statements += 1
+
+
+async def measure(name: str, call):
+    global statements
+    statements = 0
+    try:
+        return await call
+    finally:
+        print(f"{name:<28} {statements:3} queries")
+
+
+async def main() -> None:
+    container = Container()
+    orgs = container.orgs_service()
+    activities = container.activities_service()
+    buildings = container.buildings_service()
+    phones = container.phone_numbers_service()
+
+    building = await buildings.create(
+        BuildingIn(address="Benchmark st. 1", latitude=Decimal(0), longitude=Decimal(0))
+    )
+    phone = await phones.create(PhoneNumberIn(phone_number="8-800-000-00-00"))
+    root = await measure(
+        "activity create (root)",
+        activities.create(ActivityIn(name="Benchmark", parent_id=None)),
+    )
+    child = await measure(
+        "activity create (child)",
+        activities.create(ActivityIn(name="Benchmark child", parent_id=root.id)),
+    )
+    await measure(
+        "activity update (reparent)",
+        activities.update(child.id, ActivityUpdate(name="Moved", parent_id=None)),
+    )
+
+    org = await measure(
+        "organization create",
+        orgs.create(OrganizationIn(name="Benchmark", building_id=building.id)),
+    )
+    await measure(
+        "organization update",
+        orgs.update(
+            org.id, OrganizationUpdate(name="Renamed", building_id=building.id)
+        ),
+    )
+    await measure("assign activity", orgs.assign_activity(org.id, root.id))
+    await measure("unassign activity", orgs.unassign_activity(org.id, root.id))
+    await measure("assign phone number", orgs.assign_phone_number(org.id, phone.id))
+    await measure("unassign phone number", orgs.unassign_phone_number(org.id, phone.id))
+    with suppress(NotFound):
+        await measure("assign to missing org", orgs.assign_activity(uuid4(), root.id))
+    await measure("organization delete", orgs.delete(org.id))
+    await measure("activity delete", activities.delete(child.id))
+
+    await activities.delete(root.id)
+    await phones.delete(phone.id)
+    await buildings.delete(building.id)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Iterable
+from typing import NamedTuple
+from uuid import UUID
+
+from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.domain.activities.model import Activity
+
+
+class ActivityNode(NamedTuple):
+    id: UUID
+    name: str
+    parent_id: UUID | None
+
+
+class ActivityForest(ABC):
+    """
+    In-process snapshot of all activity trees answering activity reads
+    without the database. `version` identifies the content of the snapshot:
+    it is the same in every worker holding the same activities and changes
+    only when they change, so anything built from it can be cached under that
+    version, in shared caches too.
+    """
+
+    @property
+    @abstractmethod
+    def ready(self) -> bool:
+        """False until the first rebuild, readers fall back to the database."""
+
+    @property
+    @abstractmethod
+    def version(self) -> str: ...
+
+    @abstractmethod
+    async def rebuild(
+        self, load: Callable[[], Awaitable[Iterable[ActivityNode]]]
+    ) -> None:
+        """
+        Replaces the content with the nodes returned by `load`; upserts and
+        removals made while it is loading are applied on top.
+        """
+
+    @abstractmethod
+    def upsert(self, node: ActivityNode) -> None: ...
+
+    @abstractmethod
+    def remove(self, act_id: UUID) -> None:
+        """Drops the node, its children become roots like in the database."""
+
+    @abstractmethod
+    def get(self, act_id: UUID, depth: int) -> Activity | None:
+        """None if the activity isn't in the snapshot (yet)."""
+
+    @abstractmethod
+    def get_page(self, pagination: Pagination, depth: int) -> list[Activity]:
+        """Same page and order (by id) as the repository's `get_all`."""
+
+    @abstractmethod
+    def descendant_ids(self, act_id: UUID, depth: int | None = None) -> list[UUID]:
+        """
+        act_id and its descendants down to `depth` levels below it, None - all;
+        empty if act_id isn't in the snapshot (yet).
+        """
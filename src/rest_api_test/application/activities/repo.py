@@ -1,21 +1,38 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
 from rest_api_test.application.activities.dto import ActivityIn, ActivityUpdate
+from rest_api_test.application.activities.forest import ActivityNode
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.domain.activities.model import Activity
 
 
 class ActivityRepository(ABC):
     @abstractmethod
-    async def get_all(self, pagination: Pagination) -> list[Activity]: ...
+    async def get_all(
+        self, pagination: Pagination, depth: int | None = None
+    ) -> list[Activity]:
+        """`depth` - levels of children, defaults to settings.activities_depth."""
 
     @abstractmethod
-    async def get_by_id(self, act_id: UUID) -> Activity | None: ...
+    async def get_by_id(
+        self, act_id: UUID, depth: int | None = None
+    ) -> Activity | None: ...
+
+    @abstractmethod
+    async def get_nodes(self) -> list[ActivityNode]:
+        """All activities as flat rows, for the activity forest."""
 
     @abstractmethod
     async def create(self, data: ActivityIn) -> Activity: ...
 
+    @abstractmethod
+    async def create_many(self, data: Sequence[ActivityIn]) -> list[UUID]: ...
+
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]: ...
+
     @abstractmethod
     async def update(self, act_id: UUID, data: ActivityUpdate) -> Activity: ...
 
@@ -1,3 +1,4 @@
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
 from rest_api_test.application.activities.dto import (
@@ -5,46 +6,143 @@ from rest_api_test.application.activities.dto import (
     ActivityOut,
     ActivityUpdate,
 )
+from rest_api_test.application.activities.forest import ActivityForest, ActivityNode
 from rest_api_test.application.activities.repo import ActivityRepository
+from rest_api_test.application.bulk.chunks import create_in_chunks
+from rest_api_test.application.bulk.dto import BulkItemStatusEnum, BulkResult
+from rest_api_test.application.cache.invalidation import NO_CACHE_INVALIDATOR
+from rest_api_test.application.cache.tags import collection_tag, entity_tag, entity_tags
 from rest_api_test.application.exceptions.app_error import NotFound
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.application.interfaces.common.uow import UnitOfWork
 from rest_api_test.domain.activities.model import Activity
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 
 class ActivityService:
-    def __init__(self, uow: UnitOfWork, repo: ActivityRepository):
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        repo: ActivityRepository,
+        forest: ActivityForest | None = None,
+        cache_invalidator: CacheInvalidator = NO_CACHE_INVALIDATOR,
+    ):
         self.uow = uow
         self.repo = repo
+        self.forest = forest
+        self.cache_invalidator = cache_invalidator
 
-    async def get_all(self, pagination: Pagination) -> list[ActivityOut]:
+    async def get_all(self, pagination: Pagination) -> list[Activity]:
+        if self.forest and self.forest.ready:
+            return self.forest.get_page(pagination, settings.activities_depth)
         async with self.uow:
-            activities = await self.repo.get_all(pagination)
-        return [
-            ActivityOut.model_validate(activity, from_attributes=True)
-            for activity in activities
-        ]
+            return await self.repo.get_all(pagination)
 
-    async def get_by_id(self, activity_id: UUID) -> ActivityOut:
-        async with self.uow:
-            activity = await self.repo.get_by_id(activity_id)
+    async def get_by_id(self, activity_id: UUID) -> Activity:
+        activity = None
+        if self.forest and self.forest.ready:
+            activity = self.forest.get(activity_id, settings.activities_depth)
+        # Not in the forest: created by another worker, not applied yet
+        if activity is None:
+            async with self.uow:
+                activity = await self.repo.get_by_id(activity_id)
         if not activity:
             raise NotFound.domain_entity(Activity, activity_id)
-        return ActivityOut.model_validate(activity, from_attributes=True)
+        return activity
 
     async def create(self, payload: ActivityIn) -> ActivityOut:
         async with self.uow as uow:
             activity = await self.repo.create(payload)
             await uow.commit()
+        self._update_forest(activity)
+        # The parent's tree gains a child
+        await self.cache_invalidator.invalidate(
+            [collection_tag(Activity), *self._parent_tags([activity.parent_id])]
+        )
         return ActivityOut.model_validate(activity, from_attributes=True)
 
+    async def create_many(self, payloads: list[ActivityIn]) -> BulkResult:
+        result = await create_in_chunks(
+            self.uow,
+            payloads,
+            self.repo.create_many,
+            chunk_size=settings.bulk_chunk_size,
+            check=self._check_parents,
+        )
+        created = [
+            (item.id, payloads[item.index])
+            for item in result.items
+            if item.status == BulkItemStatusEnum.CREATED and item.id
+        ]
+        if self.forest:
+            for act_id, payload in created:
+                self.forest.upsert(
+                    ActivityNode(act_id, payload.name, payload.parent_id)
+                )
+        await self.cache_invalidator.invalidate(
+            [
+                collection_tag(Activity),
+                *self._parent_tags([payload.parent_id for _, payload in created]),
+            ]
+        )
+        return result
+
     async def update(self, activity_id: UUID, payload: ActivityUpdate) -> ActivityOut:
         async with self.uow as uow:
             activity = await self.repo.update(activity_id, payload)
             await uow.commit()
+        self._update_forest(activity)
+        # Trees under the old parent contain the activity, the new parent's don't
+        await self.cache_invalidator.invalidate(
+            [
+                entity_tag(Activity, activity_id),
+                collection_tag(Activity),
+                *self._parent_tags([activity.parent_id]),
+            ]
+        )
         return ActivityOut.model_validate(activity, from_attributes=True)
 
     async def delete(self, activity_id: UUID) -> None:
         async with self.uow as uow:
             await self.repo.delete_by_id(activity_id)
             await uow.commit()
+        if self.forest:
+            self.forest.remove(activity_id)
+        # Children are tagged with their parent and become roots
+        await self.cache_invalidator.invalidate(
+            [entity_tag(Activity, activity_id), collection_tag(Activity)]
+        )
+
+    async def rebuild_forest(self) -> None:
+        if not self.forest:
+            return
+        await self.forest.rebuild(self._load_nodes)
+
+    async def _load_nodes(self) -> list[ActivityNode]:
+        async with self.uow:
+            return await self.repo.get_nodes()
+
+    async def _check_parents(self, payloads: Sequence[ActivityIn]) -> list[str | None]:
+        parent_ids = {p.parent_id for p in payloads if p.parent_id is not None}
+        existing = await self.repo.existing_ids(parent_ids)
+        return [
+            str(NotFound.domain_entity(Activity, p.parent_id))
+            if p.parent_id is not None and p.parent_id not in existing
+            else None
+            for p in payloads
+        ]
+
+    @staticmethod
+    def _parent_tags(parent_ids: Iterable[UUID | None]) -> list[str]:
+        return entity_tags(Activity, {p for p in parent_ids if p is not None})
+
+    def _update_forest(self, activity: Activity) -> None:
+        if self.forest:
+            self.forest.upsert(
+                ActivityNode(activity.id, activity.name, activity.parent_id)
+            )
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
 from rest_api_test.application.buildings.dto import BuildingIn, BuildingUpdate
+from rest_api_test.application.buildings.spatial_index import BuildingPoint
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.domain.buildings.model import Building
 
@@ -13,9 +15,18 @@ class BuildingRepository(ABC):
     @abstractmethod
     async def get_by_id(self, bld_id: UUID) -> Building | None: ...
 
+    @abstractmethod
+    async def get_points(self) -> list[BuildingPoint]: ...
+
     @abstractmethod
     async def create(self, data: BuildingIn) -> Building: ...
 
+    @abstractmethod
+    async def create_many(self, data: Sequence[BuildingIn]) -> list[UUID]: ...
+
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]: ...
+
     @abstractmethod
     async def update(self, bld_id: UUID, data: BuildingUpdate) -> Building: ...
 
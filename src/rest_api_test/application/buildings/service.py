@@ -6,44 +6,116 @@ from rest_api_test.application.buildings.dto import (
     BuildingUpdate,
 )
 from rest_api_test.application.buildings.repo import BuildingRepository
+from rest_api_test.application.buildings.spatial_index import (
+    BuildingPoint,
+    BuildingSpatialIndex,
+)
+from rest_api_test.application.bulk.chunks import create_in_chunks
+from rest_api_test.application.bulk.dto import BulkItemStatusEnum, BulkResult
+from rest_api_test.application.cache.invalidation import NO_CACHE_INVALIDATOR
+from rest_api_test.application.cache.tags import collection_tag, entity_tag
 from rest_api_test.application.exceptions.app_error import NotFound
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.application.interfaces.common.uow import UnitOfWork
 from rest_api_test.domain.buildings.model import Building
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 
 class BuildingService:
-    def __init__(self, uow: UnitOfWork, repo: BuildingRepository):
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        repo: BuildingRepository,
+        spatial_index: BuildingSpatialIndex | None = None,
+        cache_invalidator: CacheInvalidator = NO_CACHE_INVALIDATOR,
+    ):
         self.uow = uow
         self.repo = repo
+        self.spatial_index = spatial_index
+        self.cache_invalidator = cache_invalidator
 
-    async def get_all(self, pagination: Pagination) -> list[BuildingOut]:
+    async def get_all(self, pagination: Pagination) -> list[Building]:
         async with self.uow:
-            buildings = await self.repo.get_all(pagination)
-        return [
-            BuildingOut.model_validate(bld, from_attributes=True) for bld in buildings
-        ]
+            return await self.repo.get_all(pagination)
 
-    async def get_by_id(self, building_id: UUID) -> BuildingOut:
+    async def get_by_id(self, building_id: UUID) -> Building:
         async with self.uow:
             building = await self.repo.get_by_id(building_id)
         if not building:
             raise NotFound.domain_entity(Building, building_id)
-        return BuildingOut.model_validate(building, from_attributes=True)
+        return building
 
     async def create(self, payload: BuildingIn) -> BuildingOut:
         async with self.uow as uow:
             building = await self.repo.create(payload)
             await uow.commit()
+        self._index_building(building)
+        await self.cache_invalidator.invalidate([collection_tag(Building)])
         return BuildingOut.model_validate(building, from_attributes=True)
 
+    async def create_many(self, payloads: list[BuildingIn]) -> BulkResult:
+        result = await create_in_chunks(
+            self.uow,
+            payloads,
+            self.repo.create_many,
+            chunk_size=settings.bulk_chunk_size,
+        )
+        if self.spatial_index:
+            for item in result.items:
+                if item.status == BulkItemStatusEnum.CREATED and item.id:
+                    payload = payloads[item.index]
+                    self.spatial_index.upsert(
+                        BuildingPoint(
+                            item.id, float(payload.latitude), float(payload.longitude)
+                        )
+                    )
+        await self.cache_invalidator.invalidate([collection_tag(Building)])
+        return result
+
     async def update(self, building_id: UUID, payload: BuildingUpdate) -> BuildingOut:
         async with self.uow as uow:
             building = await self.repo.update(building_id, payload)
             await uow.commit()
+        self._index_building(building)
+        await self.cache_invalidator.invalidate(
+            [entity_tag(Building, building_id), collection_tag(Building)]
+        )
         return BuildingOut.model_validate(building, from_attributes=True)
 
     async def delete(self, building_id: UUID) -> None:
         async with self.uow as uow:
             await self.repo.delete_by_id(building_id)
             await uow.commit()
+        if self.spatial_index:
+            self.spatial_index.remove(building_id)
+        # Organizations of the building are deleted with it
+        await self.cache_invalidator.invalidate(
+            [
+                entity_tag(Building, building_id),
+                collection_tag(Building),
+                collection_tag(Organization),
+            ]
+        )
+
+    async def rebuild_spatial_index(self) -> None:
+        if not self.spatial_index:
+            return
+        await self.spatial_index.rebuild(self._load_points)
+
+    async def _load_points(self) -> list[BuildingPoint]:
+        async with self.uow:
+            return await self.repo.get_points()
+
+    def _index_building(self, building: Building) -> None:
+        if self.spatial_index:
+            self.spatial_index.upsert(
+                BuildingPoint(
+                    building.id, float(building.latitude), float(building.longitude)
+                )
+            )
@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import NamedTuple
+from uuid import UUID
+
+from rest_api_test.application.organizations.dto import GeoBBox, GeoRadius
+
+
+class BuildingPoint(NamedTuple):
+    id: UUID
+    latitude: float
+    longitude: float
+
+
+@dataclass(frozen=True)
+class SpatialIndexStats:
+    size: int
+    nbytes: int
+    rebuild_seconds: float
+
+
+class BuildingSpatialIndex(ABC):
+    """
+    In-process index of building coordinates answering geo filters with ids.
+    `version` identifies its content like `ActivityForest.version`: the same
+    in every worker holding the same points.
+    """
+
+    @property
+    @abstractmethod
+    def version(self) -> str: ...
+
+    @abstractmethod
+    async def rebuild(
+        self, load: Callable[[], Awaitable[Iterable[BuildingPoint]]]
+    ) -> None:
+        """
+        Replaces the content with the points returned by `load`; upserts and
+        removals made while it is loading are applied on top.
+        """
+
+    @abstractmethod
+    def upsert(self, point: BuildingPoint) -> None: ...
+
+    @abstractmethod
+    def remove(self, bld_id: UUID) -> None: ...
+
+    @abstractmethod
+    def query(self, geo: GeoRadius | GeoBBox) -> list[UUID]: ...
+
+    @property
+    @abstractmethod
+    def stats(self) -> SpatialIndexStats: ...
@@ -0,0 +1,67 @@
+from collections.abc import Awaitable, Callable, Sequence
+from uuid import UUID
+
+from rest_api_test.application.bulk.dto import (
+    BulkItemResult,
+    BulkItemStatusEnum,
+    BulkResult,
+)
+from rest_api_test.application.exceptions.app_error import AppError
+from rest_api_test.application.interfaces.common.uow import UnitOfWork
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def create_in_chunks[P](
+    uow: UnitOfWork,
+    payloads: Sequence[P],
+    create: Callable[[Sequence[P]], Awaitable[list[UUID]]],
+    *,
+    chunk_size: int,
+    check: Callable[[Sequence[P]], Awaitable[list[str | None]]] | None = None,
+) -> BulkResult:
+    """
+    Creates payloads chunk by chunk, each chunk in its own transaction.
+    `check` validates a whole chunk at once (e.g. foreign keys with one query) and
+    returns an error per payload or None, rejected items are reported and
+    the rest of the chunk is still created.
+    A chunk failing with an AppError (repositories report constraint
+    violations, e.g. a duplicate or a foreign key deleted meanwhile, as such)
+    is rolled back and all of its accepted items are reported as failed,
+    chunks committed before it stay. Other errors fail the request.
+    """
+    items: list[BulkItemResult] = []
+    for start in range(0, len(payloads), chunk_size):
+        chunk = payloads[start : start + chunk_size]
+        async with uow:
+            errors = await check(chunk) if check else [None] * len(chunk)
+            accepted = [start + i for i, error in enumerate(errors) if error is None]
+            items.extend(
+                BulkItemResult(
+                    index=start + i, status=BulkItemStatusEnum.FAILED, error=error
+                )
+                for i, error in enumerate(errors)
+                if error is not None
+            )
+            try:
+                ids = await create([payloads[i] for i in accepted])
+                await uow.commit()
+            except AppError as e:
+                await uow.rollback()
+                logger.warning("Bulk chunk at %s rolled back: %s", start, e.message)
+                items.extend(
+                    BulkItemResult(
+                        index=i, status=BulkItemStatusEnum.FAILED, error=e.message
+                    )
+                    for i in accepted
+                )
+                continue
+        items.extend(
+            BulkItemResult(index=i, status=BulkItemStatusEnum.CREATED, id=new_id)
+            for i, new_id in zip(accepted, ids, strict=True)
+        )
+
+    items.sort(key=lambda item: item.index)
+    created = sum(item.status == BulkItemStatusEnum.CREATED for item in items)
+    return BulkResult(created=created, failed=len(items) - created, items=items)
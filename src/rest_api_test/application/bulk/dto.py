@@ -0,0 +1,23 @@
+from enum import StrEnum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class BulkItemStatusEnum(StrEnum):
+    CREATED = "created"
+    FAILED = "failed"
+
+
+class BulkItemResult(BaseModel):
+    # Position of the item in the request array
+    index: int
+    status: BulkItemStatusEnum
+    id: UUID | None = None
+    error: str | None = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    items: list[BulkItemResult]
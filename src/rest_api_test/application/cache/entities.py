@@ -0,0 +1,125 @@
+"""
+Domain objects by id in the key-value cache, used by the cached repositories.
+Buildings, phone numbers and organizations are evicted by id. Activity trees
+depend on every node below them, so they live under a generation that any
+activity write replaces instead.
+Reads store what they loaded only if the entity epoch (or, for activity
+trees, the generation) is still the one read before the database: eviction
+after commit changes the epoch first, so a row read before the commit can't
+be cached after the eviction.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+
+from rest_api_test.application.cache.tags import entity_tag
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
+from rest_api_test.application.interfaces.common.key_value_cache import KeyValueCache
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.buildings.model import Building
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
+
+_PREFIX = "entity"
+ACTIVITY_GENERATION_KEY = f"{_PREFIX}:Activity:generation"
+ENTITY_EPOCH_KEY = f"{_PREFIX}:epoch"
+# The generation and the epoch outlive any entry stored under them
+_GENERATION_TTL_S = 7 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class OrganizationRecord:
+    """An organization with ids of what it links, composed back from the cache."""
+
+    id: UUID
+    name: str
+    building_id: UUID
+    phone_number_ids: list[UUID]
+    activity_ids: list[UUID]
+
+    @classmethod
+    def from_domain(cls, org: Organization) -> "OrganizationRecord":
+        return cls(
+            id=org.id,
+            name=org.name,
+            building_id=org.building_id,
+            phone_number_ids=[p.id for p in org.phone_numbers],
+            activity_ids=[a.id for a in org.activities],
+        )
+
+
+buildings_codec = TypeAdapter(Building)
+phone_numbers_codec = TypeAdapter(PhoneNumber)
+activities_codec = TypeAdapter(Activity)
+organizations_codec = TypeAdapter(OrganizationRecord)
+
+
+def entity_key(entity: type, id: UUID) -> str:
+    return f"{_PREFIX}:{entity_tag(entity, id)}"
+
+
+def activity_key(generation: str, act_id: UUID) -> str:
+    return f"{_PREFIX}:Activity:{generation}:{act_id}"
+
+
+async def activity_generation(cache: KeyValueCache, current: bytes | None) -> str:
+    """
+    `current` as read from ACTIVITY_GENERATION_KEY. A missing generation is
+    replaced by a new random one, never reused, so evicted trees can't come back.
+    Concurrent readers agree on the first one installed.
+    """
+    if current is not None:
+        return current.decode()
+    generation = uuid4().hex
+    if await cache.add(ACTIVITY_GENERATION_KEY, generation, _GENERATION_TTL_S):
+        return generation
+    current = await cache.get(ACTIVITY_GENERATION_KEY)
+    # Already dropped again: trees stored under ours are never read, and not
+    # stored at all since the guard fails
+    return current.decode() if current is not None else generation
+
+
+async def drop_activity_trees(cache: KeyValueCache) -> None:
+    await cache.delete(ACTIVITY_GENERATION_KEY)
+
+
+async def evict_entities(cache: KeyValueCache, keys: Sequence[str]) -> None:
+    """
+    Changes the epoch before deleting `keys`: a read that loaded a row before
+    that fails its guarded store, one storing before it is deleted after.
+    """
+    await cache.set(ENTITY_EPOCH_KEY, uuid4().hex, _GENERATION_TTL_S)
+    await cache.delete_many(keys)
+
+
+class EntityCacheInvalidator(CacheInvalidator):
+    """
+    Applies the tags services invalidate after commit to the entity cache.
+    Cached repositories also evict on write, before the commit; this eviction
+    changes the epoch too (see `evict_entities`), so a concurrent read that
+    loaded the row before the commit doesn't cache it after.
+    """
+
+    _BY_ID = {e.__name__: e for e in (Building, Organization, PhoneNumber)}
+
+    def __init__(self, cache: KeyValueCache):
+        self._cache = cache
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        keys: list[str] = []
+        activities_changed = False
+        for tag in tags:
+            name, _, id = tag.partition(":")
+            if name == Activity.__name__:
+                activities_changed = True
+            elif name in self._BY_ID and id != "*":
+                keys.append(entity_key(self._BY_ID[name], UUID(id)))
+        if keys:
+            await evict_entities(self._cache, keys)
+        if activities_changed:
+            await drop_activity_trees(self._cache)
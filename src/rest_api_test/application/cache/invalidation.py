@@ -0,0 +1,27 @@
+from collections.abc import Iterable, Sequence
+
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
+
+
+class CompositeCacheInvalidator(CacheInvalidator):
+    """Passes the tags of a write to every cache holding derived data."""
+
+    def __init__(self, invalidators: Sequence[CacheInvalidator]):
+        self._invalidators = invalidators
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        for invalidator in self._invalidators:
+            await invalidator.invalidate(tags)
+
+
+class NoCacheInvalidator(CacheInvalidator):
+    """Default of services built without a cache: nothing to evict."""
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        return None
+
+
+NO_CACHE_INVALIDATOR = NoCacheInvalidator()
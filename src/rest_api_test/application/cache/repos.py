@@ -0,0 +1,460 @@
+"""
+Read-through caching decorators of the repositories: `get_by_id` is served
+from the key-value cache, everything else goes to the wrapped repository and
+writes evict what they change. Entries are only stored by reads, so nothing
+uncommitted is cached by a write path, and only if no eviction ran since the
+read started (guarded by the entity epoch, see `entities`).
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import replace
+from uuid import UUID
+
+from rest_api_test.application.activities.dto import ActivityIn, ActivityUpdate
+from rest_api_test.application.activities.forest import ActivityNode
+from rest_api_test.application.activities.repo import ActivityRepository
+from rest_api_test.application.buildings.dto import BuildingIn, BuildingUpdate
+from rest_api_test.application.buildings.repo import BuildingRepository
+from rest_api_test.application.buildings.spatial_index import BuildingPoint
+from rest_api_test.application.cache.entities import (
+    ACTIVITY_GENERATION_KEY,
+    ENTITY_EPOCH_KEY,
+    OrganizationRecord,
+    activities_codec,
+    activity_generation,
+    activity_key,
+    buildings_codec,
+    drop_activity_trees,
+    entity_key,
+    organizations_codec,
+    phone_numbers_codec,
+)
+from rest_api_test.application.interfaces.common.key_value_cache import (
+    CacheItem,
+    KeyValueCache,
+)
+from rest_api_test.application.interfaces.common.pagination import (
+    Pagination,
+    RawJsonPage,
+)
+from rest_api_test.application.organizations.dto import (
+    GeoFilter,
+    OrganizationIn,
+    OrganizationUpdate,
+)
+from rest_api_test.application.organizations.repo import OrganizationRepository
+from rest_api_test.application.phone_numbers.dto import PhoneNumberIn, PhoneNumberUpdate
+from rest_api_test.application.phone_numbers.repo import PhoneNumberRepository
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.buildings.model import Building
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
+
+
+class CachedBuildingRepository(BuildingRepository):
+    def __init__(self, inner: BuildingRepository, cache: KeyValueCache, ttl_s: int):
+        self._inner = inner
+        self._cache = cache
+        self._ttl_s = ttl_s
+
+    async def get_all(self, pagination: Pagination) -> list[Building]:
+        return await self._inner.get_all(pagination)
+
+    async def get_by_id(self, bld_id: UUID) -> Building | None:
+        key = entity_key(Building, bld_id)
+        cached, epoch = await self._cache.get_many([key, ENTITY_EPOCH_KEY])
+        if cached is not None:
+            return buildings_codec.validate_json(cached)
+        building = await self._inner.get_by_id(bld_id)
+        if building:
+            await self._cache.set_many_if(
+                [CacheItem(key, buildings_codec.dump_json(building), self._ttl_s)],
+                ENTITY_EPOCH_KEY,
+                epoch,
+            )
+        return building
+
+    async def get_points(self) -> list[BuildingPoint]:
+        return await self._inner.get_points()
+
+    async def create(self, data: BuildingIn) -> Building:
+        return await self._inner.create(data)
+
+    async def create_many(self, data: Sequence[BuildingIn]) -> list[UUID]:
+        return await self._inner.create_many(data)
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._inner.existing_ids(ids)
+
+    async def update(self, bld_id: UUID, data: BuildingUpdate) -> Building:
+        building = await self._inner.update(bld_id, data)
+        await self._cache.delete(entity_key(Building, bld_id))
+        return building
+
+    async def delete_by_id(self, bld_id: UUID) -> Building:
+        # Its organizations are deleted too, composing them needs the building
+        building = await self._inner.delete_by_id(bld_id)
+        await self._cache.delete(entity_key(Building, bld_id))
+        return building
+
+
+class CachedPhoneNumberRepository(PhoneNumberRepository):
+    def __init__(self, inner: PhoneNumberRepository, cache: KeyValueCache, ttl_s: int):
+        self._inner = inner
+        self._cache = cache
+        self._ttl_s = ttl_s
+
+    async def get_all(self, pagination: Pagination) -> list[PhoneNumber]:
+        return await self._inner.get_all(pagination)
+
+    async def get_by_id(self, pn_id: UUID) -> PhoneNumber | None:
+        key = entity_key(PhoneNumber, pn_id)
+        cached, epoch = await self._cache.get_many([key, ENTITY_EPOCH_KEY])
+        if cached is not None:
+            return phone_numbers_codec.validate_json(cached)
+        phone_number = await self._inner.get_by_id(pn_id)
+        if phone_number:
+            await self._cache.set_many_if(
+                [
+                    CacheItem(
+                        key, phone_numbers_codec.dump_json(phone_number), self._ttl_s
+                    )
+                ],
+                ENTITY_EPOCH_KEY,
+                epoch,
+            )
+        return phone_number
+
+    async def create(self, data: PhoneNumberIn) -> PhoneNumber:
+        return await self._inner.create(data)
+
+    async def create_many(self, data: Sequence[PhoneNumberIn]) -> list[UUID]:
+        return await self._inner.create_many(data)
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._inner.existing_ids(ids)
+
+    async def update(self, pn_id: UUID, data: PhoneNumberUpdate) -> PhoneNumber:
+        phone_number = await self._inner.update(pn_id, data)
+        await self._cache.delete(entity_key(PhoneNumber, pn_id))
+        return phone_number
+
+    async def delete_by_id(self, pn_id: UUID) -> PhoneNumber:
+        phone_number = await self._inner.delete_by_id(pn_id)
+        await self._cache.delete(entity_key(PhoneNumber, pn_id))
+        return phone_number
+
+
+class CachedActivityRepository(ActivityRepository):
+    """Trees of the default depth only, other depths go to the database."""
+
+    def __init__(self, inner: ActivityRepository, cache: KeyValueCache, ttl_s: int):
+        self._inner = inner
+        self._cache = cache
+        self._ttl_s = ttl_s
+
+    async def get_all(
+        self, pagination: Pagination, depth: int | None = None
+    ) -> list[Activity]:
+        return await self._inner.get_all(pagination, depth)
+
+    async def get_by_id(
+        self, act_id: UUID, depth: int | None = None
+    ) -> Activity | None:
+        if depth not in (None, settings.activities_depth):
+            return await self._inner.get_by_id(act_id, depth)
+        generation = await activity_generation(
+            self._cache, await self._cache.get(ACTIVITY_GENERATION_KEY)
+        )
+        key = activity_key(generation, act_id)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            return activities_codec.validate_json(cached)
+        activity = await self._inner.get_by_id(act_id)
+        if activity:
+            # Only while the generation is current: a write may have dropped it
+            # after the database read
+            await self._cache.set_many_if(
+                [CacheItem(key, activities_codec.dump_json(activity), self._ttl_s)],
+                ACTIVITY_GENERATION_KEY,
+                generation.encode(),
+            )
+        return activity
+
+    async def get_nodes(self) -> list[ActivityNode]:
+        return await self._inner.get_nodes()
+
+    async def create(self, data: ActivityIn) -> Activity:
+        activity = await self._inner.create(data)
+        await drop_activity_trees(self._cache)
+        return activity
+
+    async def create_many(self, data: Sequence[ActivityIn]) -> list[UUID]:
+        ids = await self._inner.create_many(data)
+        await drop_activity_trees(self._cache)
+        return ids
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._inner.existing_ids(ids)
+
+    async def update(self, act_id: UUID, data: ActivityUpdate) -> Activity:
+        activity = await self._inner.update(act_id, data)
+        await drop_activity_trees(self._cache)
+        return activity
+
+    async def delete_by_id(self, act_id: UUID) -> Activity:
+        activity = await self._inner.delete_by_id(act_id)
+        await drop_activity_trees(self._cache)
+        return activity
+
+
+class CachedOrganizationRepository(OrganizationRepository):
+    """
+    An organization is cached as a record of its fields and linked ids and
+    composed back from the cached building, phone numbers and activity trees,
+    fetched with one multi-get. If any of them is missing (evicted, changed or
+    deleted) the organization is reloaded from the database and all parts are
+    re-cached: a deleted phone number or activity drops out of it, a deleted
+    building means the organization is gone too.
+    """
+
+    def __init__(
+        self,
+        inner: OrganizationRepository,
+        buildings: BuildingRepository,
+        cache: KeyValueCache,
+        ttl_s: int,
+    ):
+        self._inner = inner
+        self._buildings = buildings
+        self._cache = cache
+        self._ttl_s = ttl_s
+
+    async def get_all(
+        self,
+        pagination: Pagination | None = None,
+        name: str | None = None,
+        search: str | None = None,
+        building_id: UUID | None = None,
+        activity_id: UUID | None = None,
+        geo: GeoFilter | None = None,
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+        activities_depth: int | None = None,
+    ) -> list[Organization]:
+        return await self._inner.get_all(
+            pagination=pagination,
+            name=name,
+            search=search,
+            building_id=building_id,
+            activity_id=activity_id,
+            geo=geo,
+            building_ids=building_ids,
+            activity_ids=activity_ids,
+            activities_depth=activities_depth,
+        )
+
+    async def get_all_json(
+        self,
+        pagination: Pagination | None = None,
+        name: str | None = None,
+        search: str | None = None,
+        building_id: UUID | None = None,
+        activity_id: UUID | None = None,
+        geo: GeoFilter | None = None,
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+    ) -> RawJsonPage:
+        return await self._inner.get_all_json(
+            pagination=pagination,
+            name=name,
+            search=search,
+            building_id=building_id,
+            activity_id=activity_id,
+            geo=geo,
+            building_ids=building_ids,
+            activity_ids=activity_ids,
+        )
+
+    async def get_nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        name: str | None = None,
+        activity_id: UUID | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+        activities_depth: int | None = None,
+    ) -> list[tuple[Organization, float]]:
+        return await self._inner.get_nearest(
+            lat=lat,
+            lon=lon,
+            k=k,
+            name=name,
+            activity_id=activity_id,
+            activity_ids=activity_ids,
+            activities_depth=activities_depth,
+        )
+
+    async def get_by_id(
+        self, org_id: UUID, activities_depth: int | None = None
+    ) -> Organization | None:
+        if activities_depth not in (None, 0, settings.activities_depth):
+            return await self._inner.get_by_id(org_id, activities_depth)
+        cached, current_generation, epoch = await self._cache.get_many(
+            [
+                entity_key(Organization, org_id),
+                ACTIVITY_GENERATION_KEY,
+                ENTITY_EPOCH_KEY,
+            ]
+        )
+        generation = await activity_generation(self._cache, current_generation)
+        if cached is not None:
+            org = await self._compose(
+                organizations_codec.validate_json(cached), generation
+            )
+            if org is not None:
+                return self._cut_activities(org, activities_depth)
+        org = await self._inner.get_by_id(org_id)
+        if org is None:
+            return None
+        await self._store(org, generation, epoch)
+        return self._cut_activities(org, activities_depth)
+
+    async def get_by_id_json(self, org_id: UUID) -> bytes | None:
+        return await self._inner.get_by_id_json(org_id)
+
+    async def create(self, payload: OrganizationIn) -> Organization:
+        return await self._inner.create(payload)
+
+    async def create_many(self, payloads: Sequence[OrganizationIn]) -> list[UUID]:
+        return await self._inner.create_many(payloads)
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._inner.existing_ids(ids)
+
+    async def assign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> None:
+        await self._inner.assign_phone_numbers(org_id, ids)
+        await self._evict([org_id])
+
+    async def unassign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> int:
+        removed = await self._inner.unassign_phone_numbers(org_id, ids)
+        await self._evict([org_id])
+        return removed
+
+    async def assign_activities(self, org_id: UUID, ids: list[UUID]) -> None:
+        await self._inner.assign_activities(org_id, ids)
+        await self._evict([org_id])
+
+    async def unassign_activities(self, org_id: UUID, ids: list[UUID]) -> int:
+        removed = await self._inner.unassign_activities(org_id, ids)
+        await self._evict([org_id])
+        return removed
+
+    async def add_phone_number_links(self, links: Sequence[tuple[UUID, UUID]]) -> None:
+        await self._inner.add_phone_number_links(links)
+        await self._evict(org_id for org_id, _ in links)
+
+    async def remove_phone_number_links(
+        self, links: Sequence[tuple[UUID, UUID]]
+    ) -> int:
+        removed = await self._inner.remove_phone_number_links(links)
+        await self._evict(org_id for org_id, _ in links)
+        return removed
+
+    async def add_activity_links(self, links: Sequence[tuple[UUID, UUID]]) -> None:
+        await self._inner.add_activity_links(links)
+        await self._evict(org_id for org_id, _ in links)
+
+    async def remove_activity_links(self, links: Sequence[tuple[UUID, UUID]]) -> int:
+        removed = await self._inner.remove_activity_links(links)
+        await self._evict(org_id for org_id, _ in links)
+        return removed
+
+    async def update_by_id(
+        self, org_id: UUID, payload: OrganizationUpdate
+    ) -> Organization:
+        org = await self._inner.update_by_id(org_id, payload)
+        await self._evict([org_id])
+        return org
+
+    async def delete_by_id(self, org_id: UUID) -> None:
+        await self._inner.delete_by_id(org_id)
+        await self._evict([org_id])
+
+    async def _compose(
+        self, record: OrganizationRecord, generation: str
+    ) -> Organization | None:
+        keys = [
+            entity_key(Building, record.building_id),
+            *(entity_key(PhoneNumber, id) for id in record.phone_number_ids),
+            *(activity_key(generation, id) for id in record.activity_ids),
+        ]
+        parts = await self._cache.get_many(keys)
+        if any(part is None for part in parts):
+            return None
+        phones_end = 1 + len(record.phone_number_ids)
+        return Organization(
+            id=record.id,
+            name=record.name,
+            building_id=record.building_id,
+            phone_numbers=[
+                phone_numbers_codec.validate_json(p)  # type: ignore[reportArgumentType]
+                for p in parts[1:phones_end]
+            ],
+            activities=[
+                activities_codec.validate_json(a)  # type: ignore[reportArgumentType]
+                for a in parts[phones_end:]
+            ],
+        )
+
+    async def _store(
+        self, org: Organization, generation: str, epoch: bytes | None
+    ) -> None:
+        """`epoch` - as read before loading `org`, nothing is stored if it changed."""
+        items = [
+            CacheItem(
+                entity_key(Organization, org.id),
+                organizations_codec.dump_json(OrganizationRecord.from_domain(org)),
+                self._ttl_s,
+            ),
+            *(
+                CacheItem(
+                    entity_key(PhoneNumber, p.id),
+                    phone_numbers_codec.dump_json(p),
+                    self._ttl_s,
+                )
+                for p in org.phone_numbers
+            ),
+            *(
+                CacheItem(
+                    activity_key(generation, a.id),
+                    activities_codec.dump_json(a),
+                    self._ttl_s,
+                )
+                for a in org.activities
+            ),
+        ]
+        if not await self._cache.set_many_if(items, ENTITY_EPOCH_KEY, epoch):
+            return
+        # Caches the building as a side effect, composing requires it
+        await self._buildings.get_by_id(org.building_id)
+
+    async def _evict(self, org_ids: Iterable[UUID]) -> None:
+        await self._cache.delete_many(
+            {entity_key(Organization, org_id) for org_id in org_ids}
+        )
+
+    @staticmethod
+    def _cut_activities(
+        org: Organization, activities_depth: int | None
+    ) -> Organization:
+        """Depth 0 - linked activities without children, trees come from elsewhere."""
+        if activities_depth != 0:
+            return org
+        return replace(
+            org, activities=[replace(a, children=None) for a in org.activities]
+        )
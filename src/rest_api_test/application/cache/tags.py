@@ -0,0 +1,50 @@
+"""
+Tags of cached responses: every response is tagged with the entities it shows
+and lists with the collection of their entity type. A write invalidates the
+tags of what it changed, see `CacheInvalidator`.
+"""
+
+from collections.abc import Iterable, Iterator
+from uuid import UUID
+
+from rest_api_test.application.organizations.dto import OrganizationOut
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.buildings.model import Building
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
+
+OrganizationLike = Organization | OrganizationOut
+
+
+def entity_tag(entity: type, id: UUID | str) -> str:
+    return f"{entity.__name__}:{id}"
+
+
+def collection_tag(entity: type) -> str:
+    """Lists of the entity type: any create, update or delete changes them."""
+    return f"{entity.__name__}:*"
+
+
+def entity_tags(entity: type, ids: Iterable[UUID]) -> list[str]:
+    return [entity_tag(entity, id) for id in ids]
+
+
+def activity_tags(activity: Activity) -> Iterator[str]:
+    """
+    Every node of the tree and its parent: parent_id is part of the output, so
+    deleting the parent (its children become roots) changes the node too.
+    """
+    yield entity_tag(Activity, activity.id)
+    if activity.parent_id is not None:
+        yield entity_tag(Activity, activity.parent_id)
+    for child in activity.children or ():
+        yield from activity_tags(child)
+
+
+def organization_tags(org: OrganizationLike) -> Iterator[str]:
+    yield entity_tag(Organization, org.id)
+    yield entity_tag(Building, org.building_id)
+    for phone_number in org.phone_numbers:
+        yield entity_tag(PhoneNumber, phone_number.id)
+    for activity in org.activities:
+        yield from activity_tags(activity)  # type: ignore[reportArgumentType]
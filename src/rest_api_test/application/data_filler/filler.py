@@ -5,11 +5,20 @@ from rest_api_test.application.activities.dto import ActivityIn
 from rest_api_test.application.activities.repo import ActivityRepository
 from rest_api_test.application.buildings.dto import BuildingIn
 from rest_api_test.application.buildings.repo import BuildingRepository
+from rest_api_test.application.cache.invalidation import NO_CACHE_INVALIDATOR
+from rest_api_test.application.cache.tags import collection_tag
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
 from rest_api_test.application.interfaces.common.uow import UnitOfWork
 from rest_api_test.application.organizations.dto import OrganizationIn
 from rest_api_test.application.organizations.repo import OrganizationRepository
 from rest_api_test.application.phone_numbers.dto import PhoneNumberIn
 from rest_api_test.application.phone_numbers.repo import PhoneNumberRepository
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.buildings.model import Building
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
 from rest_api_test.utils.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,12 +32,14 @@ class DataFiller:
         pn_repo: PhoneNumberRepository,
         building_repo: BuildingRepository,
         uow: UnitOfWork,
+        cache_invalidator: CacheInvalidator = NO_CACHE_INVALIDATOR,
     ):
         self.org_repo = org_repo
         self.activity_repo = activity_repo
         self.pn_repo = pn_repo
         self.building_repo = building_repo
         self.uow = uow
+        self.cache_invalidator = cache_invalidator
 
     async def fill_database(self):
         async with self.uow:
@@ -36,6 +47,11 @@ class DataFiller:
             phone_numbers_ids = await self._fill_phone_numbers()
             await self._fill_organizations(activity_ids, phone_numbers_ids)
             await self.uow.commit()
+        # Only new entities, so only the lists change
+        await self.cache_invalidator.invalidate(
+            collection_tag(entity)
+            for entity in (Activity, Building, Organization, PhoneNumber)
+        )
 
     async def _fill_activities(self) -> list[UUID]:
         """Returns root activities uuids"""
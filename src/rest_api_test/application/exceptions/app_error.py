@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from uuid import UUID
 
 from rest_api_test.application.exceptions.error_types import ErrorType
@@ -23,7 +24,19 @@ class NotFound(AppError):
         message = f"{ent_obj.__name__} with id '{id}' was not found"
         return cls(message)
 
+    @classmethod
+    def domain_entities(cls, ent_obj: type, ids: Iterable[UUID | str]) -> NotFound:
+        listed = ", ".join(f"'{id}'" for id in ids)
+        message = f"{ent_obj.__name__} with ids {listed} were not found"
+        return cls(message)
+
 
 class ValidationError(AppError):
     def __init__(self, message: str):
         super().__init__(ErrorType.VALIDATION_ERROR, message)
+
+
+class RateLimited(AppError):
+    def __init__(self, message: str, retry_after_s: float):
+        super().__init__(ErrorType.RATE_LIMITED, message)
+        self.retry_after_s = retry_after_s
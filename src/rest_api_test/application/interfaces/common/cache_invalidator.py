@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+
+
+class CacheInvalidator(ABC):
+    """Evicts cached responses tagged with any of the tags, see `cache.tags`."""
+
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> None: ...
@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple
 
 CacheResponse = bytes | None
 
 
+class CacheItem(NamedTuple):
+    key: str
+    value: str | bytes
+    ttl: int
+
+
 class KeyValueCache(ABC):
     @abstractmethod
     async def get(self, key: str) -> CacheResponse: ...
@@ -12,3 +20,32 @@ class KeyValueCache(ABC):
 
     @abstractmethod
     async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> list[CacheResponse]:
+        """Values in the order of keys, None for missing ones."""
+
+    async def get_many_with_ttl(
+        self, keys: Sequence[str]
+    ) -> list[tuple[CacheResponse, float | None]]:
+        """`get_many` plus the remaining TTL in seconds, None if unknown."""
+        return [(value, None) for value in await self.get_many(keys)]
+
+    @abstractmethod
+    async def set_many(self, items: Iterable[CacheItem]) -> None: ...
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    async def add(self, key: str, value: str | bytes, ttl: int) -> bool:
+        """Sets the key only if it is missing, True if it was set."""
+
+    @abstractmethod
+    async def set_many_if(
+        self, items: Iterable[CacheItem], guard_key: str, guard_value: bytes | None
+    ) -> bool:
+        """
+        Sets the items only if `guard_key` still holds `guard_value` (as read
+        by `get`, None - missing), atomically with the check. True if set.
+        """
@@ -1,6 +1,26 @@
+from dataclasses import dataclass
+from uuid import UUID
+
 from pydantic import BaseModel
 
 
 class Pagination(BaseModel):
     limit: int = 10
     offset: int = 0
+    # Keyset mode: rows are ordered by id and start strictly after `after_id`
+    keyset: bool = False
+    after_id: UUID | None = None
+
+
+class CursorPage[T](BaseModel):
+    items: list[T]
+    next_cursor: str | None = None
+
+
+@dataclass(frozen=True)
+class RawJsonPage:
+    """Page of documents already serialized into a JSON array."""
+
+    items: bytes
+    count: int
+    last_id: UUID | None
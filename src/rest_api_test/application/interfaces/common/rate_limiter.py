@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+
+class RateLimit(NamedTuple):
+    """Token bucket: refills `rate_per_s` tokens a second up to `burst`."""
+
+    rate_per_s: float
+    burst: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """From "rate/burst", e.g. "0.5/10"."""
+        rate, _, burst = value.partition("/")
+        return cls(float(rate), int(burst or max(1, float(rate))))
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    # Until the next token (0 if allowed) / until the bucket is full again
+    retry_after_s: float
+    reset_s: float
+
+
+class RateLimiter(ABC):
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit) -> RateLimitDecision:
+        """Takes a token of the bucket of `key` if there is one."""
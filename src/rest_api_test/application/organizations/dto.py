@@ -43,6 +43,7 @@ GeoFilter = GeoRadius | GeoBBox | None
 
 class OrganizationsQuery(BaseModel):
     name: str | None = None
+    search: str | None = None
     building_id: UUID | None = None
     activity_id: UUID | None = None
     geo: GeoFilter | None = None
@@ -56,6 +57,14 @@ class OrganizationsQuery(BaseModel):
         return self
 
 
+class NearestOrganizationsQuery(BaseModel):
+    lat: Annotated[float, confloat(ge=-90, le=90)]
+    lon: Annotated[float, confloat(ge=-180, le=180)]
+    k: Annotated[int, conint(ge=1, le=100)] = 10
+    name: str | None = None
+    activity_id: UUID | None = None
+
+
 class OrganizationIn(BaseModel):
     name: str
     building_id: UUID
@@ -65,9 +74,23 @@ class OrganizationUpdate(OrganizationIn):
     pass
 
 
+class OrganizationActivityLink(BaseModel):
+    organization_id: UUID
+    activity_id: UUID
+
+
+class OrganizationPhoneNumberLink(BaseModel):
+    organization_id: UUID
+    phone_number_id: UUID
+
+
 class OrganizationOut(BaseModel):
     id: UUID
     name: str
     phone_numbers: list[PhoneNumberOut]
     activities: list[ActivityOut]
     building_id: UUID
+
+
+class OrganizationNearOut(OrganizationOut):
+    distance_m: float
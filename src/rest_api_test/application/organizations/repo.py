@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.interfaces.common.pagination import (
+    Pagination,
+    RawJsonPage,
+)
 from rest_api_test.application.organizations.dto import (
     GeoFilter,
     OrganizationIn,
@@ -16,28 +20,96 @@ class OrganizationRepository(ABC):
         self,
         pagination: Pagination | None = None,
         name: str | None = None,
+        search: str | None = None,
+        building_id: UUID | None = None,
+        activity_id: UUID | None = None,
+        geo: GeoFilter | None = None,
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+        activities_depth: int | None = None,
+    ) -> list[Organization]:
+        """
+        `activity_ids` - activity filter with the subtree already expanded.
+        `activities_depth` - levels of activity children to load, defaults to
+        settings.activities_depth.
+        """
+
+    @abstractmethod
+    async def get_all_json(
+        self,
+        pagination: Pagination | None = None,
+        name: str | None = None,
+        search: str | None = None,
         building_id: UUID | None = None,
         activity_id: UUID | None = None,
         geo: GeoFilter | None = None,
-    ) -> list[Organization]: ...
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+    ) -> RawJsonPage:
+        """Same page as `get_all`, serialized to OrganizationOut JSON by the DB."""
+
+    @abstractmethod
+    async def get_nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        name: str | None = None,
+        activity_id: UUID | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+        activities_depth: int | None = None,
+    ) -> list[tuple[Organization, float]]: ...
 
     @abstractmethod
-    async def get_by_id(self, org_id: UUID) -> Organization | None: ...
+    async def get_by_id(
+        self, org_id: UUID, activities_depth: int | None = None
+    ) -> Organization | None: ...
+
+    @abstractmethod
+    async def get_by_id_json(self, org_id: UUID) -> bytes | None: ...
 
     @abstractmethod
     async def create(self, payload: OrganizationIn) -> Organization: ...
 
+    @abstractmethod
+    async def create_many(self, payloads: Sequence[OrganizationIn]) -> list[UUID]: ...
+
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]: ...
+
     @abstractmethod
     async def assign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> None: ...
 
     @abstractmethod
-    async def unassign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> None: ...
+    async def unassign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> int:
+        """Number of links actually removed."""
 
     @abstractmethod
     async def assign_activities(self, org_id: UUID, ids: list[UUID]) -> None: ...
 
     @abstractmethod
-    async def unassign_activities(self, org_id: UUID, ids: list[UUID]) -> None: ...
+    async def unassign_activities(self, org_id: UUID, ids: list[UUID]) -> int:
+        """Number of links actually removed."""
+
+    # Links are (organization_id, target_id) pairs, existing ones are skipped.
+    # A missing organization or target raises NotFound
+    @abstractmethod
+    async def add_phone_number_links(
+        self, links: Sequence[tuple[UUID, UUID]]
+    ) -> None: ...
+
+    @abstractmethod
+    async def remove_phone_number_links(
+        self, links: Sequence[tuple[UUID, UUID]]
+    ) -> int: ...
+
+    @abstractmethod
+    async def add_activity_links(self, links: Sequence[tuple[UUID, UUID]]) -> None: ...
+
+    @abstractmethod
+    async def remove_activity_links(
+        self, links: Sequence[tuple[UUID, UUID]]
+    ) -> int: ...
 
     @abstractmethod
     async def update_by_id(
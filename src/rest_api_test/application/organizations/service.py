@@ -1,13 +1,32 @@
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import replace
+from typing import Any
 from uuid import UUID
 
+from rest_api_test.application.activities.forest import ActivityForest
 from rest_api_test.application.activities.repo import ActivityRepository
 from rest_api_test.application.buildings.repo import BuildingRepository
-from rest_api_test.application.exceptions.app_error import NotFound
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.buildings.spatial_index import BuildingSpatialIndex
+from rest_api_test.application.bulk.chunks import create_in_chunks
+from rest_api_test.application.bulk.dto import BulkResult
+from rest_api_test.application.cache.invalidation import NO_CACHE_INVALIDATOR
+from rest_api_test.application.cache.tags import collection_tag, entity_tag, entity_tags
+from rest_api_test.application.exceptions.app_error import NotFound, ValidationError
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
+from rest_api_test.application.interfaces.common.pagination import (
+    Pagination,
+    RawJsonPage,
+)
 from rest_api_test.application.interfaces.common.uow import UnitOfWork
 from rest_api_test.application.organizations.dto import (
+    NearestOrganizationsQuery,
+    OrganizationActivityLink,
     OrganizationIn,
+    OrganizationNearOut,
     OrganizationOut,
+    OrganizationPhoneNumberLink,
     OrganizationsQuery,
     OrganizationUpdate,
 )
@@ -17,6 +36,9 @@ from rest_api_test.domain.activities.model import Activity
 from rest_api_test.domain.buildings.model import Building
 from rest_api_test.domain.organizations.model import Organization
 from rest_api_test.domain.phone_numbers.table import PhoneNumber
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 
 class OrganizationService:
@@ -27,104 +49,324 @@ class OrganizationService:
         build_repo: BuildingRepository,
         activity_repo: ActivityRepository,
         phone_repo: PhoneNumberRepository,
+        spatial_index: BuildingSpatialIndex | None = None,
+        activity_forest: ActivityForest | None = None,
+        cache_invalidator: CacheInvalidator = NO_CACHE_INVALIDATOR,
     ):
         self.uow = uow
         self.orgs_repo = orgs_repo
         self.build_repo = build_repo
         self.activity_repo = activity_repo
         self.phone_repo = phone_repo
+        self.spatial_index = spatial_index
+        self.activity_forest = activity_forest
+        self.cache_invalidator = cache_invalidator
 
     async def get_all(
         self, pagination: Pagination, query: OrganizationsQuery
-    ) -> list[OrganizationOut]:
+    ) -> list[Organization]:
+        forest = self._ready_forest()
+        filters = self._list_filters(pagination, query, forest)
         async with self.uow:
             orgs = await self.orgs_repo.get_all(
-                pagination=pagination,
+                pagination=pagination, activities_depth=0 if forest else None, **filters
+            )
+        if forest:
+            return [self._with_forest_activities(org, forest) for org in orgs]
+        return orgs
+
+    async def get_all_json(
+        self, pagination: Pagination, query: OrganizationsQuery
+    ) -> RawJsonPage:
+        filters = self._list_filters(pagination, query, self._ready_forest())
+        async with self.uow:
+            return await self.orgs_repo.get_all_json(pagination=pagination, **filters)
+
+    async def get_nearest(
+        self, query: NearestOrganizationsQuery
+    ) -> list[OrganizationNearOut]:
+        forest = self._ready_forest()
+        activity_id, activity_ids = self._activity_filter(query.activity_id, forest)
+        async with self.uow:
+            found = await self.orgs_repo.get_nearest(
+                lat=query.lat,
+                lon=query.lon,
+                k=query.k,
                 name=query.name,
-                building_id=query.building_id,
-                activity_id=query.activity_id,
-                geo=query.geo,
+                activity_id=activity_id,
+                activity_ids=activity_ids,
+                activities_depth=0 if forest else None,
             )
-        return [OrganizationOut.model_validate(o, from_attributes=True) for o in orgs]
+        if forest:
+            found = [
+                (self._with_forest_activities(org, forest), distance)
+                for org, distance in found
+            ]
+        return [
+            OrganizationNearOut.model_validate(
+                {**vars(org), "distance_m": distance}, from_attributes=True
+            )
+            for org, distance in found
+        ]
 
-    async def get_by_id(self, org_id: UUID) -> OrganizationOut:
+    async def get_by_id(self, org_id: UUID) -> Organization:
+        forest = self._ready_forest()
         async with self.uow:
-            org = await self.orgs_repo.get_by_id(org_id)
+            org = await self.orgs_repo.get_by_id(
+                org_id, activities_depth=0 if forest else None
+            )
         if not org:
             raise NotFound.domain_entity(Organization, org_id)
-        return OrganizationOut.model_validate(org, from_attributes=True)
+        if forest:
+            return self._with_forest_activities(org, forest)
+        return org
+
+    async def get_by_id_json(self, org_id: UUID) -> bytes:
+        async with self.uow:
+            doc = await self.orgs_repo.get_by_id_json(org_id)
+        if doc is None:
+            raise NotFound.domain_entity(Organization, org_id)
+        return doc
 
     async def create(self, payload: OrganizationIn) -> OrganizationOut:
         async with self.uow as uow:
-            building = await self.build_repo.get_by_id(payload.building_id)
-            if not building:
-                raise NotFound.domain_entity(Building, payload.building_id)
             org = await self.orgs_repo.create(payload)
             await uow.commit()
+        await self.cache_invalidator.invalidate([collection_tag(Organization)])
         return OrganizationOut.model_validate(org, from_attributes=True)
 
+    async def create_many(self, payloads: list[OrganizationIn]) -> BulkResult:
+        result = await create_in_chunks(
+            self.uow,
+            payloads,
+            self.orgs_repo.create_many,
+            chunk_size=settings.bulk_chunk_size,
+            check=self._check_buildings,
+        )
+        await self.cache_invalidator.invalidate([collection_tag(Organization)])
+        return result
+
     async def assign_activity(self, org_id: UUID, activity_id: UUID) -> None:
-        async with self.uow as uow:
-            org = await self.orgs_repo.get_by_id(org_id)
-            if not org:
-                raise NotFound.domain_entity(Organization, org_id)
-
-            activity = await self.activity_repo.get_by_id(activity_id)
-            if not activity:
-                raise NotFound.domain_entity(Activity, activity_id)
-            await self.orgs_repo.assign_activities(org_id, [activity_id])
-            await uow.commit()
+        await self._add_links(
+            [(org_id, activity_id)],
+            self.orgs_repo.add_activity_links,
+            self.activity_repo,
+            Activity,
+        )
 
     async def unassign_activity(self, org_id: UUID, activity_id: UUID) -> None:
-        async with self.uow as uow:
-            org = await self.orgs_repo.get_by_id(org_id)
-            if not org:
-                raise NotFound.domain_entity(Organization, org_id)
-
-            activity = await self.activity_repo.get_by_id(activity_id)
-            if not activity:
-                raise NotFound.domain_entity(Activity, activity_id)
-            await self.orgs_repo.unassign_activities(org_id, [activity_id])
-            await uow.commit()
+        await self._remove_links(
+            [(org_id, activity_id)],
+            self.orgs_repo.remove_activity_links,
+            self.activity_repo,
+            Activity,
+        )
 
     async def assign_phone_number(self, org_id: UUID, phone_id: UUID) -> None:
-        async with self.uow as uow:
-            org = await self.orgs_repo.get_by_id(org_id)
-            if not org:
-                raise NotFound.domain_entity(Organization, org_id)
+        await self._add_links(
+            [(org_id, phone_id)],
+            self.orgs_repo.add_phone_number_links,
+            self.phone_repo,
+            PhoneNumber,
+        )
 
-            phone = await self.phone_repo.get_by_id(phone_id)
-            if not phone:
-                raise NotFound.domain_entity(PhoneNumber, phone_id)
+    async def unassign_phone_number(self, org_id: UUID, phone_id: UUID) -> None:
+        await self._remove_links(
+            [(org_id, phone_id)],
+            self.orgs_repo.remove_phone_number_links,
+            self.phone_repo,
+            PhoneNumber,
+        )
 
-            await self.orgs_repo.assign_phone_numbers(org_id, [phone_id])
-            await uow.commit()
+    async def assign_activities(
+        self, links: Sequence[OrganizationActivityLink]
+    ) -> None:
+        await self._add_links(
+            [(link.organization_id, link.activity_id) for link in links],
+            self.orgs_repo.add_activity_links,
+            self.activity_repo,
+            Activity,
+        )
 
-    async def unassign_phone_number(self, org_id: UUID, phone_id: UUID) -> None:
-        async with self.uow as uow:
-            org = await self.orgs_repo.get_by_id(org_id)
-            if not org:
-                raise NotFound.domain_entity(Organization, org_id)
+    async def unassign_activities(
+        self, links: Sequence[OrganizationActivityLink]
+    ) -> None:
+        await self._remove_links(
+            [(link.organization_id, link.activity_id) for link in links],
+            self.orgs_repo.remove_activity_links,
+            self.activity_repo,
+            Activity,
+        )
 
-            phone = await self.phone_repo.get_by_id(phone_id)
-            if not phone:
-                raise NotFound.domain_entity(PhoneNumber, phone_id)
+    async def assign_phone_numbers(
+        self, links: Sequence[OrganizationPhoneNumberLink]
+    ) -> None:
+        await self._add_links(
+            [(link.organization_id, link.phone_number_id) for link in links],
+            self.orgs_repo.add_phone_number_links,
+            self.phone_repo,
+            PhoneNumber,
+        )
 
-            await self.orgs_repo.unassign_phone_numbers(org_id, [phone_id])
-            await uow.commit()
+    async def unassign_phone_numbers(
+        self, links: Sequence[OrganizationPhoneNumberLink]
+    ) -> None:
+        await self._remove_links(
+            [(link.organization_id, link.phone_number_id) for link in links],
+            self.orgs_repo.remove_phone_number_links,
+            self.phone_repo,
+            PhoneNumber,
+        )
 
     async def update(
         self, org_id: UUID, payload: OrganizationUpdate
     ) -> OrganizationOut:
         async with self.uow as uow:
-            building = await self.build_repo.get_by_id(payload.building_id)
-            if not building:
-                raise NotFound.domain_entity(Building, payload.building_id)
             org = await self.orgs_repo.update_by_id(org_id, payload)
             await uow.commit()
+        await self.cache_invalidator.invalidate(
+            [entity_tag(Organization, org_id), collection_tag(Organization)]
+        )
         return OrganizationOut.model_validate(org, from_attributes=True)
 
     async def delete(self, org_id: UUID) -> None:
         async with self.uow as uow:
             await self.orgs_repo.delete_by_id(org_id)
             await uow.commit()
+        await self.cache_invalidator.invalidate(
+            [entity_tag(Organization, org_id), collection_tag(Organization)]
+        )
+
+    async def _add_links(
+        self,
+        pairs: list[tuple[UUID, UUID]],
+        add: Callable[[Sequence[tuple[UUID, UUID]]], Awaitable[None]],
+        target_repo: ActivityRepository | PhoneNumberRepository,
+        target: type,
+    ) -> None:
+        """
+        One insert relying on the foreign keys. The statement stops at the first
+        missing reference, so on failure all missing ids are looked up to be
+        reported together.
+        """
+        async with self.uow as uow:
+            try:
+                await add(pairs)
+            except NotFound:
+                await uow.rollback()
+                await self._ensure_link_ends(pairs, target_repo, target)
+                raise
+            await uow.commit()
+        await self._invalidate_linked(pairs)
+
+    async def _remove_links(
+        self,
+        pairs: list[tuple[UUID, UUID]],
+        remove: Callable[[Sequence[tuple[UUID, UUID]]], Awaitable[int]],
+        target_repo: ActivityRepository | PhoneNumberRepository,
+        target: type,
+    ) -> None:
+        """
+        One delete. Links that weren't there are fine, missing ends are not:
+        those are only checked when fewer links than requested were removed.
+        """
+        async with self.uow as uow:
+            removed = await remove(pairs)
+            if removed < len(set(pairs)):
+                await self._ensure_link_ends(pairs, target_repo, target)
+            await uow.commit()
+        if removed:
+            await self._invalidate_linked(pairs)
+
+    async def _ensure_link_ends(
+        self,
+        pairs: Sequence[tuple[UUID, UUID]],
+        target_repo: ActivityRepository | PhoneNumberRepository,
+        target: type,
+    ) -> None:
+        """Checks both ends of all links with one query per table."""
+        for repo, entity, ids in (
+            (self.orgs_repo, Organization, {org_id for org_id, _ in pairs}),
+            (target_repo, target, {target_id for _, target_id in pairs}),
+        ):
+            missing = ids - await repo.existing_ids(ids)
+            if missing:
+                raise NotFound.domain_entities(entity, sorted(missing, key=str))
+
+    async def _invalidate_linked(self, pairs: Sequence[tuple[UUID, UUID]]) -> None:
+        await self.cache_invalidator.invalidate(
+            [
+                *entity_tags(Organization, {org_id for org_id, _ in pairs}),
+                collection_tag(Organization),
+            ]
+        )
+
+    async def _check_buildings(
+        self, payloads: Sequence[OrganizationIn]
+    ) -> list[str | None]:
+        existing = await self.build_repo.existing_ids({p.building_id for p in payloads})
+        return [
+            None
+            if p.building_id in existing
+            else str(NotFound.domain_entity(Building, p.building_id))
+            for p in payloads
+        ]
+
+    def _ready_forest(self) -> ActivityForest | None:
+        if self.activity_forest and self.activity_forest.ready:
+            return self.activity_forest
+        return None
+
+    def _activity_filter(
+        self, activity_id: UUID | None, forest: ActivityForest | None
+    ) -> tuple[UUID | None, list[UUID] | None]:
+        """
+        The whole subtree of activity_id, however deep, is expanded in memory
+        when the forest is up and has the activity (it may not have applied
+        another worker's write yet), otherwise by the repository.
+        """
+        if activity_id is None or forest is None:
+            return activity_id, None
+        activity_ids = forest.descendant_ids(activity_id)
+        if not activity_ids:
+            return activity_id, None
+        return None, activity_ids
+
+    def _with_forest_activities(
+        self, org: Organization, forest: ActivityForest
+    ) -> Organization:
+        """Linked activities are loaded without children, trees come from forest."""
+        return replace(
+            org,
+            activities=[
+                forest.get(a.id, settings.activities_depth) or a for a in org.activities
+            ],
+        )
+
+    def _list_filters(
+        self,
+        pagination: Pagination,
+        query: OrganizationsQuery,
+        forest: ActivityForest | None,
+    ) -> dict[str, Any]:
+        if query.search and pagination.keyset:
+            raise ValidationError(
+                "Cursor pagination is not supported for search, use offset"
+            )
+
+        geo = query.geo
+        building_ids = None
+        if geo and self.spatial_index:
+            building_ids = self.spatial_index.query(geo)
+            geo = None
+        activity_id, activity_ids = self._activity_filter(query.activity_id, forest)
+
+        return {
+            "name": query.name,
+            "search": query.search,
+            "building_id": query.building_id,
+            "activity_id": activity_id,
+            "geo": geo,
+            "building_ids": building_ids,
+            "activity_ids": activity_ids,
+        }
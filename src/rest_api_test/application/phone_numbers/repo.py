@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
 from rest_api_test.application.interfaces.common.pagination import Pagination
@@ -16,6 +17,12 @@ class PhoneNumberRepository(ABC):
     @abstractmethod
     async def create(self, data: PhoneNumberIn) -> PhoneNumber: ...
 
+    @abstractmethod
+    async def create_many(self, data: Sequence[PhoneNumberIn]) -> list[UUID]: ...
+
+    @abstractmethod
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]: ...
+
     @abstractmethod
     async def update(self, pn_id: UUID, data: PhoneNumberUpdate) -> PhoneNumber: ...
 
@@ -1,6 +1,13 @@
 from uuid import UUID
 
+from rest_api_test.application.bulk.chunks import create_in_chunks
+from rest_api_test.application.bulk.dto import BulkResult
+from rest_api_test.application.cache.invalidation import NO_CACHE_INVALIDATOR
+from rest_api_test.application.cache.tags import collection_tag, entity_tag
 from rest_api_test.application.exceptions.app_error import NotFound
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.application.interfaces.common.uow import UnitOfWork
 from rest_api_test.application.phone_numbers.dto import (
@@ -10,43 +17,65 @@ from rest_api_test.application.phone_numbers.dto import (
 )
 from rest_api_test.application.phone_numbers.repo import PhoneNumberRepository
 from rest_api_test.domain.phone_numbers.table import PhoneNumber
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 
 class PhoneNumberService:
-    def __init__(self, uow: UnitOfWork, repo: PhoneNumberRepository):
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        repo: PhoneNumberRepository,
+        cache_invalidator: CacheInvalidator = NO_CACHE_INVALIDATOR,
+    ):
         self.uow = uow
         self.repo = repo
+        self.cache_invalidator = cache_invalidator
 
-    async def get_all(self, pagination: Pagination) -> list[PhoneNumberOut]:
+    async def get_all(self, pagination: Pagination) -> list[PhoneNumber]:
         async with self.uow:
-            phone_numbers = await self.repo.get_all(pagination)
-        return [
-            PhoneNumberOut.model_validate(number, from_attributes=True)
-            for number in phone_numbers
-        ]
+            return await self.repo.get_all(pagination)
 
-    async def get_by_id(self, phone_id: UUID) -> PhoneNumberOut:
+    async def get_by_id(self, phone_id: UUID) -> PhoneNumber:
         async with self.uow:
             phone_number = await self.repo.get_by_id(phone_id)
         if not phone_number:
             raise NotFound.domain_entity(PhoneNumber, phone_id)
-        return PhoneNumberOut.model_validate(phone_number, from_attributes=True)
+        return phone_number
 
     async def create(self, payload: PhoneNumberIn) -> PhoneNumberOut:
         async with self.uow as uow:
             phone_number = await self.repo.create(payload)
             await uow.commit()
+        await self.cache_invalidator.invalidate([collection_tag(PhoneNumber)])
         return PhoneNumberOut.model_validate(phone_number, from_attributes=True)
 
+    async def create_many(self, payloads: list[PhoneNumberIn]) -> BulkResult:
+        result = await create_in_chunks(
+            self.uow,
+            payloads,
+            self.repo.create_many,
+            chunk_size=settings.bulk_chunk_size,
+        )
+        await self.cache_invalidator.invalidate([collection_tag(PhoneNumber)])
+        return result
+
     async def update(
         self, phone_id: UUID, payload: PhoneNumberUpdate
     ) -> PhoneNumberOut:
         async with self.uow as uow:
             phone_number = await self.repo.update(phone_id, payload)
             await uow.commit()
+        await self.cache_invalidator.invalidate(
+            [entity_tag(PhoneNumber, phone_id), collection_tag(PhoneNumber)]
+        )
         return PhoneNumberOut.model_validate(phone_number, from_attributes=True)
 
     async def delete(self, phone_id: UUID) -> None:
         async with self.uow as uow:
             await self.repo.delete_by_id(phone_id)
             await uow.commit()
+        await self.cache_invalidator.invalidate(
+            [entity_tag(PhoneNumber, phone_id), collection_tag(PhoneNumber)]
+        )
@@ -0,0 +1,95 @@
+"""activities closure
+
+Revision ID: 24091e0fbf07
+Revises: 9be8791fad4b
+Create Date: 2026-10-18 13:05:27.904118
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "24091e0fbf07"
+down_revision: str | Sequence[str] | None = "9be8791fad4b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "activities_closure",
+        sa.Column("ancestor_id", sa.Uuid(), nullable=False),
+        sa.Column("descendant_id", sa.Uuid(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.Column(
+            "id", sa.Uuid(), server_default=sa.text("gen_random_uuid()"), nullable=False
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["ancestor_id"],
+            ["activities.id"],
+            name=op.f("fk_activities_closure_ancestor_id_activities"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["descendant_id"],
+            ["activities.id"],
+            name=op.f("fk_activities_closure_descendant_id_activities"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "ancestor_id", "descendant_id", "id", name=op.f("pk_activities_closure")
+        ),
+    )
+    op.create_index(
+        op.f("ix_activities_closure_descendant_id"),
+        "activities_closure",
+        ["descendant_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_organizations_activities_map_activity_id"),
+        "organizations_activities_map",
+        ["activity_id"],
+        unique=False,
+    )
+    # Backfill from the existing adjacency list
+    op.execute(
+        """
+        INSERT INTO activities_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM activities
+            UNION ALL
+            SELECT tree.ancestor_id, activities.id, tree.depth + 1
+            FROM tree JOIN activities ON activities.parent_id = tree.descendant_id
+        ) CYCLE descendant_id SET is_cycle USING path
+        SELECT ancestor_id, descendant_id, depth FROM tree WHERE NOT is_cycle
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_organizations_activities_map_activity_id"),
+        table_name="organizations_activities_map",
+    )
+    op.drop_index(
+        op.f("ix_activities_closure_descendant_id"), table_name="activities_closure"
+    )
+    op.drop_table("activities_closure")
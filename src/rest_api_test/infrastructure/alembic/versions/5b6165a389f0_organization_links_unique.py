@@ -0,0 +1,46 @@
+"""organization links unique
+
+Revision ID: 5b6165a389f0
+Revises: e6cfca17be96
+Create Date: 2026-10-18 15:02:37.904113
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b6165a389f0"
+down_revision: str | Sequence[str] | None = "e6cfca17be96"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+LINK_TABLES = (
+    ("organizations_activities_map", "activity_id"),
+    ("organizations_pnumbers_map", "phone_number_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, target in LINK_TABLES:
+        # Duplicated links could be inserted before, keep the first one
+        op.execute(
+            f"""
+            DELETE FROM {table} AS dup
+            USING {table} AS kept
+            WHERE dup.organization_id = kept.organization_id
+              AND dup.{target} = kept.{target}
+              AND dup.id > kept.id
+            """
+        )
+        op.create_unique_constraint(
+            op.f(f"uq_{table}_organization_id"), table, ["organization_id", target]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in LINK_TABLES:
+        op.drop_constraint(op.f(f"uq_{table}_organization_id"), table, type_="unique")
@@ -0,0 +1,53 @@
+"""buildings geo columns
+
+Revision ID: 9be8791fad4b
+Revises: e99e1b99ef4c
+Create Date: 2026-10-18 10:12:41.517203
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9be8791fad4b"
+down_revision: str | Sequence[str] | None = "e99e1b99ef4c"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "buildings",
+        sa.Column(
+            "lat_rad",
+            sa.Double(),
+            sa.Computed("radians(latitude::double precision)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "buildings",
+        sa.Column(
+            "lon_rad",
+            sa.Double(),
+            sa.Computed("radians(longitude::double precision)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_buildings_latitude_longitude",
+        "buildings",
+        ["latitude", "longitude"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_buildings_latitude_longitude", table_name="buildings")
+    op.drop_column("buildings", "lon_rad")
+    op.drop_column("buildings", "lat_rad")
@@ -0,0 +1,40 @@
+"""organizations name trgm
+
+Revision ID: e6cfca17be96
+Revises: 24091e0fbf07
+Create Date: 2026-10-18 14:21:09.338560
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6cfca17be96"
+down_revision: str | Sequence[str] | None = "24091e0fbf07"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_organizations_name_trgm",
+        "organizations",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_organizations_name_trgm",
+        table_name="organizations",
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
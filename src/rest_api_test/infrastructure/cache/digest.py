@@ -0,0 +1,6 @@
+from hashlib import blake2b
+
+
+def body_digest(body: bytes) -> bytes:
+    """Identifies a response body: the ETag and the stored digest of cache entries."""
+    return blake2b(body, digest_size=16).digest()
@@ -0,0 +1,20 @@
+from collections.abc import Iterable
+from contextvars import ContextVar
+
+# Tags of the response being built, None outside of a cache miss
+_response_tags: ContextVar[set[str] | None] = ContextVar("response_tags", default=None)
+
+
+def collect_response_tags() -> None:
+    """Called by the cache backend on lookup, the handler runs in the same context."""
+    _response_tags.set(set())
+
+
+def tag_response(tags: Iterable[str]) -> None:
+    collected = _response_tags.get()
+    if collected is not None:
+        collected.update(tags)
+
+
+def response_tags() -> set[str]:
+    return _response_tags.get() or set()
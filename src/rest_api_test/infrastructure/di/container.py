@@ -3,10 +3,34 @@ from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
 
 from rest_api_test.application.activities.service import ActivityService
 from rest_api_test.application.buildings.service import BuildingService
+from rest_api_test.application.cache.entities import EntityCacheInvalidator
+from rest_api_test.application.cache.invalidation import CompositeCacheInvalidator
+from rest_api_test.application.cache.repos import (
+    CachedActivityRepository,
+    CachedBuildingRepository,
+    CachedOrganizationRepository,
+    CachedPhoneNumberRepository,
+)
 from rest_api_test.application.data_filler.filler import DataFiller
 from rest_api_test.application.organizations.service import OrganizationService
 from rest_api_test.application.phone_numbers.service import PhoneNumberService
+from rest_api_test.infrastructure.memory.activity_forest import InMemoryActivityForest
+from rest_api_test.infrastructure.memory.cache_metrics import CacheMetrics
+from rest_api_test.infrastructure.memory.rate_limiter import LocalRateLimiter
+from rest_api_test.infrastructure.numpy.spatial_index import NumpyBuildingIndex
 from rest_api_test.infrastructure.redis.cache import RedisCache
+from rest_api_test.infrastructure.redis.codec import CacheCodec
+from rest_api_test.infrastructure.redis.rate_limiter import RedisRateLimiter
+from rest_api_test.infrastructure.redis.response_cache import (
+    RedisCacheInvalidator,
+    TaggedRedisBackend,
+)
+from rest_api_test.infrastructure.redis.snapshot_feed import (
+    FeedActivityForest,
+    FeedBuildingIndex,
+    SnapshotFeed,
+)
+from rest_api_test.infrastructure.redis.two_tier_cache import TwoTierCache
 from rest_api_test.infrastructure.sqlalchemy.activities.repo import AlchemyActivityRepo
 from rest_api_test.infrastructure.sqlalchemy.buildings.repo import AlchemyBuildingRepo
 from rest_api_test.infrastructure.sqlalchemy.organizations.repo import (
@@ -32,16 +56,126 @@ class Container(containers.DeclarativeContainer):
         settings.redis_dsn,
     )
 
-    key_value_cache = providers.Singleton(RedisCache, redis_client=redis)
+    cache_metrics = providers.Singleton(CacheMetrics)
+    cache_codec = providers.Singleton(
+        CacheCodec,
+        compression=settings.cache_compression,
+        min_size=settings.cache_compression_min_bytes,
+        level=settings.cache_compression_level,
+    )
+    redis_cache = providers.Singleton(
+        RedisCache, redis_client=redis, codec=cache_codec, metrics=cache_metrics
+    )
+    key_value_cache = (
+        providers.Singleton(
+            TwoTierCache,
+            l2=redis_cache,
+            redis_client=redis,
+            l1_max_entries=settings.cache_l1_max_entries,
+            l1_max_bytes=settings.cache_l1_max_bytes,
+            l1_ttl_s=settings.cache_l1_ttl_s,
+            metrics=cache_metrics,
+        )
+        if settings.cache_l1_enabled
+        else redis_cache
+    )
+
+    response_cache_backend = providers.Singleton(
+        TaggedRedisBackend,
+        redis=redis,
+        lock_ttl_s=settings.cache_lock_ttl_s,
+        lock_wait_s=settings.cache_lock_wait_s,
+        codec=cache_codec,
+        metrics=cache_metrics,
+    )
+    response_cache_invalidator = providers.Singleton(
+        RedisCacheInvalidator, redis=redis, metrics=cache_metrics
+    )
+    cache_invalidator = (
+        providers.Singleton(
+            CompositeCacheInvalidator,
+            invalidators=providers.List(
+                response_cache_invalidator,
+                providers.Singleton(EntityCacheInvalidator, cache=key_value_cache),
+            ),
+        )
+        if settings.entity_cache_enabled
+        else response_cache_invalidator
+    )
+
+    local_rate_limiter = providers.Singleton(LocalRateLimiter)
+    rate_limiter = (
+        providers.Singleton(
+            RedisRateLimiter,
+            redis=redis,
+            local=local_rate_limiter,
+            lease_size=settings.rate_limit_lease_size,
+        )
+        if settings.rate_limit_cluster
+        else local_rate_limiter
+    )
+
+    snapshot_feed = providers.Singleton(SnapshotFeed, redis_client=redis)
+    buildings_spatial_index = (
+        providers.Singleton(
+            FeedBuildingIndex,
+            inner=providers.Singleton(NumpyBuildingIndex),
+            feed=snapshot_feed,
+        )
+        if settings.geo_index_enabled
+        else providers.Object(None)
+    )
+
+    activity_forest = (
+        providers.Singleton(
+            FeedActivityForest,
+            inner=providers.Singleton(InMemoryActivityForest),
+            feed=snapshot_feed,
+        )
+        if settings.activity_forest_enabled
+        else providers.Object(None)
+    )
 
     al_session = providers.ContextLocalSingleton(async_session_factory)
 
     alchemy_uow = providers.Factory(AlchemyUnitOfWork, session=al_session)
 
-    orgs_repo = providers.Factory(AlchemyOrganizationRepo, session=al_session)
-    acts_repo = providers.Factory(AlchemyActivityRepo, session=al_session)
-    pn_repo = providers.Factory(AlchemyPhoneNumberRepo, session=al_session)
-    blds_repo = providers.Factory(AlchemyBuildingRepo, session=al_session)
+    al_orgs_repo = providers.Factory(AlchemyOrganizationRepo, session=al_session)
+    al_acts_repo = providers.Factory(AlchemyActivityRepo, session=al_session)
+    al_pn_repo = providers.Factory(AlchemyPhoneNumberRepo, session=al_session)
+    al_blds_repo = providers.Factory(AlchemyBuildingRepo, session=al_session)
+
+    if settings.entity_cache_enabled:
+        blds_repo = providers.Factory(
+            CachedBuildingRepository,
+            inner=al_blds_repo,
+            cache=key_value_cache,
+            ttl_s=settings.entity_cache_ttl_s,
+        )
+        orgs_repo = providers.Factory(
+            CachedOrganizationRepository,
+            inner=al_orgs_repo,
+            buildings=blds_repo,
+            cache=key_value_cache,
+            ttl_s=settings.entity_cache_ttl_s,
+        )
+        acts_repo = providers.Factory(
+            CachedActivityRepository,
+            inner=al_acts_repo,
+            cache=key_value_cache,
+            ttl_s=settings.entity_cache_ttl_s,
+        )
+        pn_repo = providers.Factory(
+            CachedPhoneNumberRepository,
+            inner=al_pn_repo,
+            cache=key_value_cache,
+            ttl_s=settings.entity_cache_ttl_s,
+        )
+    else:
+        orgs_repo = al_orgs_repo
+        acts_repo = al_acts_repo
+        pn_repo = al_pn_repo
+        blds_repo = al_blds_repo
 
     orgs_service = providers.Factory(
         OrganizationService,
@@ -50,15 +184,29 @@ class Container(containers.DeclarativeContainer):
         build_repo=blds_repo,
         activity_repo=acts_repo,
         phone_repo=pn_repo,
+        spatial_index=buildings_spatial_index,
+        activity_forest=activity_forest,
+        cache_invalidator=cache_invalidator,
     )
     activities_service = providers.Factory(
-        ActivityService, uow=alchemy_uow, repo=acts_repo
+        ActivityService,
+        uow=alchemy_uow,
+        repo=acts_repo,
+        forest=activity_forest,
+        cache_invalidator=cache_invalidator,
     )
     buildings_service = providers.Factory(
-        BuildingService, uow=alchemy_uow, repo=blds_repo
+        BuildingService,
+        uow=alchemy_uow,
+        repo=blds_repo,
+        spatial_index=buildings_spatial_index,
+        cache_invalidator=cache_invalidator,
     )
     phone_numbers_service = providers.Factory(
-        PhoneNumberService, uow=alchemy_uow, repo=pn_repo
+        PhoneNumberService,
+        uow=alchemy_uow,
+        repo=pn_repo,
+        cache_invalidator=cache_invalidator,
     )
     data_filler = providers.Factory(
         DataFiller,
@@ -67,4 +215,5 @@ class Container(containers.DeclarativeContainer):
         pn_repo=pn_repo,
         building_repo=blds_repo,
         uow=alchemy_uow,
+        cache_invalidator=cache_invalidator,
     )
@@ -0,0 +1,53 @@
+from collections.abc import Callable
+from typing import Any
+
+from fastapi_cache.key_builder import default_key_builder
+from starlette.requests import Request
+from starlette.responses import Response
+
+KeyBuilder = Callable[..., str]
+
+
+def snapshot_key_builder(*snapshots: str) -> KeyBuilder:
+    """
+    fastapi-cache key builder of responses built from in-process snapshots,
+    named by their container providers: the version of each (a hash of its
+    content, the same in all workers with the same data) is part of the key,
+    so a cached response isn't served once the data changed, nor one built
+    by a worker that hasn't seen a change yet, and workers share entries of
+    the same snapshot.
+    """
+
+    def key_builder(
+        func: Callable[..., Any],
+        namespace: str = "",
+        *,
+        request: Request | None = None,
+        response: Response | None = None,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> str:
+        key = default_key_builder(
+            func,
+            namespace,
+            request=request,
+            response=response,
+            args=args,
+            kwargs=kwargs,
+        )
+        container = getattr(request.app, "container", None) if request else None
+        if container is None:
+            return key
+        for name in snapshots:
+            snapshot = getattr(container, name)()
+            if snapshot is not None:
+                key = f"{key}:v{snapshot.version}"
+        return key
+
+    return key_builder
+
+
+activity_forest_key_builder = snapshot_key_builder("activity_forest")
+organizations_key_builder = snapshot_key_builder(
+    "activity_forest", "buildings_spatial_index"
+)
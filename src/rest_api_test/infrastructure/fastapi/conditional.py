@@ -0,0 +1,58 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Headers a 304 repeats from the response it stands for (RFC 9110, 15.4.5)
+_NOT_MODIFIED_HEADERS = ("cache-control", "etag", "last-modified", "vary", "x-cache")
+
+
+def set_validators(
+    response: Response, digest: bytes, last_modified: datetime | None
+) -> None:
+    response.headers["ETag"] = f'"{digest.hex()}"'
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(UTC), usegmt=True
+        )
+
+
+def is_not_modified(request: Request, response: Response) -> bool:
+    """
+    Evaluates If-None-Match / If-Modified-Since against the validators of
+    `response`. If-Modified-Since is ignored when If-None-Match is present.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = response.headers.get("etag")
+        if etag is None:
+            return False
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = response.headers.get("last-modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def not_modified(response: Response) -> Response:
+    return Response(
+        status_code=304,
+        headers={
+            name: value
+            for name, value in response.headers.items()
+            if name in _NOT_MODIFIED_HEADERS
+        },
+        background=response.background,
+    )
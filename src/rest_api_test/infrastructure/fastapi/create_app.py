@@ -1,21 +1,47 @@
-from contextlib import asynccontextmanager
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 
 from rest_api_test.infrastructure.di.container import Container
 from rest_api_test.infrastructure.fastapi.middlewares.api_key import (
+    ApiKeyMiddleware,
+    ApiKeyRing,
     enable_api_key_in_swagger,
-    register_api_key_middleware,
+    load_api_keys,
 )
+from rest_api_test.infrastructure.fastapi.middlewares.compression import (
+    CompressionMiddleware,
+    get_response_compressor,
+)
+from rest_api_test.infrastructure.fastapi.middlewares.rate_limit import (
+    RateLimitHeadersMiddleware,
+)
+from rest_api_test.infrastructure.fastapi.serialization import RawJsonCoder
+from rest_api_test.infrastructure.redis.response_cache import RESPONSE_CACHE_PREFIX
 from rest_api_test.utils.config.settings import get_settings
+from rest_api_test.utils.logging.logger import get_logger
 
+from .dependencies.rate_limit import rate_limit
 from .endpoints import api_v1_router
 from .error_handler import register_error_handlers
 
 settings = get_settings()
+logger = get_logger(__name__)
+
+
+async def _refresh_periodically(
+    name: str, interval_s: int, rebuild: Callable[[], Awaitable[None]]
+) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await rebuild()
+        except Exception:
+            logger.exception("%s refresh failed", name)
 
 
 @asynccontextmanager
@@ -26,9 +52,70 @@ async def lifespan(app: FastAPI):
 
     app.container = container  # type: ignore[reportAttributeAccessIssue]
     redis = container.redis()
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(
+        container.response_cache_backend(),
+        prefix=RESPONSE_CACHE_PREFIX,
+        coder=RawJsonCoder,
+    )
+
+    background_tasks: list[asyncio.Task[None]] = []
+    if settings.api_keys_file and settings.api_keys_reload_s:
+
+        async def reload_api_keys() -> None:
+            app.state.api_keys.replace(
+                load_api_keys(settings.api_token, settings.api_keys_file)
+            )
+
+        background_tasks.append(
+            asyncio.create_task(
+                _refresh_periodically(
+                    "API keys", settings.api_keys_reload_s, reload_api_keys
+                )
+            )
+        )
+    if settings.cache_l1_enabled:
+        background_tasks.append(
+            asyncio.create_task(container.key_value_cache().run_invalidation_listener())
+        )
+
+    async def rebuild_snapshots() -> None:
+        if settings.geo_index_enabled:
+            await container.buildings_service().rebuild_spatial_index()
+        if settings.activity_forest_enabled:
+            await container.activities_service().rebuild_forest()
+
+    await rebuild_snapshots()
+    if settings.geo_index_enabled or settings.activity_forest_enabled:
+        # Writes of other workers; rebuilds again once subscribed
+        background_tasks.append(
+            asyncio.create_task(container.snapshot_feed().run(rebuild_snapshots))
+        )
+    if settings.geo_index_enabled and settings.geo_index_refresh_s:
+        background_tasks.append(
+            asyncio.create_task(
+                _refresh_periodically(
+                    "Buildings geo index",
+                    settings.geo_index_refresh_s,
+                    lambda: container.buildings_service().rebuild_spatial_index(),
+                )
+            )
+        )
+    if settings.activity_forest_enabled and settings.activity_forest_refresh_s:
+        background_tasks.append(
+            asyncio.create_task(
+                _refresh_periodically(
+                    "Activity forest",
+                    settings.activity_forest_refresh_s,
+                    lambda: container.activities_service().rebuild_forest(),
+                )
+            )
+        )
 
     yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     await redis.close()
 
 
@@ -43,10 +130,25 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    register_api_key_middleware(
-        app, header_name=settings.api_token_header_name, api_key=settings.api_token
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitHeadersMiddleware)
+
+    compressor = get_response_compressor()
+    if compressor is not None:
+        app.add_middleware(CompressionMiddleware, compressor=compressor)
+
+    app.state.api_keys = ApiKeyRing(
+        load_api_keys(settings.api_token, settings.api_keys_file)
+    )
+    app.add_middleware(
+        ApiKeyMiddleware,
+        header_name=settings.api_token_header_name,
+        key_ring=app.state.api_keys,
     )
     enable_api_key_in_swagger(app, settings.api_token_header_name)
-    app.include_router(api_v1_router)
+    app.include_router(
+        api_v1_router,
+        dependencies=[Depends(rate_limit)] if settings.rate_limit_enabled else None,
+    )
     register_error_handlers(app)
     return app
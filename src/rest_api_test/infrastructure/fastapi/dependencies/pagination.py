@@ -1,9 +1,62 @@
-from fastapi import Query
+from __future__ import annotations
 
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Protocol
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+
+from rest_api_test.application.interfaces.common.pagination import (
+    Pagination,
+    RawJsonPage,
+)
+from rest_api_test.infrastructure.fastapi.responses import RawJSONResponse
+
+
+class HasId(Protocol):
+    @property
+    def id(self) -> UUID: ...
 
 
 def get_pagination(
-    limit: int = Query(10, ge=1, le=100), offset: int = Query(0, ge=0)
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(
+        None,
+        description=(
+            "Opaque keyset cursor. Pass an empty value to start from the first "
+            "page, then the `next_cursor` of the previous response."
+        ),
+    ),
 ) -> Pagination:
-    return Pagination(limit=limit, offset=offset)
+    if cursor is None:
+        return Pagination(limit=limit, offset=offset)
+    if offset:
+        raise HTTPException(422, "offset cannot be combined with cursor")
+    after_id = decode_cursor(cursor) if cursor else None
+    return Pagination(limit=limit, keyset=True, after_id=after_id)
+
+
+def encode_cursor(last_id: UUID) -> str:
+    return urlsafe_b64encode(last_id.bytes).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> UUID:
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return UUID(bytes=raw)
+    except (BinasciiError, ValueError) as e:
+        raise HTTPException(422, "Invalid cursor") from e
+
+
+def paginate_raw(page: RawJsonPage, pagination: Pagination) -> RawJSONResponse:
+    """`paginate` for pages serialized by the database, the items are not parsed."""
+    if not pagination.keyset:
+        return RawJSONResponse(page.items)
+    next_cursor = b"null"
+    if page.count == pagination.limit and page.last_id is not None:
+        next_cursor = b'"' + encode_cursor(page.last_id).encode() + b'"'
+    return RawJSONResponse(
+        b'{"items":' + page.items + b',"next_cursor":' + next_cursor + b"}"
+    )
@@ -0,0 +1,48 @@
+from functools import cache
+
+from starlette.requests import Request
+
+from rest_api_test.application.exceptions.app_error import RateLimited
+from rest_api_test.application.interfaces.common.rate_limiter import RateLimit
+from rest_api_test.infrastructure.fastapi.middlewares.api_key import API_KEY_STATE
+from rest_api_test.infrastructure.fastapi.middlewares.rate_limit import RATE_LIMIT_STATE
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
+
+
+@cache
+def _default_limit() -> RateLimit:
+    return RateLimit(settings.rate_limit_per_s, settings.rate_limit_burst)
+
+
+@cache
+def _route_limits() -> dict[str, RateLimit]:
+    return {
+        name: RateLimit.parse(value)
+        for name, value in settings.rate_limit_routes.items()
+    }
+
+
+async def rate_limit(request: Request) -> None:
+    """
+    Router dependency: takes a token of the bucket of the request's API key
+    and route (by route name, limit from `rate_limit_routes` or the default)
+    and raises RateLimited without one.
+    """
+    container = getattr(request.app, "container", None)
+    if container is None:
+        return
+    route = request.scope.get("route")
+    route_name = getattr(route, "name", None) or request.url.path
+    key_id = request.scope.get("state", {}).get(API_KEY_STATE)
+    if key_id is None:
+        key_id = request.client.host if request.client else "anonymous"
+    limit = _route_limits().get(route_name, _default_limit())
+
+    decision = await container.rate_limiter().acquire(f"{key_id}:{route_name}", limit)
+    request.scope.setdefault("state", {})[RATE_LIMIT_STATE] = decision
+    if not decision.allowed:
+        raise RateLimited(
+            f"Rate limit of {route_name} exceeded", decision.retry_after_s
+        )
@@ -2,6 +2,7 @@ from fastapi import APIRouter
 
 from .v1.activities import activities_router
 from .v1.buildings import buildings_router
+from .v1.cache import cache_router
 from .v1.db_filler import fillers_router
 from .v1.organizations import organizations_router
 from .v1.phone_numbers import phone_numbers_router
@@ -12,3 +13,4 @@ api_v1_router.include_router(buildings_router)
 api_v1_router.include_router(activities_router)
 api_v1_router.include_router(phone_numbers_router)
 api_v1_router.include_router(fillers_router)
+api_v1_router.include_router(cache_router)
@@ -2,8 +2,7 @@ from typing import Annotated
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, status
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Body, Depends, status
 
 from rest_api_test.application.activities.dto import (
     ActivityIn,
@@ -11,35 +10,55 @@ from rest_api_test.application.activities.dto import (
     ActivityUpdate,
 )
 from rest_api_test.application.activities.service import ActivityService
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.bulk.dto import BulkResult
+from rest_api_test.application.cache.tags import activity_tags
+from rest_api_test.application.interfaces.common.pagination import (
+    CursorPage,
+    Pagination,
+)
+from rest_api_test.domain.activities.model import Activity
 from rest_api_test.infrastructure.di.container import Container
+from rest_api_test.infrastructure.fastapi.cache_keys import activity_forest_key_builder
 from rest_api_test.infrastructure.fastapi.dependencies.pagination import get_pagination
+from rest_api_test.infrastructure.fastapi.response_cache import cached
+from rest_api_test.infrastructure.fastapi.responses import RawJSONResponse
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 activities_router = APIRouter(prefix="/activities", tags=["Activities"])
 
+activities_json = JsonSerializer(Activity, tags=activity_tags)
+
 
-@activities_router.get("/", response_model=list[ActivityOut])
-@cache(10)
+@activities_router.get("/", response_model=list[ActivityOut] | CursorPage[ActivityOut])
+@cached(
+    settings.cache_ttl_s,
+    key_builder=activity_forest_key_builder,
+    stale_s=settings.cache_stale_s,
+)
 @inject
 async def get_activities(
     pagination: Annotated[Pagination, Depends(get_pagination)],
     activities_service: Annotated[
         ActivityService, Depends(Provide[Container.activities_service])
     ],
-) -> list[ActivityOut]:
-    return await activities_service.get_all(pagination)
+) -> RawJSONResponse:
+    activities = await activities_service.get_all(pagination)
+    return activities_json.page(activities, pagination)
 
 
 @activities_router.get("/{activity_id}", response_model=ActivityOut)
-@cache(10)
+@cached(settings.cache_ttl_s, key_builder=activity_forest_key_builder)
 @inject
 async def get_activity(
     activity_id: UUID,
     activities_service: Annotated[
         ActivityService, Depends(Provide[Container.activities_service])
     ],
-) -> ActivityOut:
-    return await activities_service.get_by_id(activity_id)
+) -> RawJSONResponse:
+    return activities_json.one(await activities_service.get_by_id(activity_id))
 
 
 @activities_router.post(
@@ -55,6 +74,19 @@ async def create_activity(
     return await activities_service.create(payload)
 
 
+@activities_router.post("/bulk", response_model=BulkResult)
+@inject
+async def create_activities_bulk(
+    payloads: Annotated[
+        list[ActivityIn], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    activities_service: Annotated[
+        ActivityService, Depends(Provide[Container.activities_service])
+    ],
+) -> BulkResult:
+    return await activities_service.create_many(payloads)
+
+
 @activities_router.put("/{activity_id}", response_model=ActivityOut)
 @inject
 async def update_activity(
@@ -2,8 +2,7 @@ from typing import Annotated
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, status
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Body, Depends, status
 
 from rest_api_test.application.buildings.dto import (
     BuildingIn,
@@ -11,35 +10,49 @@ from rest_api_test.application.buildings.dto import (
     BuildingUpdate,
 )
 from rest_api_test.application.buildings.service import BuildingService
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.bulk.dto import BulkResult
+from rest_api_test.application.interfaces.common.pagination import (
+    CursorPage,
+    Pagination,
+)
+from rest_api_test.domain.buildings.model import Building
 from rest_api_test.infrastructure.di.container import Container
 from rest_api_test.infrastructure.fastapi.dependencies.pagination import get_pagination
+from rest_api_test.infrastructure.fastapi.response_cache import cached
+from rest_api_test.infrastructure.fastapi.responses import RawJSONResponse
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 buildings_router = APIRouter(prefix="/buildings", tags=["Buildings"])
 
+buildings_json = JsonSerializer(Building)
+
 
-@buildings_router.get("/", response_model=list[BuildingOut])
-@cache(10)
+@buildings_router.get("/", response_model=list[BuildingOut] | CursorPage[BuildingOut])
+@cached(settings.cache_ttl_s, stale_s=settings.cache_stale_s)
 @inject
 async def get_buildings(
     pagination: Annotated[Pagination, Depends(get_pagination)],
     buildings_service: Annotated[
         BuildingService, Depends(Provide[Container.buildings_service])
     ],
-) -> list[BuildingOut]:
-    return await buildings_service.get_all(pagination)
+) -> RawJSONResponse:
+    buildings = await buildings_service.get_all(pagination)
+    return buildings_json.page(buildings, pagination)
 
 
 @buildings_router.get("/{building_id}", response_model=BuildingOut)
-@cache(10)
+@cached(settings.cache_ttl_s)
 @inject
 async def get_building(
     building_id: UUID,
     buildings_service: Annotated[
         BuildingService, Depends(Provide[Container.buildings_service])
     ],
-) -> BuildingOut:
-    return await buildings_service.get_by_id(building_id)
+) -> RawJSONResponse:
+    return buildings_json.one(await buildings_service.get_by_id(building_id))
 
 
 @buildings_router.post(
@@ -55,6 +68,19 @@ async def create_building(
     return await buildings_service.create(payload)
 
 
+@buildings_router.post("/bulk", response_model=BulkResult)
+@inject
+async def create_buildings_bulk(
+    payloads: Annotated[
+        list[BuildingIn], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    buildings_service: Annotated[
+        BuildingService, Depends(Provide[Container.buildings_service])
+    ],
+) -> BulkResult:
+    return await buildings_service.create_many(payloads)
+
+
 @buildings_router.put("/{building_id}", response_model=BuildingOut)
 @inject
 async def update_building(
@@ -0,0 +1,56 @@
+from dataclasses import asdict
+from typing import Annotated, Any
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
+
+from rest_api_test.application.interfaces.common.key_value_cache import KeyValueCache
+from rest_api_test.infrastructure.di.container import Container
+from rest_api_test.infrastructure.memory.cache_metrics import CacheMetrics
+from rest_api_test.infrastructure.redis.response_cache import TaggedRedisBackend
+from rest_api_test.infrastructure.redis.two_tier_cache import TwoTierCache
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+cache_router = APIRouter(prefix="/cache", tags=["Cache"])
+
+# Fields of Redis INFO relevant to sizing the cache
+_REDIS_INFO_FIELDS = (
+    "used_memory",
+    "maxmemory",
+    "maxmemory_policy",
+    "evicted_keys",
+    "expired_keys",
+    "keyspace_hits",
+    "keyspace_misses",
+)
+
+
+@cache_router.get("/metrics")
+@inject
+async def get_cache_metrics(
+    metrics: Annotated[CacheMetrics, Depends(Provide[Container.cache_metrics])],
+    response_cache: Annotated[
+        TaggedRedisBackend, Depends(Provide[Container.response_cache_backend])
+    ],
+    key_value_cache: Annotated[
+        KeyValueCache, Depends(Provide[Container.key_value_cache])
+    ],
+    redis: Annotated[Redis, Depends(Provide[Container.redis])],
+) -> dict[str, Any]:
+    """Counters of this worker since its start plus the Redis server's."""
+    snapshot: dict[str, Any] = {
+        "layers": metrics.snapshot(),
+        "single_flight": asdict(response_cache.stats),
+    }
+    if isinstance(key_value_cache, TwoTierCache):
+        snapshot["l1"] = key_value_cache.l1_stats()
+    try:
+        info = await redis.info()  # type: ignore[reportUnknownMemberType]
+    except Exception:
+        logger.warning("Failed to read Redis INFO for the cache metrics")
+        info = {}
+    snapshot["redis"] = {field: info.get(field) for field in _REDIS_INFO_FIELDS}  # type: ignore[reportUnknownMemberType]
+    return snapshot
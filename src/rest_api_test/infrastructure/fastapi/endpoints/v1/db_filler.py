@@ -3,6 +3,7 @@ from typing import Annotated
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, status
 
+from rest_api_test.application.activities.service import ActivityService
 from rest_api_test.application.data_filler.filler import DataFiller
 from rest_api_test.infrastructure.di.container import Container
 
@@ -13,5 +14,10 @@ fillers_router = APIRouter(prefix="/filler", tags=["Database filler"])
 @inject
 async def fill_database(
     data_filler: Annotated[DataFiller, Depends(Provide[Container.data_filler])],
+    activities_service: Annotated[
+        ActivityService, Depends(Provide[Container.activities_service])
+    ],
 ):
     await data_filler.fill_database()
+    # The filler writes through the repos, bypassing the activity forest
+    await activities_service.rebuild_forest()
@@ -2,28 +2,84 @@ from typing import Annotated
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.bulk.dto import BulkResult
+from rest_api_test.application.cache.tags import (
+    collection_tag,
+    entity_tag,
+    organization_tags,
+)
+from rest_api_test.application.interfaces.common.pagination import (
+    CursorPage,
+    Pagination,
+)
 from rest_api_test.application.organizations.dto import (
     GeoBBox,
     GeoFilterKindEnum,
     GeoRadius,
+    NearestOrganizationsQuery,
+    OrganizationActivityLink,
     OrganizationIn,
+    OrganizationNearOut,
     OrganizationOut,
+    OrganizationPhoneNumberLink,
     OrganizationsQuery,
     OrganizationUpdate,
 )
 from rest_api_test.application.organizations.service import OrganizationService
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.buildings.model import Building
+from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
+from rest_api_test.infrastructure.cache.response_tags import tag_response
 from rest_api_test.infrastructure.di.container import Container
-from rest_api_test.infrastructure.fastapi.dependencies.pagination import get_pagination
+from rest_api_test.infrastructure.fastapi.cache_keys import (
+    activity_forest_key_builder,
+    organizations_key_builder,
+)
+from rest_api_test.infrastructure.fastapi.dependencies.pagination import (
+    get_pagination,
+    paginate_raw,
+)
+from rest_api_test.infrastructure.fastapi.response_cache import cached
+from rest_api_test.infrastructure.fastapi.responses import RawJSONResponse
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 organizations_router = APIRouter(prefix="/organizations", tags=["Organizations"])
 
+organizations_json = JsonSerializer(Organization, tags=organization_tags)
+nearest_organizations_json = JsonSerializer(
+    OrganizationNearOut, entity=Organization, tags=organization_tags
+)
+
+# Documents built by Postgres aren't parsed for ids, any linked entity counts
+_JSON_READ_PATH_TAGS = [
+    collection_tag(Building),
+    collection_tag(PhoneNumber),
+    collection_tag(Activity),
+]
+
+
+def _filter_tags(activity_id: UUID | None, by_location: bool) -> list[str]:
+    """
+    Filters on activity subtrees and building locations select different
+    organizations once any activity or building changes.
+    """
+    tags: list[str] = []
+    if activity_id is not None:
+        tags.append(collection_tag(Activity))
+    if by_location:
+        tags.append(collection_tag(Building))
+    return tags
+
 
 async def parse_orgs_query_flat(
     name: str | None = None,
+    search: str | None = Query(None, min_length=1),
     building_id: UUID | None = None,
     activity_id: UUID | None = None,
     geo_kind: GeoFilterKindEnum | None = Query(None),
@@ -50,12 +106,22 @@ async def parse_orgs_query_flat(
         )
 
     return OrganizationsQuery(
-        name=name, building_id=building_id, activity_id=activity_id, geo=geo_obj
+        name=name,
+        search=search,
+        building_id=building_id,
+        activity_id=activity_id,
+        geo=geo_obj,
     )
 
 
-@organizations_router.get("/", response_model=list[OrganizationOut])
-@cache(10)
+@organizations_router.get(
+    "/", response_model=list[OrganizationOut] | CursorPage[OrganizationOut]
+)
+@cached(
+    settings.cache_ttl_s,
+    key_builder=organizations_key_builder,
+    stale_s=settings.cache_stale_s,
+)
 @inject
 async def get_organizations(
     orgs_query: Annotated[OrganizationsQuery, Depends(parse_orgs_query_flat)],
@@ -63,20 +129,50 @@ async def get_organizations(
         OrganizationService, Depends(Provide[Container.orgs_service])
     ],
     pagination: Annotated[Pagination, Depends(get_pagination)],
-):
-    return await orgs_service.get_all(pagination, orgs_query)
+) -> RawJSONResponse:
+    tag_response(_filter_tags(orgs_query.activity_id, orgs_query.geo is not None))
+    if settings.orgs_json_read_path:
+        page = await orgs_service.get_all_json(pagination, orgs_query)
+        tag_response([collection_tag(Organization), *_JSON_READ_PATH_TAGS])
+        return paginate_raw(page, pagination)
+    orgs = await orgs_service.get_all(pagination, orgs_query)
+    return organizations_json.page(orgs, pagination)
+
+
+@organizations_router.get("/nearest", response_model=list[OrganizationNearOut])
+@cached(settings.cache_ttl_s, key_builder=activity_forest_key_builder)
+@inject
+async def get_nearest_organizations(
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    name: str | None = None,
+    activity_id: UUID | None = None,
+) -> RawJSONResponse:
+    query = NearestOrganizationsQuery(
+        lat=lat, lon=lon, k=k, name=name, activity_id=activity_id
+    )
+    tag_response(_filter_tags(activity_id, by_location=True))
+    return nearest_organizations_json.many(await orgs_service.get_nearest(query))
 
 
 @organizations_router.get("/{org_id}", response_model=OrganizationOut)
-@cache(10)
+@cached(settings.cache_ttl_s, key_builder=activity_forest_key_builder)
 @inject
 async def get_organization(
     org_id: UUID,
     orgs_service: Annotated[
         OrganizationService, Depends(Provide[Container.orgs_service])
     ],
-):
-    return await orgs_service.get_by_id(org_id)
+) -> RawJSONResponse:
+    if settings.orgs_json_read_path:
+        doc = await orgs_service.get_by_id_json(org_id)
+        tag_response([entity_tag(Organization, org_id), *_JSON_READ_PATH_TAGS])
+        return RawJSONResponse(doc)
+    return organizations_json.one(await orgs_service.get_by_id(org_id))
 
 
 @organizations_router.post("/", response_model=OrganizationOut)
@@ -90,6 +186,19 @@ async def create_organization(
     return await orgs_service.create(org_payload)
 
 
+@organizations_router.post("/bulk", response_model=BulkResult)
+@inject
+async def create_organizations_bulk(
+    payloads: Annotated[
+        list[OrganizationIn], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+) -> BulkResult:
+    return await orgs_service.create_many(payloads)
+
+
 @organizations_router.post("/activity", status_code=status.HTTP_204_NO_CONTENT)
 @inject
 async def assign_activity(
@@ -138,6 +247,154 @@ async def unassign_phone_number(
     await orgs_service.unassign_phone_number(organization_id, phone_number_id)
 
 
+@organizations_router.post("/activities/bulk", status_code=status.HTTP_204_NO_CONTENT)
+@inject
+async def assign_activities_bulk(
+    links: Annotated[
+        list[OrganizationActivityLink],
+        Body(min_length=1, max_length=settings.bulk_max_items),
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.assign_activities(links)
+
+
+@organizations_router.delete("/activities/bulk", status_code=status.HTTP_204_NO_CONTENT)
+@inject
+async def unassign_activities_bulk(
+    links: Annotated[
+        list[OrganizationActivityLink],
+        Body(min_length=1, max_length=settings.bulk_max_items),
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.unassign_activities(links)
+
+
+@organizations_router.post(
+    "/phone-numbers/bulk", status_code=status.HTTP_204_NO_CONTENT
+)
+@inject
+async def assign_phone_numbers_bulk(
+    links: Annotated[
+        list[OrganizationPhoneNumberLink],
+        Body(min_length=1, max_length=settings.bulk_max_items),
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.assign_phone_numbers(links)
+
+
+@organizations_router.delete(
+    "/phone-numbers/bulk", status_code=status.HTTP_204_NO_CONTENT
+)
+@inject
+async def unassign_phone_numbers_bulk(
+    links: Annotated[
+        list[OrganizationPhoneNumberLink],
+        Body(min_length=1, max_length=settings.bulk_max_items),
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.unassign_phone_numbers(links)
+
+
+@organizations_router.post(
+    "/{org_id}/activities", status_code=status.HTTP_204_NO_CONTENT
+)
+@inject
+async def assign_organization_activities(
+    org_id: UUID,
+    activity_ids: Annotated[
+        list[UUID], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.assign_activities(
+        [
+            OrganizationActivityLink(organization_id=org_id, activity_id=activity_id)
+            for activity_id in activity_ids
+        ]
+    )
+
+
+@organizations_router.delete(
+    "/{org_id}/activities", status_code=status.HTTP_204_NO_CONTENT
+)
+@inject
+async def unassign_organization_activities(
+    org_id: UUID,
+    activity_ids: Annotated[
+        list[UUID], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.unassign_activities(
+        [
+            OrganizationActivityLink(organization_id=org_id, activity_id=activity_id)
+            for activity_id in activity_ids
+        ]
+    )
+
+
+@organizations_router.post(
+    "/{org_id}/phone-numbers", status_code=status.HTTP_204_NO_CONTENT
+)
+@inject
+async def assign_organization_phone_numbers(
+    org_id: UUID,
+    phone_number_ids: Annotated[
+        list[UUID], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.assign_phone_numbers(
+        [
+            OrganizationPhoneNumberLink(
+                organization_id=org_id, phone_number_id=phone_number_id
+            )
+            for phone_number_id in phone_number_ids
+        ]
+    )
+
+
+@organizations_router.delete(
+    "/{org_id}/phone-numbers", status_code=status.HTTP_204_NO_CONTENT
+)
+@inject
+async def unassign_organization_phone_numbers(
+    org_id: UUID,
+    phone_number_ids: Annotated[
+        list[UUID], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    orgs_service: Annotated[
+        OrganizationService, Depends(Provide[Container.orgs_service])
+    ],
+):
+    await orgs_service.unassign_phone_numbers(
+        [
+            OrganizationPhoneNumberLink(
+                organization_id=org_id, phone_number_id=phone_number_id
+            )
+            for phone_number_id in phone_number_ids
+        ]
+    )
+
+
 @organizations_router.put("/{org_id}", response_model=OrganizationOut)
 @inject
 async def update_organization(
@@ -2,44 +2,59 @@ from typing import Annotated
 from uuid import UUID
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, status
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Body, Depends, status
 
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.bulk.dto import BulkResult
+from rest_api_test.application.interfaces.common.pagination import (
+    CursorPage,
+    Pagination,
+)
 from rest_api_test.application.phone_numbers.dto import (
     PhoneNumberIn,
     PhoneNumberOut,
     PhoneNumberUpdate,
 )
 from rest_api_test.application.phone_numbers.service import PhoneNumberService
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
 from rest_api_test.infrastructure.di.container import Container
 from rest_api_test.infrastructure.fastapi.dependencies.pagination import get_pagination
+from rest_api_test.infrastructure.fastapi.response_cache import cached
+from rest_api_test.infrastructure.fastapi.responses import RawJSONResponse
+from rest_api_test.infrastructure.fastapi.serialization import JsonSerializer
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
 
 phone_numbers_router = APIRouter(prefix="/phone-numbers", tags=["Phone numbers"])
 
+phone_numbers_json = JsonSerializer(PhoneNumber)
+
 
-@phone_numbers_router.get("/", response_model=list[PhoneNumberOut])
-@cache(10)
+@phone_numbers_router.get(
+    "/", response_model=list[PhoneNumberOut] | CursorPage[PhoneNumberOut]
+)
+@cached(settings.cache_ttl_s, stale_s=settings.cache_stale_s)
 @inject
 async def get_phone_numbers(
     pagination: Annotated[Pagination, Depends(get_pagination)],
     phone_numbers_service: Annotated[
         PhoneNumberService, Depends(Provide[Container.phone_numbers_service])
     ],
-) -> list[PhoneNumberOut]:
-    return await phone_numbers_service.get_all(pagination)
+) -> RawJSONResponse:
+    phone_numbers = await phone_numbers_service.get_all(pagination)
+    return phone_numbers_json.page(phone_numbers, pagination)
 
 
 @phone_numbers_router.get("/{phone_id}", response_model=PhoneNumberOut)
-@cache(10)
+@cached(settings.cache_ttl_s)
 @inject
 async def get_phone_number(
     phone_id: UUID,
     phone_numbers_service: Annotated[
         PhoneNumberService, Depends(Provide[Container.phone_numbers_service])
     ],
-) -> PhoneNumberOut:
-    return await phone_numbers_service.get_by_id(phone_id)
+) -> RawJSONResponse:
+    return phone_numbers_json.one(await phone_numbers_service.get_by_id(phone_id))
 
 
 @phone_numbers_router.post(
@@ -55,6 +70,19 @@ async def create_phone_number(
     return await phone_numbers_service.create(payload)
 
 
+@phone_numbers_router.post("/bulk", response_model=BulkResult)
+@inject
+async def create_phone_numbers_bulk(
+    payloads: Annotated[
+        list[PhoneNumberIn], Body(min_length=1, max_length=settings.bulk_max_items)
+    ],
+    phone_numbers_service: Annotated[
+        PhoneNumberService, Depends(Provide[Container.phone_numbers_service])
+    ],
+) -> BulkResult:
+    return await phone_numbers_service.create_many(payloads)
+
+
 @phone_numbers_router.put("/{phone_id}", response_model=PhoneNumberOut)
 @inject
 async def update_phone_number(
@@ -1,7 +1,9 @@
+from math import ceil
+
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 
-from rest_api_test.application.exceptions.app_error import AppError
+from rest_api_test.application.exceptions.app_error import AppError, RateLimited
 from rest_api_test.application.exceptions.error_types import ErrorType
 
 HTTP_MAP = {
@@ -21,4 +23,7 @@ def register_error_handlers(app: FastAPI) -> None:
     @app.exception_handler(AppError)
     async def _(request: Request, exc: AppError):
         status_code = HTTP_MAP.get(exc.error_type, 500)
-        return JSONResponse(status_code=status_code, content=str(exc))
+        headers = None
+        if isinstance(exc, RateLimited):
+            headers = {"Retry-After": str(max(1, ceil(exc.retry_after_s)))}
+        return JSONResponse(status_code=status_code, content=str(exc), headers=headers)
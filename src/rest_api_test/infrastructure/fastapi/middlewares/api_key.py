@@ -1,30 +1,96 @@
-import secrets
+import hashlib
+from collections.abc import Mapping
+from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+# Key of the id of the request's API key in the ASGI scope state
+API_KEY_STATE = "api_key"
+_DEFAULT_ALLOW_PATHS = frozenset({"/api/docs", "/openapi.json", "/redoc"})
 
-def register_api_key_middleware(
-    app: FastAPI,
-    *,
-    header_name: str,
-    api_key: str,
-    allow_paths: set[str] = {"/api/docs", "/openapi.json", "/redoc"},
-):
-    @app.middleware("http")
-    async def _(request: Request, call_next):
-        if request.url.path in allow_paths:
-            return await call_next(request)
 
-        supplied_key = request.headers.get(header_name)
+def hash_api_key(key: str | bytes) -> bytes:
+    if isinstance(key, str):
+        key = key.encode()
+    return hashlib.sha256(key).digest()
 
-        if not supplied_key or not secrets.compare_digest(supplied_key, api_key):
-            return JSONResponse(
+
+class ApiKeyRing:
+    """
+    Valid API keys as SHA-256 digests mapped to a key id. Supplied keys are
+    hashed before the lookup, so its timing depends on the digest only, not on
+    how much of a key matched. `replace` swaps the whole set at once.
+    """
+
+    def __init__(self, keys: Mapping[bytes, str] | None = None):
+        self._ids: dict[bytes, str] = dict(keys or {})
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def replace(self, keys: Mapping[bytes, str]) -> None:
+        self._ids = dict(keys)
+
+    def identify(self, key: bytes) -> str | None:
+        """Id of the key, None if it isn't valid."""
+        return self._ids.get(hash_api_key(key))
+
+
+def load_api_keys(api_token: str, keys_file: str | None = None) -> dict[bytes, str]:
+    """
+    `api_token` (id "default") plus the keys of `keys_file`: one hex SHA-256
+    digest per line optionally followed by the key id, `#` starts a comment.
+    """
+    keys = {hash_api_key(api_token): "default"}
+    if keys_file is None:
+        return keys
+    for line in Path(keys_file).read_text().splitlines():
+        digest, _, key_id = line.partition("#")[0].strip().partition(" ")
+        if digest:
+            keys[bytes.fromhex(digest)] = key_id.strip() or digest[:8]
+    return keys
+
+
+class ApiKeyMiddleware:
+    """
+    Rejects requests without a valid key in `header_name` with 401.
+    Plain ASGI: no extra task or body stream per request like
+    `@app.middleware("http")`, and streamed responses pass through. The key id
+    is put in the scope state (`request.state.api_key`).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header_name: str,
+        key_ring: ApiKeyRing,
+        allow_paths: frozenset[str] = _DEFAULT_ALLOW_PATHS,
+    ):
+        self.app = app
+        self._header_name = header_name.lower().encode("latin-1")
+        self._key_ring = key_ring
+        self._allow_paths = allow_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self._allow_paths:
+            await self.app(scope, receive, send)
+            return
+        key_id = None
+        for name, value in scope["headers"]:
+            if name == self._header_name:
+                key_id = self._key_ring.identify(value)
+                break
+        if key_id is None:
+            response = JSONResponse(
                 {"detail": "Invalid or missing API key"}, status_code=401
             )
-
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+        scope.setdefault("state", {})[API_KEY_STATE] = key_id
+        await self.app(scope, receive, send)
 
 
 def enable_api_key_in_swagger(app: FastAPI, header_name: str) -> None:
@@ -0,0 +1,140 @@
+import asyncio
+import gzip
+from functools import cache
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from rest_api_test.utils.config.settings import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency, see the `brotli` extra
+    brotli = None
+
+settings = get_settings()
+
+# Bodies this large are compressed in a worker thread, not on the event loop
+_THREAD_MIN_SIZE = 128 * 1024
+# Only these are worth compressing, the rest is binary or already compressed
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+class ResponseCompressor:
+    """
+    Negotiates the content coding of a response (br if brotli is installed,
+    then gzip) and compresses bodies of at least `minimum_size` bytes.
+    """
+
+    def __init__(self, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self._minimum_size = minimum_size
+        self._gzip_level = gzip_level
+        self._brotli_quality = brotli_quality
+        self._encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def negotiate(self, accept_encoding: str | None) -> str | None:
+        """Preferred supported coding the client accepts, None for identity."""
+        if not accept_encoding:
+            return None
+        accepted: dict[str, float] = {}
+        for item in accept_encoding.split(","):
+            coding, _, params = item.strip().partition(";")
+            quality = 1.0
+            name, _, value = params.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    continue
+            accepted[coding.strip().lower()] = quality
+        for encoding in self._encodings:
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes | None:
+        """None if the body is too small to be worth it."""
+        if len(body) < self._minimum_size:
+            return None
+        if encoding == "br" and brotli is not None:
+            return brotli.compress(body, quality=self._brotli_quality)
+        return gzip.compress(body, self._gzip_level, mtime=0)
+
+    async def compress_async(self, body: bytes, encoding: str) -> bytes | None:
+        if len(body) >= _THREAD_MIN_SIZE:
+            return await asyncio.to_thread(self.compress, body, encoding)
+        return self.compress(body, encoding)
+
+
+@cache
+def get_response_compressor() -> ResponseCompressor | None:
+    """Shared by the middleware and the response cache, None if disabled."""
+    if not settings.http_compression_enabled:
+        return None
+    return ResponseCompressor(
+        settings.http_compression_min_bytes,
+        settings.http_compression_gzip_level,
+        settings.http_compression_brotli_quality,
+    )
+
+
+def set_content_encoding(headers: MutableHeaders, encoding: str, length: int) -> None:
+    headers["Content-Encoding"] = encoding
+    headers["Content-Length"] = str(length)
+    headers.add_vary_header("Accept-Encoding")
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON/text responses sent in one body message. Responses that
+    already have a Content-Encoding (e.g. cache hits stored compressed) and
+    streamed bodies are sent as they are.
+    """
+
+    def __init__(self, app: ASGIApp, compressor: ResponseCompressor):
+        self.app = app
+        self._compressor = compressor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._compressor.negotiate(
+            Headers(scope=scope).get("accept-encoding")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or not content_type.startswith(
+                    _COMPRESSIBLE_TYPES
+                ):
+                    await send(message)
+                else:
+                    start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            initial, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=initial["headers"])
+            compressed = None
+            if not message.get("more_body", False):
+                compressed = await self._compressor.compress_async(body, encoding)
+            if compressed is None:
+                headers.add_vary_header("Accept-Encoding")
+            else:
+                set_content_encoding(headers, encoding, len(compressed))
+                message = {**message, "body": compressed}
+            await send(initial)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,38 @@
+from math import ceil
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from rest_api_test.application.interfaces.common.rate_limiter import RateLimitDecision
+
+# Key of the RateLimitDecision of the request in the ASGI scope state
+RATE_LIMIT_STATE = "rate_limit"
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Adds X-RateLimit-Limit/-Remaining/-Reset (seconds until the bucket is full
+    again) to responses of rate limited requests, 429s included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                decision: RateLimitDecision | None = scope.get("state", {}).get(
+                    RATE_LIMIT_STATE
+                )
+                if decision is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-RateLimit-Limit"] = str(decision.limit)
+                    headers["X-RateLimit-Remaining"] = str(decision.remaining)
+                    headers["X-RateLimit-Reset"] = str(ceil(decision.reset_s))
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
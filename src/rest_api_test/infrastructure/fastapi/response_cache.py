@@ -0,0 +1,168 @@
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from fastapi_cache.types import KeyBuilder
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import Response
+
+from rest_api_test.infrastructure.cache.digest import body_digest
+from rest_api_test.infrastructure.fastapi.conditional import (
+    is_not_modified,
+    not_modified,
+    set_validators,
+)
+from rest_api_test.infrastructure.fastapi.middlewares.compression import (
+    get_response_compressor,
+    set_content_encoding,
+)
+from rest_api_test.infrastructure.redis.response_cache import TaggedRedisBackend
+from rest_api_test.utils.config.settings import get_settings
+
+settings = get_settings()
+
+# Parameters fastapi-cache adds to the route signature
+_INJECTED_PREFIX = "__fastapi_cache_"
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+# Content coding negotiated for the current request, None - identity
+_encoding: ContextVar[str | None] = ContextVar("encoding", default=None)
+
+
+def _vary_by_encoding(key_builder: KeyBuilder | None) -> KeyBuilder:
+    """Entries are stored per content coding, identity keeps the plain key."""
+
+    def build(
+        func: Callable[..., Any],
+        namespace: str = "",
+        *,
+        request: Request | None = None,
+        response: Response | None = None,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> str:
+        key = (key_builder or FastAPICache.get_key_builder())(
+            func,
+            namespace,
+            request=request,
+            response=response,
+            args=args,
+            kwargs=kwargs,
+        )
+        encoding = _encoding.get()
+        return f"{key}:{encoding}" if encoding else key  # type: ignore[reportReturnType]
+
+    return build
+
+
+def cached(
+    expire: int, key_builder: KeyBuilder | None = None, stale_s: int = 0
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    fastapi-cache `cache` that also ends the single-flight of its misses when
+    the route is done: waiters of an entry the route didn't store (it raised,
+    e.g. 404) recompute it instead of waiting for the lock to time out.
+    With `stale_s` an expired entry is served for `stale_s` more seconds while
+    one request refreshes it in the background, after sending its response.
+    Lookups are counted under the route path, the outcome is sent in the
+    X-Cache header if `cache_status_header` is enabled.
+    Responses carry the ETag and Last-Modified of their entry and conditional
+    requests matching them get 304, decided from the cached entry alone.
+    Bodies are compressed for the negotiated content coding before they are
+    stored, so hits are sent without compressing them again.
+    """
+    compressor = get_response_compressor()
+
+    def wrapper(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def encoded(encoding: str | None, **kwargs: Any) -> Any:
+            result = await func(**kwargs)
+            if compressor is None or encoding is None:
+                return result
+            if not isinstance(result, Response):
+                return result
+            compressed = await compressor.compress_async(bytes(result.body), encoding)
+            if compressed is not None:
+                result.body = compressed
+                set_content_encoding(result.headers, encoding, len(compressed))
+                backend = FastAPICache.get_backend()
+                if isinstance(backend, TaggedRedisBackend):
+                    backend.set_body_encoding(encoding)
+            return result
+
+        @wraps(func)
+        async def route_func(**kwargs: Any) -> Any:
+            return await encoded(_encoding.get(), **kwargs)
+
+        cached_func = cache(
+            expire + stale_s, key_builder=_vary_by_encoding(key_builder)
+        )(route_func)
+
+        async def compute(kwargs: dict[str, Any], encoding: str | None) -> bytes:
+            result = await encoded(
+                encoding,
+                **{
+                    k: v
+                    for k, v in kwargs.items()
+                    if not k.startswith(_INJECTED_PREFIX)
+                },
+            )
+            return FastAPICache.get_coder().encode(result)
+
+        @wraps(cached_func)
+        async def inner(*args: Any, **kwargs: Any) -> Any:
+            request: Request | None = kwargs.get(f"{_INJECTED_PREFIX}request")
+            encoding = None
+            if compressor is not None and request is not None:
+                encoding = compressor.negotiate(request.headers.get("accept-encoding"))
+            _encoding.set(encoding)
+            backend = FastAPICache.get_backend()
+            if not isinstance(backend, TaggedRedisBackend):
+                return await cached_func(*args, **kwargs)
+
+            route = getattr(request.scope.get("route"), "path", "") if request else ""
+            backend.begin_request(
+                stale_s,
+                route=route or func.__name__,
+                revalidate=request is not None
+                and request.headers.get("Cache-Control") == "no-cache",
+            )
+            try:
+                result = await cached_func(*args, **kwargs)
+            finally:
+                await backend.finish_request()
+            if not isinstance(result, Response):
+                return result
+            info = backend.entry_info()
+            if info is None:
+                # Entry stored before validators or not stored at all
+                set_validators(result, body_digest(bytes(result.body)), None)
+            else:
+                set_validators(result, info.digest, info.stored_at)
+                if info.encoding and "content-encoding" not in result.headers:
+                    # A hit: the body is stored compressed
+                    set_content_encoding(
+                        result.headers, info.encoding, len(result.body)
+                    )
+            status = backend.cache_status()
+            if settings.cache_status_header and status:
+                result.headers[CACHE_STATUS_HEADER] = status
+            stale_key = backend.stale_key()
+            if stale_key is not None:
+                result.background = BackgroundTask(
+                    backend.refresh,
+                    stale_key,
+                    lambda: compute(kwargs, encoding),
+                    expire + stale_s,
+                )
+            if request is not None and is_not_modified(request, result):
+                return not_modified(result)
+            return result
+
+        return inner
+
+    return wrapper
@@ -0,0 +1,10 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+
+class RawJSONResponse(JSONResponse):
+    """JSON response whose content is already serialized bytes."""
+
+    def render(self, content: Any) -> bytes:
+        return content
@@ -0,0 +1,80 @@
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from fastapi_cache.coder import Coder
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from starlette.responses import Response
+
+from rest_api_test.application.cache.tags import collection_tag, entity_tag
+from rest_api_test.application.interfaces.common.pagination import (
+    Pagination,
+    RawJsonPage,
+)
+from rest_api_test.infrastructure.cache.response_tags import tag_response
+from rest_api_test.infrastructure.fastapi.dependencies.pagination import (
+    HasId,
+    paginate_raw,
+)
+from rest_api_test.infrastructure.fastapi.responses import RawJSONResponse
+
+
+class JsonSerializer[T: HasId]:
+    """
+    Precompiled pydantic serializers of a domain model.
+    Objects are dumped to JSON bytes once, routes return them as is so
+    response_model is only used for the OpenAPI schema.
+    Cached responses are tagged with what they show: `tags` of every object
+    (by default its own entity tag) and the collection tag of `entity` for
+    lists.
+    """
+
+    def __init__(
+        self,
+        model: type[T],
+        entity: type | None = None,
+        tags: Callable[[T], Iterable[str]] | None = None,
+    ):
+        self._one = TypeAdapter(model)
+        self._many = TypeAdapter(list[model])
+        self._entity = entity or model
+        self._tags = tags or (lambda obj: (entity_tag(self._entity, obj.id),))
+
+    def one(self, obj: T) -> RawJSONResponse:
+        tag_response(self._tags(obj))
+        return RawJSONResponse(self._one.dump_json(obj))
+
+    def many(self, items: Sequence[T]) -> RawJSONResponse:
+        self._tag_list(items)
+        return RawJSONResponse(self._many.dump_json(list(items)))
+
+    def page(self, items: Sequence[T], pagination: Pagination) -> RawJSONResponse:
+        self._tag_list(items)
+        page = RawJsonPage(
+            items=self._many.dump_json(list(items)),
+            count=len(items),
+            last_id=items[-1].id if items else None,
+        )
+        return paginate_raw(page, pagination)
+
+    def _tag_list(self, items: Sequence[T]) -> None:
+        tag_response([collection_tag(self._entity)])
+        for item in items:
+            tag_response(self._tags(item))
+
+
+class RawJsonCoder(Coder):
+    """
+    fastapi-cache coder keeping serialized bodies: cache hits are replayed as
+    raw JSON without decoding and validating them against response_model.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, Response):
+            return bytes(value.body)
+        return to_json(value)
+
+    @classmethod
+    def decode(cls, value: bytes) -> RawJSONResponse:
+        return RawJSONResponse(value)
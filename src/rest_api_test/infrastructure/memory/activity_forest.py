@@ -0,0 +1,184 @@
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Awaitable, Callable, Iterable
+from functools import reduce
+from hashlib import blake2b
+from operator import xor
+from time import perf_counter
+from uuid import UUID
+
+from rest_api_test.application.activities.forest import ActivityForest, ActivityNode
+from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class InMemoryActivityForest(ActivityForest):
+    """
+    Activities by id plus a child list per parent (None - roots), both kept
+    sorted by id like the database pages.
+    Trees are built on demand and memoized per (id, depth) until the next
+    change: they are immutable, so pages and parents share the same objects.
+    The version is the XOR of a hash of every node, updated per node on
+    changes, so it doesn't depend on the order of changes or of a rebuild.
+    While a rebuild is loading, writes are also logged with a generation and
+    replayed on top of the loaded nodes if newer than the load.
+    """
+
+    def __init__(self):
+        self._nodes: dict[UUID, ActivityNode] = {}
+        self._children: dict[UUID | None, list[UUID]] = {}
+        self._ids: list[UUID] = []
+        self._trees: dict[tuple[UUID, int], Activity] = {}
+        self._digest = 0
+        self._ready = False
+        # Bumped by every write; writes logged while rebuilds are loading,
+        # a node - upserted, an id - removed
+        self._generation = 0
+        self._loading = 0
+        self._changes: list[tuple[int, ActivityNode | UUID]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def version(self) -> str:
+        return f"{self._digest:016x}"
+
+    async def rebuild(
+        self, load: Callable[[], Awaitable[Iterable[ActivityNode]]]
+    ) -> None:
+        since = self._generation
+        self._loading += 1
+        try:
+            loaded = await load()
+        finally:
+            self._loading -= 1
+        started = perf_counter()
+        self._nodes = {node.id: node for node in loaded}
+        for generation, change in self._changes:
+            if generation > since:
+                self._replay(change)
+        if not self._loading:
+            self._changes.clear()
+        self._ids = sorted(self._nodes)
+        self._children = {}
+        for act_id in self._ids:
+            self._children.setdefault(self._nodes[act_id].parent_id, []).append(act_id)
+        self._ready = True
+        digest = reduce(xor, map(_node_hash, self._nodes.values()), 0)
+        if digest != self._digest:
+            self._digest = digest
+            self._trees.clear()
+        logger.info(
+            "Activity forest rebuilt: %s activities, %.3f s",
+            len(self._ids),
+            perf_counter() - started,
+        )
+
+    def upsert(self, node: ActivityNode) -> None:
+        old = self._nodes.get(node.id)
+        if old is None:
+            insort(self._ids, node.id)
+        if old is None or old.parent_id != node.parent_id:
+            if old is not None:
+                self._unlink(old.parent_id, node.id)
+            insort(self._children.setdefault(node.parent_id, []), node.id)
+        if old is not None:
+            self._digest ^= _node_hash(old)
+        self._nodes[node.id] = node
+        self._digest ^= _node_hash(node)
+        self._trees.clear()
+        self._log(node)
+
+    def remove(self, act_id: UUID) -> None:
+        self._log(act_id)
+        node = self._nodes.pop(act_id, None)
+        if node is None:
+            return
+        del self._ids[bisect_left(self._ids, act_id)]
+        self._unlink(node.parent_id, act_id)
+        self._digest ^= _node_hash(node)
+        roots = self._children.setdefault(None, [])
+        for child_id in self._children.pop(act_id, []):
+            child = self._nodes[child_id]
+            self._nodes[child_id] = child._replace(parent_id=None)
+            self._digest ^= _node_hash(child) ^ _node_hash(self._nodes[child_id])
+            insort(roots, child_id)
+        self._trees.clear()
+
+    def get(self, act_id: UUID, depth: int) -> Activity | None:
+        if act_id not in self._nodes:
+            return None
+        return self._tree(act_id, depth)
+
+    def get_page(self, pagination: Pagination, depth: int) -> list[Activity]:
+        start = pagination.offset
+        if pagination.keyset:
+            start = 0
+            if pagination.after_id is not None:
+                start = bisect_right(self._ids, pagination.after_id)
+        page = self._ids[start : start + pagination.limit]
+        return [self._tree(act_id, depth) for act_id in page]
+
+    def descendant_ids(self, act_id: UUID, depth: int | None = None) -> list[UUID]:
+        if act_id not in self._nodes:
+            return []
+        found = [act_id]
+        level = [act_id]
+        levels = 0
+        while level and (depth is None or levels < depth):
+            level = [c for parent in level for c in self._children.get(parent, ())]
+            found.extend(level)
+            levels += 1
+        return found
+
+    def _tree(self, act_id: UUID, depth: int) -> Activity:
+        # Same shape as the activities mapper: no children -> None
+        key = (act_id, depth)
+        tree = self._trees.get(key)
+        if tree is None:
+            node = self._nodes[act_id]
+            child_ids = self._children.get(act_id) if depth > 0 else None
+            tree = Activity(
+                id=node.id,
+                name=node.name,
+                parent_id=node.parent_id,
+                children=[self._tree(c, depth - 1) for c in child_ids]
+                if child_ids
+                else None,
+            )
+            self._trees[key] = tree
+        return tree
+
+    def _log(self, change: ActivityNode | UUID) -> None:
+        self._generation += 1
+        if self._loading:
+            self._changes.append((self._generation, change))
+
+    def _replay(self, change: ActivityNode | UUID) -> None:
+        """A logged write on `_nodes` only, before the rest is rebuilt."""
+        if isinstance(change, ActivityNode):
+            self._nodes[change.id] = change
+            return
+        if self._nodes.pop(change, None) is None:
+            return
+        for act_id, node in self._nodes.items():
+            if node.parent_id == change:
+                self._nodes[act_id] = node._replace(parent_id=None)
+
+    def _unlink(self, parent_id: UUID | None, act_id: UUID) -> None:
+        siblings = self._children.get(parent_id)
+        if siblings is None:
+            return
+        siblings.remove(act_id)
+        if not siblings:
+            del self._children[parent_id]
+
+
+def _node_hash(node: ActivityNode) -> int:
+    parent = node.parent_id.bytes if node.parent_id else bytes(16)
+    data = node.id.bytes + parent + node.name.encode()
+    return int.from_bytes(blake2b(data, digest_size=8).digest())
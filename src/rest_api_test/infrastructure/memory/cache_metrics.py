@@ -0,0 +1,95 @@
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any
+
+# Upper bounds of the Redis latency buckets in seconds, the last bucket is open
+LATENCY_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+@dataclass
+class CacheCounters:
+    hits: int = 0
+    misses: int = 0
+    # Entries served past their TTL while being refreshed (response cache)
+    stale: int = 0
+    # Entries dropped by writes, invalidations or the L1 bounds
+    evictions: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+    @property
+    def hit_ratio(self) -> float | None:
+        lookups = self.hits + self.stale + self.misses
+        return (self.hits + self.stale) / lookups if lookups else None
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS_S):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum_s = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self._counts[bisect_left(self._buckets, seconds)] += 1
+        self._sum_s += seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counts per bucket upper bound, not cumulative."""
+        bounds = [f"{bound:g}" for bound in self._buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(bounds, self._counts, strict=True)),
+            "count": sum(self._counts),
+            "sum_s": self._sum_s,
+        }
+
+
+class CacheMetrics:
+    """
+    In-process counters of the cache layers: per layer (`response`, `l1`,
+    `key_value`, ...) and name within it - the route for responses, the key
+    namespace (see `key_namespace`) for the key-value cache - plus a histogram
+    of Redis call latency per layer.
+    Counted per worker since the last start. Not thread-safe, meant for a
+    single event loop.
+    """
+
+    def __init__(self):
+        self._counters: defaultdict[str, defaultdict[str, CacheCounters]] = defaultdict(
+            lambda: defaultdict(CacheCounters)
+        )
+        self._latency: defaultdict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+
+    def counters(self, layer: str, name: str) -> CacheCounters:
+        return self._counters[layer][name]
+
+    @contextmanager
+    def redis_call(self, layer: str) -> Iterator[None]:
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._latency[layer].observe(perf_counter() - started)
+
+    def snapshot(self) -> dict[str, Any]:
+        layers: dict[str, Any] = {}
+        for layer, by_name in self._counters.items():
+            layers[layer] = {
+                "names": {
+                    name: {**asdict(c), "hit_ratio": c.hit_ratio}
+                    for name, c in sorted(by_name.items())
+                }
+            }
+        for layer, histogram in self._latency.items():
+            layers.setdefault(layer, {})["redis_latency"] = histogram.snapshot()
+        return layers
+
+
+def key_namespace(key: str) -> str:
+    """First two parts of a key: `entity:Organization:<id>` -> `entity:Organization`."""
+    return ":".join(key.split(":", 2)[:2])
@@ -0,0 +1,50 @@
+import sys
+from collections.abc import Iterable, Sequence
+
+from rest_api_test.application.interfaces.common.key_value_cache import (
+    CacheItem,
+    CacheResponse,
+    KeyValueCache,
+)
+from rest_api_test.infrastructure.memory.lru_cache import LruCache
+
+
+class InMemoryKeyValueCache(KeyValueCache):
+    """Process-local cache for tests and runs without Redis, unbounded by default."""
+
+    def __init__(self, max_entries: int = sys.maxsize, max_bytes: int = sys.maxsize):
+        self._entries = LruCache(max_entries, max_bytes)
+
+    async def get(self, key: str) -> CacheResponse:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: str | bytes, ttl: int) -> None:
+        self._entries.set(key, value.encode() if isinstance(value, str) else value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._entries.delete(key)
+
+    async def get_many(self, keys: Sequence[str]) -> list[CacheResponse]:
+        return [self._entries.get(key) for key in keys]
+
+    async def set_many(self, items: Iterable[CacheItem]) -> None:
+        for key, value, ttl in items:
+            await self.set(key, value, ttl)
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.delete(key)
+
+    async def add(self, key: str, value: str | bytes, ttl: int) -> bool:
+        if self._entries.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def set_many_if(
+        self, items: Iterable[CacheItem], guard_key: str, guard_value: bytes | None
+    ) -> bool:
+        if self._entries.get(guard_key) != guard_value:
+            return False
+        await self.set_many(items)
+        return True
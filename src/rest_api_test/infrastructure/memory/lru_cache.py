@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import NamedTuple
+
+
+class _Entry(NamedTuple):
+    value: bytes
+    expires_at: float
+
+
+class LruCache:
+    """
+    Bounded in-process bytes cache: least recently used entries are dropped
+    once there are more than `max_entries` or their values take more than
+    `max_bytes`; expired entries are dropped when met.
+    Not thread-safe, meant for a single event loop.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        # Entries dropped to stay within the bounds
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.delete(key)
+        if ttl <= 0 or len(value) > self._max_bytes:
+            return
+        self._entries[key] = _Entry(value, monotonic() + ttl)
+        self._bytes += len(value)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.value)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
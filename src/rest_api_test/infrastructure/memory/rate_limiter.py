@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from time import monotonic
+
+from rest_api_test.application.interfaces.common.rate_limiter import (
+    RateLimit,
+    RateLimitDecision,
+    RateLimiter,
+)
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class LocalRateLimiter(RateLimiter):
+    """
+    Token buckets of this process. At most `max_keys` buckets are kept, the
+    least recently used are dropped - a dropped bucket starts full again.
+    Not thread-safe, meant for a single event loop.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+
+    async def acquire(self, key: str, limit: RateLimit) -> RateLimitDecision:
+        return self.try_acquire(key, limit)
+
+    def try_acquire(self, key: str, limit: RateLimit) -> RateLimitDecision:
+        now = monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(limit.burst, now)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(
+                limit.burst,
+                bucket.tokens + (now - bucket.updated_at) * limit.rate_per_s,
+            )
+            bucket.updated_at = now
+
+        allowed = bucket.tokens >= 1
+        if allowed:
+            bucket.tokens -= 1
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit.burst,
+            remaining=int(bucket.tokens),
+            retry_after_s=0.0 if allowed else (1 - bucket.tokens) / limit.rate_per_s,
+            reset_s=(limit.burst - bucket.tokens) / limit.rate_per_s,
+        )
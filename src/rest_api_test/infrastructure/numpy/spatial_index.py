@@ -0,0 +1,247 @@
+import sys
+from collections.abc import Awaitable, Callable, Iterable
+from math import cos, radians
+from time import perf_counter
+from uuid import UUID
+
+from rest_api_test.application.buildings.spatial_index import (
+    BuildingPoint,
+    BuildingSpatialIndex,
+    SpatialIndexStats,
+)
+from rest_api_test.application.organizations.dto import GeoBBox, GeoRadius
+from rest_api_test.utils.config.settings import get_settings
+from rest_api_test.utils.geo import BoundingBox, radius_bounding_boxes
+from rest_api_test.utils.logging.logger import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, see the `geo-index` extra
+    np = None
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Pending changes are merged into the sorted arrays past this size
+_MIN_PENDING_TO_COMPACT = 1024
+
+
+class NumpyBuildingIndex(BuildingSpatialIndex):
+    """
+    Buildings sorted by latitude in contiguous float64 arrays.
+    A query binary-searches the latitude band of its bounding box and evaluates
+    longitude bounds / haversine vectorized over that band only.
+    Writes land in a small pending buffer (plus tombstones in the sorted part)
+    that is merged back once it grows.
+    While a rebuild is loading, writes are also logged with a generation and
+    replayed on top of the loaded points if newer than the load.
+    The version is the XOR of a hash of every point, like the forest's.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError(
+                "numpy is required for the buildings geo index, "
+                "install the 'geo-index' extra or disable GEO_INDEX_ENABLED"
+            )
+        self._lat = np.empty(0, dtype=np.float64)
+        self._lon = np.empty(0, dtype=np.float64)
+        self._ids = np.empty(0, dtype="V16")
+        self._alive = np.empty(0, dtype=np.bool_)
+        self._pos: dict[bytes, int] = {}
+        self._pending: dict[UUID, tuple[float, float]] = {}
+        self._digest = 0
+        self._rebuild_seconds = 0.0
+        # Bumped by every write; writes logged while rebuilds are loading,
+        # None - removed
+        self._generation = 0
+        self._loading = 0
+        self._changes: dict[UUID, tuple[int, tuple[float, float] | None]] = {}
+
+    @property
+    def version(self) -> str:
+        return f"{self._digest:016x}"
+
+    async def rebuild(
+        self, load: Callable[[], Awaitable[Iterable[BuildingPoint]]]
+    ) -> None:
+        since = self._generation
+        self._loading += 1
+        try:
+            points = await load()
+        finally:
+            self._loading -= 1
+        started = perf_counter()
+        merged = {p.id: (p.latitude, p.longitude) for p in points}
+        for bld_id, (generation, coords) in self._changes.items():
+            if generation <= since:
+                continue
+            if coords is None:
+                merged.pop(bld_id, None)
+            else:
+                merged[bld_id] = coords
+        if not self._loading:
+            self._changes.clear()
+        self._load(merged)
+        self._digest = _digest(self._ids, self._lat, self._lon)
+        self._rebuild_seconds = perf_counter() - started
+        stats = self.stats
+        logger.info(
+            "Buildings geo index rebuilt: %s points, %.1f KiB, %.3f s",
+            stats.size,
+            stats.nbytes / 1024,
+            stats.rebuild_seconds,
+        )
+
+    def upsert(self, point: BuildingPoint) -> None:
+        coords = (point.latitude, point.longitude)
+        self._drop(point.id)
+        self._pending[point.id] = coords
+        self._digest ^= _point_hash(point.id, coords)
+        self._log(point.id, coords)
+        self._maybe_compact()
+
+    def remove(self, bld_id: UUID) -> None:
+        self._drop(bld_id)
+        self._log(bld_id, None)
+        self._maybe_compact()
+
+    def query(self, geo: GeoRadius | GeoBBox) -> list[UUID]:
+        if isinstance(geo, GeoRadius):
+            boxes = radius_bounding_boxes(
+                geo.lat, geo.lon, geo.radius_m, settings.earth_radius_m
+            )
+        else:
+            boxes = [BoundingBox(geo.lat_min, geo.lat_max, geo.lon_min, geo.lon_max)]
+
+        found: set[bytes] = set()
+        for box in boxes:
+            lo = int(np.searchsorted(self._lat, box.lat_min, "left"))
+            hi = int(np.searchsorted(self._lat, box.lat_max, "right"))
+            mask = self._alive[lo:hi] & self._matches(
+                self._lat[lo:hi], self._lon[lo:hi], box, geo
+            )
+            found.update(self._ids[lo:hi][mask].tolist())
+
+        if self._pending:
+            pending_ids = list(self._pending)
+            coords = np.array(list(self._pending.values()), dtype=np.float64)
+            mask = np.zeros(len(pending_ids), dtype=np.bool_)
+            for box in boxes:
+                mask |= self._matches(coords[:, 0], coords[:, 1], box, geo)
+            found.update(
+                bld_id.bytes
+                for bld_id, matched in zip(pending_ids, mask.tolist(), strict=True)
+                if matched
+            )
+
+        return [UUID(bytes=raw) for raw in found]
+
+    @property
+    def stats(self) -> SpatialIndexStats:
+        arrays = (
+            self._lat.nbytes + self._lon.nbytes + self._ids.nbytes + self._alive.nbytes
+        )
+        maps = sys.getsizeof(self._pos) + sys.getsizeof(self._pending)
+        return SpatialIndexStats(
+            size=len(self._pos) + len(self._pending),
+            nbytes=arrays + maps,
+            rebuild_seconds=self._rebuild_seconds,
+        )
+
+    def _load(self, points: dict[UUID, tuple[float, float]]) -> None:
+        count = len(points)
+        lat = np.fromiter((c[0] for c in points.values()), np.float64, count)
+        lon = np.fromiter((c[1] for c in points.values()), np.float64, count)
+        ids = np.fromiter((i.bytes for i in points), "V16", count)
+
+        order = np.argsort(lat, kind="stable")
+        self._lat = lat[order]
+        self._lon = lon[order]
+        self._ids = ids[order]
+        self._alive = np.ones(count, dtype=np.bool_)
+        self._pos = {raw: i for i, raw in enumerate(self._ids.tolist())}
+        self._pending = {}
+
+    def _drop(self, bld_id: UUID) -> None:
+        pos = self._pos.pop(bld_id.bytes, None)
+        if pos is not None:
+            self._alive[pos] = False
+            coords = (float(self._lat[pos]), float(self._lon[pos]))
+        else:
+            coords = self._pending.pop(bld_id, None)
+        if coords is not None:
+            self._digest ^= _point_hash(bld_id, coords)
+
+    def _log(self, bld_id: UUID, coords: tuple[float, float] | None) -> None:
+        self._generation += 1
+        if self._loading:
+            self._changes[bld_id] = (self._generation, coords)
+
+    def _maybe_compact(self) -> None:
+        threshold = max(_MIN_PENDING_TO_COMPACT, len(self._lat) // 20)
+        if len(self._pending) < threshold:
+            return
+        alive = np.flatnonzero(self._alive)
+        points = {
+            UUID(bytes=raw): (lat, lon)
+            for raw, lat, lon in zip(
+                self._ids[alive].tolist(),
+                self._lat[alive].tolist(),
+                self._lon[alive].tolist(),
+                strict=True,
+            )
+        }
+        points.update(self._pending)
+        self._load(points)
+
+    def _matches(self, lat, lon, box: BoundingBox, geo: GeoRadius | GeoBBox):
+        mask = (
+            (lat >= box.lat_min)
+            & (lat <= box.lat_max)
+            & (lon >= box.lon_min)
+            & (lon <= box.lon_max)
+        )
+        if isinstance(geo, GeoRadius):
+            mask[mask] = self._within_radius(lat[mask], lon[mask], geo)
+        return mask
+
+    def _within_radius(self, lat, lon, geo: GeoRadius):
+        lat0 = radians(geo.lat)
+        lon0 = radians(geo.lon)
+        lat_rad = np.radians(lat)
+        dlat = lat_rad - lat0
+        dlon = np.radians(lon) - lon0
+        a = (
+            np.sin(dlat / 2.0) ** 2
+            + cos(lat0) * np.cos(lat_rad) * np.sin(dlon / 2.0) ** 2
+        )
+        c = 2.0 * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+        return settings.earth_radius_m * c <= float(geo.radius_m)
+
+
+def _mix(x):
+    """splitmix64 finalizer, vectorized over uint64 arrays."""
+    x = (x ^ (x >> 30)) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> 27)) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> 31)
+
+
+def _digest(ids, lat, lon) -> int:
+    """XOR of the hashes of the points (id, latitude, longitude)."""
+    if not len(ids):
+        return 0
+    words = ids.view(np.uint64).reshape(-1, 2)
+    hashes = _mix(
+        words[:, 0]
+        ^ _mix(words[:, 1] ^ _mix(lat.view(np.uint64) ^ _mix(lon.view(np.uint64))))
+    )
+    return int(np.bitwise_xor.reduce(hashes))
+
+
+def _point_hash(bld_id: UUID, coords: tuple[float, float]) -> int:
+    return _digest(
+        np.array([bld_id.bytes], dtype="V16"),
+        np.array([coords[0]], dtype=np.float64),
+        np.array([coords[1]], dtype=np.float64),
+    )
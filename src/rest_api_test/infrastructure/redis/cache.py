@@ -1,20 +1,176 @@
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import batched
+
 from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
 
 from rest_api_test.application.interfaces.common.key_value_cache import (
+    CacheItem,
     CacheResponse,
     KeyValueCache,
 )
+from rest_api_test.infrastructure.memory.cache_metrics import (
+    CacheCounters,
+    CacheMetrics,
+    key_namespace,
+)
+from rest_api_test.infrastructure.redis.codec import CacheCodec, CodecError
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+METRICS_LAYER = "key_value"
+
+# Keys per MGET/DEL and commands per pipeline: bounds the size of a single
+# request and reply on both sides
+_BATCH_SIZE = 1_000
+
+# KEYS: guard, items. ARGV: whether the guard is expected to exist, its expected
+# value, then value and ttl per item. Nothing is stored if the guard changed.
+_SET_MANY_IF = """
+local current = redis.call('GET', KEYS[1])
+if ARGV[1] == '1' then
+    if current ~= ARGV[2] then
+        return 0
+    end
+elseif current then
+    return 0
+end
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[2 * i - 1], 'EX', ARGV[2 * i])
+end
+return 1
+"""
 
 
 class RedisCache(KeyValueCache):
-    def __init__(self, redis_client: Redis):
+    """
+    Values are stored through `codec` if given, see `CacheCodec`.
+    Lookups, stored bytes (as stored, i.e. compressed) and deletes are counted
+    per key namespace in `metrics`.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        batch_size: int = _BATCH_SIZE,
+        codec: CacheCodec | None = None,
+        metrics: CacheMetrics | None = None,
+    ):
         self._redis_client = redis_client
+        self._batch_size = batch_size
+        self._codec = codec
+        self._metrics = metrics or CacheMetrics()
+        self._set_many_if = redis_client.register_script(_SET_MANY_IF)  # type: ignore[reportUnknownMemberType]
 
     async def get(self, key: str) -> CacheResponse:
-        return await self._redis_client.get(key)  # type: ignore[reportUnknownVariableType]
+        with self._metrics.redis_call(METRICS_LAYER):
+            value = await self._redis_client.get(key)  # type: ignore[reportUnknownVariableType]
+        return self._read(key, value)  # type: ignore[reportUnknownArgumentType]
 
     async def set(self, key: str, value: str | bytes, ttl: int) -> None:
-        await self._redis_client.set(key, value, ex=ttl)  # type: ignore[reportUnknownVariableType]
+        stored = self._write(key, value)
+        with self._metrics.redis_call(METRICS_LAYER):
+            await self._redis_client.set(key, stored, ex=ttl)  # type: ignore[reportUnknownVariableType]
 
     async def delete(self, key: str) -> None:
-        await self._redis_client.delete(key)  # type: ignore[reportUnknownVariableType]
+        self._counters(key).evictions += 1
+        with self._metrics.redis_call(METRICS_LAYER):
+            await self._redis_client.delete(key)  # type: ignore[reportUnknownVariableType]
+
+    async def get_many(self, keys: Sequence[str]) -> list[CacheResponse]:
+        values: list[CacheResponse] = []
+        for batch in self._batches(keys):
+            with self._metrics.redis_call(METRICS_LAYER):
+                values.extend(await self._redis_client.mget(batch))  # type: ignore[reportUnknownArgumentType]
+        return [self._read(key, value) for key, value in zip(keys, values, strict=True)]
+
+    async def get_many_with_ttl(
+        self, keys: Sequence[str]
+    ) -> list[tuple[CacheResponse, float | None]]:
+        values: list[CacheResponse] = []
+        ttls_ms: list[int] = []
+        for batch in self._batches(keys):
+            # MULTI: each value and its TTL as of the same moment
+            async with self._redis_client.pipeline(transaction=True) as pipe:  # type: ignore[reportUnknownMemberType]
+                pipe.mget(batch)  # type: ignore[reportUnknownMemberType]
+                for key in batch:
+                    pipe.pttl(key)  # type: ignore[reportUnknownMemberType]
+                with self._metrics.redis_call(METRICS_LAYER):
+                    batch_values, *batch_ttls = await pipe.execute()  # type: ignore[reportUnknownMemberType]
+            values.extend(batch_values)  # type: ignore[reportUnknownArgumentType]
+            ttls_ms.extend(batch_ttls)  # type: ignore[reportUnknownArgumentType]
+        # PTTL: -1 - no expiry, -2 - missing
+        return [
+            (self._read(key, value), ttl_ms / 1000 if ttl_ms >= 0 else None)
+            for key, value, ttl_ms in zip(keys, values, ttls_ms, strict=True)
+        ]
+
+    async def set_many(self, items: Iterable[CacheItem]) -> None:
+        # SET per key since TTLs differ, one round trip per batch
+        for batch in self._batches(items):
+            async with self._redis_client.pipeline(transaction=False) as pipe:  # type: ignore[reportUnknownMemberType]
+                for key, value, ttl in batch:
+                    pipe.set(key, self._write(key, value), ex=ttl)  # type: ignore[reportUnknownMemberType]
+                with self._metrics.redis_call(METRICS_LAYER):
+                    await pipe.execute()  # type: ignore[reportUnknownMemberType]
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        for batch in self._batches(keys):
+            for key in batch:
+                self._counters(key).evictions += 1
+            with self._metrics.redis_call(METRICS_LAYER):
+                await self._redis_client.delete(*batch)  # type: ignore[reportUnknownVariableType]
+
+    async def add(self, key: str, value: str | bytes, ttl: int) -> bool:
+        stored = self._write(key, value)
+        with self._metrics.redis_call(METRICS_LAYER):
+            added = await self._redis_client.set(key, stored, ex=ttl, nx=True)  # type: ignore[reportUnknownVariableType]
+        return bool(added)  # type: ignore[reportUnknownArgumentType]
+
+    async def set_many_if(
+        self, items: Iterable[CacheItem], guard_key: str, guard_value: bytes | None
+    ) -> bool:
+        # Compared as stored, the codec output of a value is deterministic
+        expected = b""
+        if guard_value is not None:
+            expected = self._codec.encode(guard_value) if self._codec else guard_value
+        keys = [guard_key]
+        args: list[bytes | int] = [int(guard_value is not None), expected]
+        for key, value, ttl in items:
+            keys.append(key)
+            args.extend((self._write(key, value), ttl))
+        with self._metrics.redis_call(METRICS_LAYER):
+            stored = await self._set_many_if(keys=keys, args=args)  # type: ignore[reportUnknownVariableType]
+        return bool(stored)  # type: ignore[reportUnknownArgumentType]
+
+    def _batches[T](self, items: Iterable[T]) -> Iterator[tuple[T, ...]]:
+        return batched(items, self._batch_size, strict=False)
+
+    def _counters(self, key: str) -> CacheCounters:
+        return self._metrics.counters(METRICS_LAYER, key_namespace(key))
+
+    def _write(self, key: str, value: str | bytes) -> bytes:
+        if isinstance(value, str):
+            value = value.encode()
+        if self._codec is not None:
+            value = self._codec.encode(value)
+        self._counters(key).bytes_written += len(value)
+        return value
+
+    def _read(self, key: str, value: CacheResponse) -> CacheResponse:
+        counters = self._counters(key)
+        if value is None:
+            counters.misses += 1
+            return None
+        counters.hits += 1
+        counters.bytes_read += len(value)
+        if self._codec is None:
+            return value
+        try:
+            return self._codec.decode(value)
+        except CodecError:
+            # Written by a newer or differently built worker: a miss here
+            logger.warning("Unreadable cached value of %s", key)
+            counters.hits -= 1
+            counters.misses += 1
+            return None
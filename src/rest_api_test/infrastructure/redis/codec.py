@@ -0,0 +1,99 @@
+"""
+Envelope of values stored in Redis: a 3-byte header (magic, format version,
+compression) followed by the payload, compressed once it reaches `min_size`.
+Values without the header are returned as is, so entries written before
+the codec or with the codec disabled stay readable.
+"""
+
+import zlib
+from collections.abc import Callable
+from typing import NamedTuple
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, see the `cache-compression` extra
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional dependency, see the `cache-compression` extra
+    lz4_frame = None
+
+# Never the first byte of JSON or UTF-8 text
+_MAGIC = 0xC1
+FORMAT_VERSION = 1
+
+
+class CodecError(ValueError):
+    pass
+
+
+class _Compression(NamedTuple):
+    id: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _compressions(level: int | None) -> dict[str, _Compression]:
+    found = {
+        "none": _Compression(0, bytes, bytes),
+        "zlib": _Compression(
+            1,
+            lambda data: zlib.compress(data, 1 if level is None else level),
+            zlib.decompress,
+        ),
+    }
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        decompressor = zstandard.ZstdDecompressor()
+        found["zstd"] = _Compression(2, compressor.compress, decompressor.decompress)
+    if lz4_frame is not None:
+        found["lz4"] = _Compression(
+            3,
+            lambda data: lz4_frame.compress(
+                data, compression_level=0 if level is None else level
+            ),
+            lz4_frame.decompress,
+        )
+    return found
+
+
+def available_compressions() -> list[str]:
+    return list(_compressions(None))
+
+
+class CacheCodec:
+    def __init__(
+        self, compression: str = "zlib", min_size: int = 1024, level: int | None = None
+    ):
+        self._by_name = _compressions(level)
+        if compression not in self._by_name:
+            raise RuntimeError(
+                f"Cache compression '{compression}' is not available, "
+                "install the 'cache-compression' extra or use zlib/none"
+            )
+        self._by_id = {c.id: c for c in self._by_name.values()}
+        self._compression = self._by_name[compression]
+        self._min_size = min_size
+
+    def encode(self, data: bytes, compress: bool = True) -> bytes:
+        """`compress=False` for data known not to compress, e.g. gzip bodies."""
+        compression = self._by_name["none"]
+        if compress and len(data) >= self._min_size:
+            compression = self._compression
+        header = bytes((_MAGIC, FORMAT_VERSION, compression.id))
+        return header + compression.compress(data)
+
+    def decode(self, data: bytes) -> bytes:
+        """Raises CodecError for a version or compression this process can't read."""
+        if not data or data[0] != _MAGIC:
+            return data
+        if len(data) < 3 or data[1] != FORMAT_VERSION:
+            raise CodecError(f"Unknown cache value format {data[1:2]!r}")
+        compression = self._by_id.get(data[2])
+        if compression is None:
+            raise CodecError(f"Cache value compression {data[2]} is not available")
+        try:
+            return compression.decompress(data[3:])
+        except Exception as e:
+            raise CodecError("Corrupted cache value") from e
@@ -0,0 +1,38 @@
+import asyncio
+from collections.abc import Callable
+
+from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
+
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Pause before resubscribing after the pub/sub connection broke
+_RESUBSCRIBE_DELAY_S = 1.0
+
+
+async def listen(
+    redis_client: Redis,
+    channel: str,
+    on_message: Callable[[bytes], None],
+    on_subscribe: Callable[[], None],
+) -> None:
+    """
+    Passes the messages of `channel` to `on_message` until cancelled,
+    resubscribing whenever the connection breaks. `on_subscribe` runs after
+    every (re)subscription: messages may have been missed before it.
+    """
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)  # type: ignore[reportUnknownMemberType]
+        try:
+            await pubsub.subscribe(channel)  # type: ignore[reportUnknownMemberType]
+            on_subscribe()
+            async for message in pubsub.listen():  # type: ignore[reportUnknownMemberType]
+                on_message(message["data"])  # type: ignore[reportUnknownArgumentType]
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Subscription to %s failed", channel)
+            await asyncio.sleep(_RESUBSCRIBE_DELAY_S)
+        finally:
+            await pubsub.close()  # type: ignore[reportUnknownMemberType]
@@ -0,0 +1,174 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+
+from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
+
+from rest_api_test.application.interfaces.common.rate_limiter import (
+    RateLimit,
+    RateLimitDecision,
+    RateLimiter,
+)
+from rest_api_test.infrastructure.memory.rate_limiter import LocalRateLimiter
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# KEYS: bucket. ARGV: rate per second, burst, tokens wanted.
+# Refills the bucket by the time passed (Redis clock, the same for all workers)
+# and grants as many of the wanted tokens as it holds.
+# Returns the tokens granted, the tokens left (as a string, Lua numbers are
+# truncated to integers in replies) and the ms until the next token if none
+# was granted.
+_TAKE_TOKENS = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local elapsed_ms = math.max(0, now_ms - (tonumber(bucket[2]) or now_ms))
+tokens = math.min(burst, tokens + elapsed_ms * rate / 1000)
+local granted = math.min(tonumber(ARGV[3]), math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) * 1000 / rate) + 1000)
+local wait_ms = 0
+if granted == 0 then
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+return {granted, tostring(tokens), wait_ms}
+"""
+
+
+class _Lease:
+    """Tokens taken from the cluster-wide bucket, spent by this process."""
+
+    __slots__ = (
+        "borrowed",
+        "denied_until",
+        "expires_at",
+        "refill",
+        "remote_left",
+        "tokens",
+    )
+
+    def __init__(self):
+        self.tokens = 0
+        self.expires_at = 0.0
+        # Requests allowed locally without a lease, paid from the next ones
+        self.borrowed = 0
+        # The cluster-wide bucket was empty, no token before this time
+        self.denied_until = 0.0
+        # Tokens left in Redis as of the last refill, for X-RateLimit-Remaining
+        self.remote_left = 0
+        self.refill: asyncio.Task[None] | None = None
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Cluster-wide token buckets in Redis with an in-process fast path: a check
+    never waits for Redis.
+    Requests are first checked against `local` with the same limit, so a
+    flood hitting one worker is rejected without a Redis call. Tokens are
+    taken from Redis `lease_size` at a time and spent locally for at most
+    `lease_ttl_s`; the next lease is fetched in the background once half of
+    the current one is spent. Without a lease (a key idle for longer than
+    `lease_ttl_s`, or the next lease still in flight) the local decision
+    answers and the token is paid from the next lease. Once Redis reports
+    the cluster-wide bucket empty, requests are rejected locally until it
+    has a token again.
+    So a worker may exceed the cluster-wide limit by the requests it allows
+    during one Redis round trip. Unspent tokens of an expired lease are lost,
+    which errs on the side of the limit.
+    If Redis fails, only the local limit applies (fail open).
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        local: LocalRateLimiter,
+        lease_size: int = 5,
+        lease_ttl_s: float = 1.0,
+        max_keys: int = 100_000,
+        prefix: str = "rate-limit",
+    ):
+        self._redis = redis
+        self._local = local
+        self._lease_size = lease_size
+        self._lease_ttl_s = lease_ttl_s
+        self._max_keys = max_keys
+        self._prefix = prefix
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+        self._take_tokens = redis.register_script(_TAKE_TOKENS)  # type: ignore[reportUnknownMemberType]
+
+    async def acquire(self, key: str, limit: RateLimit) -> RateLimitDecision:
+        local = self._local.try_acquire(key, limit)
+        if not local.allowed:
+            return local
+
+        now = monotonic()
+        lease = self._lease(key)
+        if lease.expires_at <= now:
+            lease.tokens = 0
+        if lease.tokens > 0:
+            lease.tokens -= 1
+            if lease.tokens <= self._lease_size // 2:
+                self._start_refill(key, lease, limit)
+            remaining = lease.tokens + lease.remote_left
+            return RateLimitDecision(
+                allowed=True,
+                limit=limit.burst,
+                remaining=remaining,
+                retry_after_s=0.0,
+                reset_s=(limit.burst - remaining) / limit.rate_per_s,
+            )
+        if lease.denied_until > now:
+            return RateLimitDecision(
+                allowed=False,
+                limit=limit.burst,
+                remaining=0,
+                retry_after_s=lease.denied_until - now,
+                reset_s=limit.burst / limit.rate_per_s,
+            )
+        lease.borrowed += 1
+        self._start_refill(key, lease, limit)
+        return local
+
+    def _lease(self, key: str) -> _Lease:
+        lease = self._leases.get(key)
+        if lease is not None:
+            self._leases.move_to_end(key)
+            return lease
+        lease = self._leases[key] = _Lease()
+        if len(self._leases) > self._max_keys:
+            self._leases.popitem(last=False)
+        return lease
+
+    def _start_refill(self, key: str, lease: _Lease, limit: RateLimit) -> None:
+        if lease.refill is None:
+            lease.refill = asyncio.create_task(self._refill(key, lease, limit))
+
+    async def _refill(self, key: str, lease: _Lease, limit: RateLimit) -> None:
+        wanted = min(self._lease_size + lease.borrowed, limit.burst)
+        try:
+            granted, left, wait_ms = await self._take_tokens(  # type: ignore[reportUnknownVariableType]
+                keys=[f"{self._prefix}:{key}"],
+                args=[limit.rate_per_s, limit.burst, wanted],
+            )
+        except Exception:
+            logger.warning("Rate limit lease of %s failed, limited locally", key)
+            lease.borrowed = 0
+            return
+        finally:
+            lease.refill = None
+        now = monotonic()
+        if lease.expires_at <= now:
+            lease.tokens = 0
+        # Borrowed tokens not covered yet are paid from the next lease
+        tokens = lease.tokens + int(granted) - lease.borrowed  # type: ignore[reportUnknownArgumentType]
+        lease.tokens = max(0, tokens)
+        lease.borrowed = max(0, -tokens)
+        lease.expires_at = now + self._lease_ttl_s
+        lease.remote_left = int(float(left))  # type: ignore[reportUnknownArgumentType]
+        lease.denied_until = now + int(wait_ms) / 1000  # type: ignore[reportUnknownArgumentType]
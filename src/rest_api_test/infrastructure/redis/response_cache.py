@@ -0,0 +1,480 @@
+import asyncio
+import struct
+from collections.abc import Awaitable, Callable, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from time import perf_counter, time
+from typing import NamedTuple
+from uuid import uuid4
+
+from fastapi_cache.backends.redis import RedisBackend
+from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
+
+from rest_api_test.application.interfaces.common.cache_invalidator import (
+    CacheInvalidator,
+)
+from rest_api_test.infrastructure.cache.digest import body_digest
+from rest_api_test.infrastructure.cache.response_tags import (
+    collect_response_tags,
+    response_tags,
+)
+from rest_api_test.infrastructure.memory.cache_metrics import (
+    CacheCounters,
+    CacheMetrics,
+)
+from rest_api_test.infrastructure.redis.codec import CacheCodec, CodecError
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+RESPONSE_CACHE_PREFIX = "fastapi-cache"
+# Counters per route / evictions per tagged entity, see CacheMetrics
+METRICS_LAYER = "response"
+INVALIDATION_METRICS_LAYER = "response_invalidation"
+
+# KEYS: entry, epoch, tag sets. ARGV: body, ttl, epoch seen on lookup.
+# Nothing is stored if an invalidation ran since the lookup: the body may have
+# been read before the write it would outlive.
+_SET_TAGGED = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[3] then
+    return 0
+end
+local ttl = tonumber(ARGV[2])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+for i = 3, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('TTL', KEYS[i]) < ttl then
+        redis.call('EXPIRE', KEYS[i], ttl)
+    end
+end
+return 1
+"""
+
+# KEYS: epoch, tag sets. Entries are unlinked in batches to keep Lua stack small.
+# Returns the number of entries evicted per tag set.
+_INVALIDATE = """
+redis.call('INCR', KEYS[1])
+local evicted = {}
+for i = 2, #KEYS do
+    local keys = redis.call('SMEMBERS', KEYS[i])
+    local n = 0
+    for j = 1, #keys, 1000 do
+        n = n + redis.call('UNLINK', unpack(keys, j, math.min(j + 999, #keys)))
+    end
+    redis.call('UNLINK', KEYS[i])
+    evicted[i - 1] = n
+end
+return evicted
+"""
+
+# Deletes the recompute lock only if this process still holds it
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Header of stored entries by its first byte (format version): store time (ms
+# since the epoch), digest of the body and, from v1, the content coding of the
+# body. Entries stored before any header are the bare body, which never starts
+# with a version byte.
+_ENTRY_HEADERS = {0x00: struct.Struct(">BQ16s"), 0x01: struct.Struct(">BQ16sB")}
+_ENTRY_VERSION = 0x01
+_CONTENT_CODINGS = (None, "gzip", "br")
+
+# Interval of checks for the entry while another worker recomputes it
+_REMOTE_POLL_S = 0.025
+
+# Epoch seen by the lookup of this request's cache miss
+_lookup_epoch: ContextVar[bytes | None] = ContextVar("lookup_epoch", default=None)
+# Keys this request recomputes for the waiting ones, see `finish_request`
+_led_keys: ContextVar[list[str] | None] = ContextVar("led_keys", default=None)
+# Seconds before its hard TTL an entry of the current route turns stale
+_route_stale_s: ContextVar[int] = ContextVar("route_stale_s", default=0)
+# Stale entry served to this request that it has to refresh
+_stale_key: ContextVar[str | None] = ContextVar("stale_key", default=None)
+# Route of the request, metrics are counted under it
+_route: ContextVar[str] = ContextVar("route", default="")
+# The client asked to bypass cached entries (Cache-Control: no-cache)
+_revalidate: ContextVar[bool] = ContextVar("revalidate", default=False)
+# Outcome of this request's lookup: HIT, STALE or MISS
+_cache_status: ContextVar[str | None] = ContextVar("cache_status", default=None)
+
+
+class EntryInfo(NamedTuple):
+    digest: bytes
+    stored_at: datetime
+    # Content coding of the stored body, None - identity
+    encoding: str | None
+
+
+# Header of the entry this request served or stored
+_entry_info: ContextVar[EntryInfo | None] = ContextVar("entry_info", default=None)
+# Content coding of the body this request is about to store
+_body_encoding: ContextVar[str | None] = ContextVar("body_encoding", default=None)
+
+# Resolved with (ttl, entry) once stored, None if the leader gave up
+type _Flight = asyncio.Future[tuple[int, bytes] | None]
+
+
+@dataclass
+class SingleFlightStats:
+    # Misses that recomputed the response
+    leaders: int = 0
+    # Misses that waited for a computation in this process / in another worker
+    local_waits: int = 0
+    remote_waits: int = 0
+    # Waits that ended with the entry, the rest recomputed it themselves
+    coalesced_hits: int = 0
+    wait_seconds: float = 0.0
+    # Stale entries served and refreshed in the background
+    stale_refreshes: int = 0
+
+
+def _epoch_key(prefix: str) -> str:
+    return f"{prefix}:epoch"
+
+
+def _tag_key(prefix: str, tag: str) -> str:
+    return f"{prefix}:tag:{tag}"
+
+
+class TaggedRedisBackend(RedisBackend):
+    """
+    fastapi-cache backend storing each entry in a Redis set per tag of the
+    response (see `response_tags`), so `RedisCacheInvalidator` evicts exactly
+    the entries showing the changed entities.
+
+    Misses are single-flight: concurrent misses of a key in this process wait
+    for the first one to store the entry. Across workers a short Redis lock
+    picks the one that recomputes, the others poll for the entry for up to
+    `lock_wait_s` and recompute themselves only if it doesn't show up.
+    Routes must be wrapped by `cached` so a request that fails to produce the
+    entry releases its waiters.
+
+    Stale-while-revalidate: a route with `stale_s` stores entries for its TTL
+    plus `stale_s`. Past the TTL the entry is still served, and the request that
+    takes the recompute lock refreshes it after its response is sent.
+
+    Bodies are stored through `codec` if given; waiters and hits get the plain
+    JSON body either way.
+
+    Lookups, stored bytes and Redis latency of the lookups are counted per
+    route in `metrics`, single-flight waits in `stats`.
+
+    Entries keep the digest of their body and when they were stored, so a
+    conditional request is answered from the entry (`entry_info`) without
+    recomputing or hashing the body. Bodies may be stored compressed for
+    a content coding (`set_body_encoding`), hits are then sent as they are.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = RESPONSE_CACHE_PREFIX,
+        lock_ttl_s: float = 5.0,
+        lock_wait_s: float = 2.0,
+        codec: CacheCodec | None = None,
+        metrics: CacheMetrics | None = None,
+    ):
+        super().__init__(redis)
+        self._codec = codec
+        self._metrics = metrics or CacheMetrics()
+        self._prefix = prefix
+        self._lock_ttl_s = lock_ttl_s
+        self._lock_wait_s = lock_wait_s
+        self._set_tagged = redis.register_script(_SET_TAGGED)  # type: ignore[reportUnknownMemberType]
+        self._release_lock = redis.register_script(_RELEASE_LOCK)  # type: ignore[reportUnknownMemberType]
+        self._lock_token = uuid4().hex
+        self._flights: dict[str, _Flight] = {}
+        self._locked: set[str] = set()
+        self.stats = SingleFlightStats()
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        _lookup_epoch.set(None)
+        _cache_status.set(None)
+        _entry_info.set(None)
+        collect_response_tags()
+        counters = self._metrics.counters(METRICS_LAYER, _route.get())
+        with self._metrics.redis_call(METRICS_LAYER):
+            async with self.redis.pipeline(transaction=True) as pipe:  # type: ignore[reportUnknownMemberType]
+                ttl, cached, epoch = await (
+                    pipe.ttl(key).get(key).get(_epoch_key(self._prefix)).execute()  # type: ignore[reportUnknownMemberType]
+                )
+        _lookup_epoch.set(epoch or b"0")
+        if _revalidate.get():
+            # Recomputed and stored over the entry, no single-flight
+            self._count(counters, "MISS")
+            return ttl, None
+        if cached is not None:
+            counters.bytes_read += len(cached)
+        cached = self._decode(key, cached)
+        stale_s = _route_stale_s.get()
+        if cached is not None:
+            stale = bool(stale_s) and 0 <= ttl <= stale_s
+            self._count(counters, "STALE" if stale else "HIT")
+            if stale and await self._acquire_lock(key):
+                self.stats.stale_refreshes += 1
+                _stale_key.set(key)
+            return max(ttl - stale_s, 0), self._unpack(cached)
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.stats.local_waits += 1
+            ttl, cached = await self._wait(self._wait_local(flight))
+            self._count(counters, "MISS" if cached is None else "HIT")
+            return max(ttl - stale_s, 0), self._unpack(cached)
+
+        self._lead(key)
+        if await self._acquire_lock(key):
+            self.stats.leaders += 1
+            self._count(counters, "MISS")
+            return ttl, None
+        self.stats.remote_waits += 1
+        found = await self._wait(self._wait_remote(key))
+        ttl, cached = found
+        if cached is None:
+            self.stats.leaders += 1
+            self._count(counters, "MISS")
+            return ttl, None
+        await self._land(key, found)
+        self._count(counters, "HIT")
+        return max(ttl - stale_s, 0), self._unpack(cached)
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        epoch = _lookup_epoch.get()
+        if epoch is None or not expire:
+            # Lookup failed or no TTL: an entry nothing could evict is unsafe
+            return
+        tags = sorted(response_tags())
+        entry = self._pack(value)
+        encoded = (
+            self._codec.encode(entry, compress=_body_encoding.get() is None)
+            if self._codec
+            else entry
+        )
+        with self._metrics.redis_call(METRICS_LAYER):
+            stored = await self._set_tagged(
+                keys=[
+                    key,
+                    _epoch_key(self._prefix),
+                    *(_tag_key(self._prefix, tag) for tag in tags),
+                ],
+                args=[encoded, expire, epoch],
+            )
+        if stored:
+            counters = self._metrics.counters(METRICS_LAYER, _route.get())
+            counters.bytes_written += len(encoded)
+        # Not stored means an invalidation ran meanwhile, waiters recompute
+        await self._land(key, (expire, entry) if stored else None)
+
+    def begin_request(
+        self, stale_s: int, route: str = "", revalidate: bool = False
+    ) -> None:
+        _route_stale_s.set(stale_s)
+        _stale_key.set(None)
+        _route.set(route)
+        _revalidate.set(revalidate)
+        _body_encoding.set(None)
+        _cache_status.set(None)
+
+    def entry_info(self) -> EntryInfo | None:
+        """Of the entry this request served or stored, None for old entries."""
+        return _entry_info.get()
+
+    def set_body_encoding(self, encoding: str | None) -> None:
+        """Content coding of the body this request stores next."""
+        _body_encoding.set(encoding)
+
+    def cache_status(self) -> str | None:
+        """HIT, STALE or MISS of this request's lookup, None if it made none."""
+        return _cache_status.get()
+
+    def stale_key(self) -> str | None:
+        """Key of the stale entry this request served and has to refresh."""
+        return _stale_key.get()
+
+    async def refresh(
+        self, key: str, compute: Callable[[], Awaitable[bytes]], expire: int
+    ) -> None:
+        """Recomputes a stale entry, run after the response holding the lock."""
+        try:
+            epoch = await self.redis.get(_epoch_key(self._prefix))  # type: ignore[reportUnknownMemberType]
+            _lookup_epoch.set(epoch or b"0")
+            collect_response_tags()
+            await self.set(key, await compute(), expire)
+        except Exception:
+            logger.exception("Refresh of the stale cache entry %s failed", key)
+        finally:
+            await self._unlock(key)
+
+    async def finish_request(self) -> None:
+        """Releases the waiters of keys this request didn't store."""
+        led = _led_keys.get()
+        if not led:
+            return
+        for key in led:
+            self._resolve(key, None)
+            await self._unlock(key)
+        led.clear()
+
+    def _count(self, counters: CacheCounters, status: str) -> None:
+        _cache_status.set(status)
+        if status == "HIT":
+            counters.hits += 1
+        elif status == "STALE":
+            counters.stale += 1
+        else:
+            counters.misses += 1
+
+    def _lead(self, key: str) -> None:
+        self._flights[key] = asyncio.get_running_loop().create_future()
+        led = _led_keys.get()
+        if led is None:
+            led = []
+            _led_keys.set(led)
+        led.append(key)
+
+    async def _land(self, key: str, entry: tuple[int, bytes] | None) -> None:
+        led = _led_keys.get()
+        if led and key in led:
+            led.remove(key)
+            self._resolve(key, entry)
+            await self._unlock(key)
+
+    def _resolve(self, key: str, entry: tuple[int, bytes] | None) -> None:
+        flight = self._flights.pop(key, None)
+        if flight is not None and not flight.done():
+            flight.set_result(entry)
+
+    async def _wait(
+        self, waiting: Awaitable[tuple[int, bytes | None]]
+    ) -> tuple[int, bytes | None]:
+        started = perf_counter()
+        try:
+            found = await waiting
+        finally:
+            self.stats.wait_seconds += perf_counter() - started
+        if found[1] is not None:
+            self.stats.coalesced_hits += 1
+        return found
+
+    async def _wait_local(self, flight: _Flight) -> tuple[int, bytes | None]:
+        # The leader may itself wait for another worker first
+        try:
+            entry = await asyncio.wait_for(asyncio.shield(flight), self._lock_ttl_s)
+        except TimeoutError:
+            entry = None
+        return entry or (-2, None)
+
+    async def _wait_remote(self, key: str) -> tuple[int, bytes | None]:
+        deadline = perf_counter() + self._lock_wait_s
+        while perf_counter() < deadline:
+            await asyncio.sleep(_REMOTE_POLL_S)
+            async with self.redis.pipeline(transaction=True) as pipe:  # type: ignore[reportUnknownMemberType]
+                ttl, cached = await pipe.ttl(key).get(key).execute()  # type: ignore[reportUnknownMemberType]
+            cached = self._decode(key, cached)
+            if cached is not None:
+                return ttl, cached
+        return -2, None
+
+    def _pack(self, body: bytes) -> bytes:
+        stored_at = int(time() * 1000)
+        digest = body_digest(body)
+        encoding = _body_encoding.get()
+        _entry_info.set(
+            EntryInfo(digest, datetime.fromtimestamp(stored_at / 1000, UTC), encoding)
+        )
+        header = _ENTRY_HEADERS[_ENTRY_VERSION].pack(
+            _ENTRY_VERSION, stored_at, digest, _CONTENT_CODINGS.index(encoding)
+        )
+        return header + body
+
+    def _unpack(self, entry: bytes | None) -> bytes | None:
+        header = _ENTRY_HEADERS.get(entry[0]) if entry else None
+        if entry is None or header is None:
+            return entry
+        _, stored_at, digest, *coding = header.unpack_from(entry)
+        _entry_info.set(
+            EntryInfo(
+                digest,
+                datetime.fromtimestamp(stored_at / 1000, UTC),
+                _CONTENT_CODINGS[coding[0]] if coding else None,
+            )
+        )
+        return entry[header.size :]
+
+    def _decode(self, key: str, cached: bytes | None) -> bytes | None:
+        if self._codec is None or cached is None:
+            return cached
+        try:
+            return self._codec.decode(cached)
+        except CodecError:
+            # Written by a newer or differently built worker: recomputed here
+            logger.warning("Unreadable cached response %s", key)
+            return None
+
+    async def _acquire_lock(self, key: str) -> bool:
+        acquired = await self.redis.set(  # type: ignore[reportUnknownMemberType]
+            self._lock_key(key),
+            self._lock_token,
+            nx=True,
+            px=int(self._lock_ttl_s * 1000),
+        )
+        if acquired:
+            self._locked.add(key)
+        return bool(acquired)
+
+    async def _unlock(self, key: str) -> None:
+        if key not in self._locked:
+            return
+        self._locked.discard(key)
+        try:
+            await self._release_lock(
+                keys=[self._lock_key(key)], args=[self._lock_token]
+            )
+        except Exception:
+            # Expires on its own within the lock TTL
+            logger.warning("Failed to release the cache lock of %s", key)
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self._prefix}:lock:{key}"
+
+
+class RedisCacheInvalidator(CacheInvalidator):
+    """Evictions are counted per entity of the tags in `metrics`."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = RESPONSE_CACHE_PREFIX,
+        metrics: CacheMetrics | None = None,
+    ):
+        self._prefix = prefix
+        self._invalidate = redis.register_script(_INVALIDATE)  # type: ignore[reportUnknownMemberType]
+        self._metrics = metrics or CacheMetrics()
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = sorted(set(tags))
+        if not tags:
+            return
+        try:
+            with self._metrics.redis_call(INVALIDATION_METRICS_LAYER):
+                evicted = await self._invalidate(
+                    keys=[
+                        _epoch_key(self._prefix),
+                        *(_tag_key(self._prefix, tag) for tag in tags),
+                    ]
+                )
+        except Exception:
+            # The write is committed already, entries expire with their TTL
+            logger.exception("Response cache invalidation failed")
+            return
+        for tag, count in zip(tags, evicted, strict=True):
+            entity = tag.partition(":")[0]
+            self._metrics.counters(
+                INVALIDATION_METRICS_LAYER, entity
+            ).evictions += count
+        logger.debug("Evicted %s cached responses for %s", sum(evicted), tags)
@@ -0,0 +1,211 @@
+import asyncio
+import json
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any
+from uuid import UUID, uuid4
+
+from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
+
+from rest_api_test.application.activities.forest import ActivityForest, ActivityNode
+from rest_api_test.application.buildings.spatial_index import (
+    BuildingPoint,
+    BuildingSpatialIndex,
+    SpatialIndexStats,
+)
+from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.organizations.dto import GeoBBox, GeoRadius
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.infrastructure.redis.pubsub import listen
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_CHANNEL = "snapshots:changes"
+
+# Changes per published message
+_MAX_BATCH = 1_000
+# Snapshot names in messages
+_BUILDINGS = "buildings"
+_ACTIVITIES = "activities"
+
+
+class SnapshotFeed:
+    """
+    Writes to the in-process snapshots (the buildings geo index, the activity
+    forest) made by this process, applied to the snapshots of all other
+    processes on `run`.
+    Snapshot writes are synchronous, so changes are queued and published in
+    order by `run`, batched: the origin and a list of (snapshot, key, change),
+    JSON. Redis delivers messages in one order to all subscribers, so the
+    last change of a key in that order wins: a change of another process to
+    a key this process changed is ignored until the own message comes back,
+    being older. Whenever the subscription is (re)established, messages may
+    have been missed: the snapshots are rebuilt.
+    A change that failed to publish reaches the other processes with their
+    next rebuild only.
+    """
+
+    def __init__(self, redis_client: Redis, channel: str = SNAPSHOT_CHANNEL):
+        self._redis_client = redis_client
+        self._channel = channel
+        self._origin = uuid4().hex
+        self._appliers: dict[str, Callable[[str, Any], None]] = {}
+        self._queue: asyncio.Queue[tuple[str, str, Any]] = asyncio.Queue()
+        # Own changes per (snapshot, key) published but not received back yet
+        self._unechoed: Counter[tuple[str, str]] = Counter()
+        self._resyncs: set[asyncio.Task[None]] = set()
+
+    def register(self, snapshot: str, apply: Callable[[str, Any], None]) -> None:
+        self._appliers[snapshot] = apply
+
+    def publish(self, snapshot: str, key: str, change: Any) -> None:
+        """`change` - JSON-serializable, passed to `apply` of other processes."""
+        self._unechoed[snapshot, key] += 1
+        self._queue.put_nowait((snapshot, key, change))
+
+    async def run(self, resync: Callable[[], Awaitable[None]]) -> None:
+        """Runs until cancelled, started with the app."""
+        sender = asyncio.create_task(self._send())
+        try:
+            await listen(
+                self._redis_client,
+                self._channel,
+                self._on_message,
+                lambda: self._on_subscribe(resync),
+            )
+        finally:
+            sender.cancel()
+            for task in self._resyncs:
+                task.cancel()
+
+    async def _send(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty() and len(batch) < _MAX_BATCH:
+                batch.append(self._queue.get_nowait())
+            message = json.dumps([self._origin, batch])
+            try:
+                await self._redis_client.publish(self._channel, message)  # type: ignore[reportUnknownMemberType]
+            except Exception:
+                logger.exception("Snapshot changes publish failed: %s", len(batch))
+                self._echoed(batch)
+
+    def _on_message(self, data: bytes) -> None:
+        origin, changes = json.loads(data)
+        if origin == self._origin:
+            self._echoed(changes)
+            return
+        for snapshot, key, change in changes:
+            apply = self._appliers.get(snapshot)
+            if apply is not None and (snapshot, key) not in self._unechoed:
+                apply(key, change)
+
+    def _echoed(self, changes: Iterable[Sequence[Any]]) -> None:
+        for snapshot, key, _ in changes:
+            self._unechoed[snapshot, key] -= 1
+            if self._unechoed[snapshot, key] <= 0:
+                del self._unechoed[snapshot, key]
+
+    def _on_subscribe(self, resync: Callable[[], Awaitable[None]]) -> None:
+        # Echoes may have been missed too, the rebuild catches up on all keys
+        self._unechoed.clear()
+        task = asyncio.create_task(self._resync(resync))
+        self._resyncs.add(task)
+        task.add_done_callback(self._resyncs.discard)
+
+    async def _resync(self, resync: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await resync()
+        except Exception:
+            logger.exception("Snapshots resync failed")
+
+
+class FeedBuildingIndex(BuildingSpatialIndex):
+    """`inner` kept in sync with the indexes of other processes by `feed`."""
+
+    def __init__(self, inner: BuildingSpatialIndex, feed: SnapshotFeed):
+        self._inner = inner
+        self._feed = feed
+        feed.register(_BUILDINGS, self._apply)
+
+    @property
+    def version(self) -> str:
+        return self._inner.version
+
+    async def rebuild(
+        self, load: Callable[[], Awaitable[Iterable[BuildingPoint]]]
+    ) -> None:
+        await self._inner.rebuild(load)
+
+    def upsert(self, point: BuildingPoint) -> None:
+        self._inner.upsert(point)
+        self._feed.publish(_BUILDINGS, str(point.id), [point.latitude, point.longitude])
+
+    def remove(self, bld_id: UUID) -> None:
+        self._inner.remove(bld_id)
+        self._feed.publish(_BUILDINGS, str(bld_id), None)
+
+    def query(self, geo: GeoRadius | GeoBBox) -> list[UUID]:
+        return self._inner.query(geo)
+
+    @property
+    def stats(self) -> SpatialIndexStats:
+        return self._inner.stats
+
+    def _apply(self, key: str, change: list[float] | None) -> None:
+        """[latitude, longitude] - upsert, None - remove."""
+        if change is None:
+            self._inner.remove(UUID(key))
+        else:
+            self._inner.upsert(BuildingPoint(UUID(key), *change))
+
+
+class FeedActivityForest(ActivityForest):
+    """`inner` kept in sync with the forests of other processes by `feed`."""
+
+    def __init__(self, inner: ActivityForest, feed: SnapshotFeed):
+        self._inner = inner
+        self._feed = feed
+        feed.register(_ACTIVITIES, self._apply)
+
+    @property
+    def ready(self) -> bool:
+        return self._inner.ready
+
+    @property
+    def version(self) -> str:
+        return self._inner.version
+
+    async def rebuild(
+        self, load: Callable[[], Awaitable[Iterable[ActivityNode]]]
+    ) -> None:
+        await self._inner.rebuild(load)
+
+    def upsert(self, node: ActivityNode) -> None:
+        self._inner.upsert(node)
+        parent_id = str(node.parent_id) if node.parent_id else None
+        self._feed.publish(_ACTIVITIES, str(node.id), [node.name, parent_id])
+
+    def remove(self, act_id: UUID) -> None:
+        self._inner.remove(act_id)
+        self._feed.publish(_ACTIVITIES, str(act_id), None)
+
+    def get(self, act_id: UUID, depth: int) -> Activity | None:
+        return self._inner.get(act_id, depth)
+
+    def get_page(self, pagination: Pagination, depth: int) -> list[Activity]:
+        return self._inner.get_page(pagination, depth)
+
+    def descendant_ids(self, act_id: UUID, depth: int | None = None) -> list[UUID]:
+        return self._inner.descendant_ids(act_id, depth)
+
+    def _apply(self, key: str, change: list[str | None] | None) -> None:
+        """[name, parent id] - upsert, None - remove."""
+        if change is None:
+            self._inner.remove(UUID(key))
+            return
+        name, parent_id = change
+        self._inner.upsert(
+            ActivityNode(UUID(key), name, UUID(parent_id) if parent_id else None)
+        )
@@ -0,0 +1,197 @@
+from collections.abc import Iterable, Sequence
+from uuid import uuid4
+
+from redis.asyncio import Redis  # type: ignore[reportMissingTypeStubs]
+
+from rest_api_test.application.interfaces.common.key_value_cache import (
+    CacheItem,
+    CacheResponse,
+    KeyValueCache,
+)
+from rest_api_test.infrastructure.memory.cache_metrics import (
+    CacheMetrics,
+    key_namespace,
+)
+from rest_api_test.infrastructure.memory.lru_cache import LruCache
+from rest_api_test.infrastructure.redis.pubsub import listen
+from rest_api_test.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+INVALIDATION_CHANNEL = "kv-cache:invalidate"
+METRICS_LAYER = "l1"
+
+
+class TwoTierCache(KeyValueCache):
+    """
+    In-process LRU (L1) in front of a shared cache (L2, Redis).
+    Every set/delete publishes the key, all other processes drop it from their
+    L1 on `run_invalidation_listener`. L1 entries live at most `l1_ttl_s`, which
+    bounds staleness if a message is lost, and never past the TTL left in L2;
+    L1 is also cleared whenever the subscription is (re)established since
+    messages may have been missed.
+    A value read from L2 isn't put into L1 if anything was invalidated or
+    written meanwhile (`_generation` changed): it may be older than that.
+    L1 hits/misses and keys dropped by messages of other processes are counted
+    per key namespace in `metrics`, see `l1_stats` for its size.
+    """
+
+    def __init__(
+        self,
+        l2: KeyValueCache,
+        redis_client: Redis,
+        l1_max_entries: int,
+        l1_max_bytes: int,
+        l1_ttl_s: int,
+        channel: str = INVALIDATION_CHANNEL,
+        metrics: CacheMetrics | None = None,
+    ):
+        self._l1 = LruCache(l1_max_entries, l1_max_bytes)
+        self._l2 = l2
+        self._redis_client = redis_client
+        self._l1_ttl_s = l1_ttl_s
+        self._channel = channel
+        # Own messages are skipped: the local L1 is already up to date
+        self._origin = uuid4().hex
+        # Bumped by every L1 invalidation and write, see `_fill_l1`
+        self._generation = 0
+        self._metrics = metrics or CacheMetrics()
+
+    def l1_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._l1),
+            "bytes": self._l1.size_bytes,
+            "lru_evictions": self._l1.evictions,
+        }
+
+    async def get(self, key: str) -> CacheResponse:
+        value = self._l1_get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        ((value, l2_ttl_s),) = await self._l2.get_many_with_ttl([key])
+        if value is not None:
+            self._fill_l1(key, value, l2_ttl_s, generation)
+        return value
+
+    async def set(self, key: str, value: str | bytes, ttl: int) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        await self._l2.set(key, value, ttl)
+        self._generation += 1
+        self._l1.set(key, value, min(ttl, self._l1_ttl_s))
+        await self._publish([key])
+
+    async def delete(self, key: str) -> None:
+        self._generation += 1
+        self._l1.delete(key)
+        await self._l2.delete(key)
+        await self._publish([key])
+
+    async def get_many(self, keys: Sequence[str]) -> list[CacheResponse]:
+        values = [self._l1_get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+        generation = self._generation
+        found = await self._l2.get_many_with_ttl([keys[i] for i in missing])
+        for i, (value, l2_ttl_s) in zip(missing, found, strict=True):
+            if value is not None:
+                self._fill_l1(keys[i], value, l2_ttl_s, generation)
+                values[i] = value
+        return values
+
+    async def set_many(self, items: Iterable[CacheItem]) -> None:
+        encoded = [
+            (key, value.encode() if isinstance(value, str) else value, ttl)
+            for key, value, ttl in items
+        ]
+        await self._l2.set_many(CacheItem(*item) for item in encoded)
+        self._generation += 1
+        for key, value, ttl in encoded:
+            self._l1.set(key, value, min(ttl, self._l1_ttl_s))
+        await self._publish([key for key, _, _ in encoded])
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        self._generation += 1
+        for key in keys:
+            self._l1.delete(key)
+        await self._l2.delete_many(keys)
+        await self._publish(keys)
+
+    async def add(self, key: str, value: str | bytes, ttl: int) -> bool:
+        if isinstance(value, str):
+            value = value.encode()
+        if not await self._l2.add(key, value, ttl):
+            return False
+        self._generation += 1
+        self._l1.set(key, value, min(ttl, self._l1_ttl_s))
+        await self._publish([key])
+        return True
+
+    async def set_many_if(
+        self, items: Iterable[CacheItem], guard_key: str, guard_value: bytes | None
+    ) -> bool:
+        encoded = [
+            (key, value.encode() if isinstance(value, str) else value, ttl)
+            for key, value, ttl in items
+        ]
+        stored = await self._l2.set_many_if(
+            (CacheItem(*item) for item in encoded), guard_key, guard_value
+        )
+        if not stored:
+            return False
+        self._generation += 1
+        for key, value, ttl in encoded:
+            self._l1.set(key, value, min(ttl, self._l1_ttl_s))
+        await self._publish([key for key, _, _ in encoded])
+        return True
+
+    async def run_invalidation_listener(self) -> None:
+        """Runs until cancelled, started with the app."""
+        await listen(
+            self._redis_client, self._channel, self._on_message, self._clear_l1
+        )
+
+    async def _publish(self, keys: list[str]) -> None:
+        """One message per call: the origin and the keys, newline-separated."""
+        if not keys:
+            return
+        message = "\n".join([self._origin, *keys])
+        try:
+            await self._redis_client.publish(self._channel, message)  # type: ignore[reportUnknownMemberType]
+        except Exception:
+            # Other processes serve their copy until its L1 TTL runs out
+            logger.exception("Cache invalidation publish failed for %s keys", len(keys))
+
+    def _on_message(self, data: bytes) -> None:
+        origin, *keys = data.decode().split("\n")
+        if origin != self._origin:
+            self._generation += 1
+            for key in keys:
+                self._l1.delete(key)
+                self._metrics.counters(METRICS_LAYER, key_namespace(key)).evictions += 1
+
+    def _clear_l1(self) -> None:
+        self._generation += 1
+        self._l1.clear()
+
+    def _fill_l1(
+        self, key: str, value: bytes, l2_ttl_s: float | None, generation: int
+    ) -> None:
+        """`generation` - as of before the L2 read of `value`."""
+        if generation != self._generation:
+            return
+        ttl_s = self._l1_ttl_s if l2_ttl_s is None else min(l2_ttl_s, self._l1_ttl_s)
+        self._l1.set(key, value, ttl_s)
+
+    def _l1_get(self, key: str) -> bytes | None:
+        value = self._l1.get(key)
+        counters = self._metrics.counters(METRICS_LAYER, key_namespace(key))
+        if value is None:
+            counters.misses += 1
+        else:
+            counters.hits += 1
+            counters.bytes_read += len(value)
+        return value
@@ -1,11 +1,13 @@
 from .activities.table import ActivityOrm
 from .buildings.table import BuildingOrm
+from .map_tables.activity_closure import ActivityClosureOrm
 from .map_tables.org_activity import OrganizationActivityMapOrm
 from .map_tables.org_pnumbers import OrganizationPNumbersMapOrm
 from .organizations.table import OrganizationOrm
 from .phone_numbers.table import PhoneNumberOrm
 
 __all__ = [
+    "ActivityClosureOrm",
     "ActivityOrm",
     "BuildingOrm",
     "OrganizationActivityMapOrm",
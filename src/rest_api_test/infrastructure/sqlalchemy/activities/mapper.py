@@ -1,31 +1,54 @@
+from collections.abc import Iterable
+from typing import NamedTuple
+from uuid import UUID
+
 from rest_api_test.domain.activities.model import Activity
-from rest_api_test.utils.config.settings import get_settings
 
 from .table import ActivityOrm
 
-settings = get_settings()
-
-
-def to_domain(entity: ActivityOrm, *, max_depth: int | None = None) -> Activity:
-    depth_limit = max_depth if max_depth is not None else settings.activities_depth
-    return _map_activity(entity, current_depth=0, depth_limit=depth_limit)
-
-
-def _map_activity(
-    entity: ActivityOrm, *, current_depth: int, depth_limit: int
-) -> Activity:
-    children: list[Activity] | None = None
 
-    if current_depth < depth_limit:
-        mapped_children = [
-            _map_activity(
-                child, current_depth=current_depth + 1, depth_limit=depth_limit
+class ActivityTreeRow(NamedTuple):
+    id: UUID
+    parent_id: UUID | None
+    name: str
+    # Distance from the root of the subtree the row was fetched for
+    depth: int
+
+
+def to_domain(entity: ActivityOrm) -> Activity:
+    """The activity alone, trees are assembled by `trees_from_rows`."""
+    return Activity(id=entity.id, name=entity.name, parent_id=entity.parent_id)
+
+
+def trees_from_rows(rows: Iterable[ActivityTreeRow]) -> dict[UUID, Activity]:
+    """
+    Assembles depth-limited trees from the flat rows of their subtrees and
+    returns them by root id.
+    Built bottom-up level by level in one pass over the rows: every node is
+    created once with its final children, and a root wanted by several
+    callers (e.g. linked to many organizations) is a single shared object.
+    Children keep the order of the rows, a node without (loaded) children has
+    children=None.
+    """
+    levels: list[list[ActivityTreeRow]] = []
+    for row in rows:
+        while len(levels) <= row.depth:
+            levels.append([])
+        levels[row.depth].append(row)
+
+    # (parent id, parent depth) -> children built so far
+    children: dict[tuple[UUID | None, int], list[Activity]] = {}
+    roots: dict[UUID, Activity] = {}
+    for depth in range(len(levels) - 1, -1, -1):
+        for row in levels[depth]:
+            node = Activity(
+                id=row.id,
+                name=row.name,
+                parent_id=row.parent_id,
+                children=children.pop((row.id, depth), None),
             )
-            for child in entity.children
-        ]
-        if mapped_children:
-            children = mapped_children
-
-    return Activity(
-        id=entity.id, name=entity.name, parent_id=entity.parent_id, children=children
-    )
+            if depth:
+                children.setdefault((row.parent_id, depth - 1), []).append(node)
+            else:
+                roots[row.id] = node
+    return roots
@@ -1,16 +1,36 @@
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    Uuid,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    insert,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
 
 from rest_api_test.application.activities.dto import ActivityIn, ActivityUpdate
+from rest_api_test.application.activities.forest import ActivityNode
 from rest_api_test.application.activities.repo import ActivityRepository
-from rest_api_test.application.exceptions.app_error import AppError, NotFound
+from rest_api_test.application.exceptions.app_error import (
+    AppError,
+    NotFound,
+    ValidationError,
+)
 from rest_api_test.application.exceptions.error_types import ErrorType
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.domain.activities.model import Activity
-from rest_api_test.infrastructure.sqlalchemy.activities.mapper import to_domain
 from rest_api_test.infrastructure.sqlalchemy.activities.table import ActivityOrm
+from rest_api_test.infrastructure.sqlalchemy.activities.trees import load_activity_trees
+from rest_api_test.infrastructure.sqlalchemy.map_tables.activity_closure import (
+    ActivityClosureOrm,
+)
 from rest_api_test.infrastructure.sqlalchemy.setup.base_repo import AlchemyRepo
 from rest_api_test.utils.config.settings import get_settings
 from rest_api_test.utils.logging.logger import get_logger
@@ -22,52 +42,150 @@ logger = get_logger(__name__)
 class AlchemyActivityRepo(ActivityRepository, AlchemyRepo[ActivityOrm]):
     model = ActivityOrm
 
-    async def get_all(self, pagination: Pagination) -> list[Activity]:
-        query = select(ActivityOrm).options(self._tree_loader())
-        if pagination:
-            query = query.limit(pagination.limit).offset(pagination.offset)
-        res = await self._session.execute(query)
-        rows = res.scalars().all()
-        return [to_domain(row, max_depth=settings.activities_depth) for row in rows]
-
-    async def get_by_id(self, act_id: UUID) -> Activity | None:
-        query = (
-            select(ActivityOrm)
-            .where(ActivityOrm.id == act_id)
-            .options(self._tree_loader())
+    async def get_all(
+        self, pagination: Pagination, depth: int | None = None
+    ) -> list[Activity]:
+        page = self._paginate(select(ActivityOrm.id), pagination).subquery()
+        trees = await load_activity_trees(
+            self._session, ActivityOrm.id.in_(select(page.c.id)), self._depth(depth)
+        )
+        # Same order as the page: by id
+        return [trees[act_id] for act_id in sorted(trees)]
+
+    async def get_by_id(
+        self, act_id: UUID, depth: int | None = None
+    ) -> Activity | None:
+        trees = await load_activity_trees(
+            self._session, ActivityOrm.id == act_id, self._depth(depth)
         )
+        return trees.get(act_id)
+
+    async def get_nodes(self) -> list[ActivityNode]:
+        query = select(ActivityOrm.id, ActivityOrm.name, ActivityOrm.parent_id)
         res = await self._session.execute(query)
-        entity = res.scalar_one_or_none()
-        if entity:
-            return to_domain(entity, max_depth=settings.activities_depth)
-        return None
+        return [ActivityNode(*row) for row in res.tuples()]
 
     async def create(self, data: ActivityIn) -> Activity:
-        entity = await self._create(data.model_dump())
-        entity_with_activities = await self.get_by_id(entity.id)
-        if not entity_with_activities:
-            logger.error(f"Activity {entity} not found right after creation")
-            raise AppError(ErrorType.UNKNOWN, "Internal server error")
-        return entity_with_activities
+        values = data.model_dump()
+        with self._fk_not_found(parent_id=Activity):
+            act_id = await self._insert(values)
+        await self._attach_to_closure(act_id, data.parent_id)
+        # A new leaf, nothing to load
+        return Activity(id=act_id, **values)
+
+    async def create_many(self, data: Sequence[ActivityIn]) -> list[UUID]:
+        ids = await self._create_many(
+            [d.model_dump() for d in data], parent_id=Activity
+        )
+        await self._attach_many_to_closure(ids)
+        return ids
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._existing_ids(ids)
 
     async def update(self, act_id: UUID, data: ActivityUpdate) -> Activity:
-        entity = await self._update_by_id(act_id, data.model_dump())
-        entity_with_activities = await self.get_by_id(entity.id)
-        if not entity_with_activities:
-            logger.error(f"Activity {entity} not found right after update")
+        old_parent_id = await self._session.scalar(
+            select(ActivityOrm.parent_id).where(ActivityOrm.id == act_id)
+        )
+        if data.parent_id is not None and await self._is_in_subtree(
+            act_id, data.parent_id
+        ):
+            raise ValidationError(
+                f"Activity {data.parent_id} is a descendant of {act_id} "
+                "and cannot become its parent"
+            )
+        with self._fk_not_found(parent_id=Activity):
+            await self._update_values(act_id, data.model_dump())
+        if old_parent_id != data.parent_id:
+            await self._detach_subtree(act_id)
+            await self._attach_subtree(act_id, data.parent_id)
+        updated = await self.get_by_id(act_id)
+        if not updated:
+            logger.error(f"Activity {act_id} not found right after update")
             raise AppError(ErrorType.UNKNOWN, "Internal server error")
-        return entity_with_activities
+        return updated
 
     async def delete_by_id(self, act_id: UUID) -> Activity:
-        entity = await self._get_by_id(act_id)
-        if entity is None:
+        domain = await self.get_by_id(act_id)
+        if domain is None:
             raise NotFound.domain_entity(Activity, act_id)
-        domain = to_domain(entity, max_depth=settings.activities_depth)
+        # Children become roots, rows of the node itself cascade with it
+        await self._detach_subtree(act_id)
         await self._delete(act_id)
         return domain
 
-    def _tree_loader(self):
-        loader = selectinload(ActivityOrm.children)
-        for _ in range(settings.activities_depth):
-            loader = loader.selectinload(ActivityOrm.children)
-        return loader
+    def _depth(self, depth: int | None) -> int:
+        return settings.activities_depth if depth is None else depth
+
+    async def _attach_to_closure(self, act_id: UUID, parent_id: UUID | None) -> None:
+        """Adds the self-pair of a new leaf and links it to the parent's ancestors."""
+        new_id = literal(act_id, Uuid())
+        rows = select(new_id, new_id, literal(0))
+        if parent_id is not None:
+            rows = union_all(
+                rows,
+                select(
+                    ActivityClosureOrm.ancestor_id, new_id, ActivityClosureOrm.depth + 1
+                ).where(ActivityClosureOrm.descendant_id == parent_id),
+            )
+        stmt = insert(ActivityClosureOrm).from_select(
+            ["ancestor_id", "descendant_id", "depth"], rows
+        )
+        await self._session.execute(stmt)
+
+    async def _attach_many_to_closure(self, ids: Sequence[UUID]) -> None:
+        """`_attach_to_closure` for a batch of new leaves with existing parents."""
+        if not ids:
+            return
+        new_ids = ActivityOrm.id == any_(bindparam("ids", list(ids), ARRAY(Uuid())))
+        rows = union_all(
+            select(ActivityOrm.id, ActivityOrm.id, literal(0)).where(new_ids),
+            select(
+                ActivityClosureOrm.ancestor_id,
+                ActivityOrm.id,
+                ActivityClosureOrm.depth + 1,
+            )
+            .join(
+                ActivityClosureOrm,
+                ActivityClosureOrm.descendant_id == ActivityOrm.parent_id,
+            )
+            .where(new_ids),
+        )
+        stmt = insert(ActivityClosureOrm).from_select(
+            ["ancestor_id", "descendant_id", "depth"], rows
+        )
+        await self._session.execute(stmt)
+
+    async def _detach_subtree(self, act_id: UUID) -> None:
+        """Drops links between the subtree of act_id and its former ancestors."""
+        subtree = select(ActivityClosureOrm.descendant_id).where(
+            ActivityClosureOrm.ancestor_id == act_id
+        )
+        stmt = delete(ActivityClosureOrm).where(
+            ActivityClosureOrm.descendant_id.in_(subtree),
+            ActivityClosureOrm.ancestor_id.not_in(subtree),
+        )
+        await self._session.execute(stmt)
+
+    async def _attach_subtree(self, act_id: UUID, parent_id: UUID | None) -> None:
+        """Links every node of the subtree of act_id to the new parent's ancestors."""
+        if parent_id is None:
+            return
+        above = aliased(ActivityClosureOrm)
+        below = aliased(ActivityClosureOrm)
+        rows = select(
+            above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+        ).where(above.descendant_id == parent_id, below.ancestor_id == act_id)
+        stmt = insert(ActivityClosureOrm).from_select(
+            ["ancestor_id", "descendant_id", "depth"], rows
+        )
+        await self._session.execute(stmt)
+
+    async def _is_in_subtree(self, root_id: UUID, act_id: UUID) -> bool:
+        query = select(
+            exists().where(
+                ActivityClosureOrm.ancestor_id == root_id,
+                ActivityClosureOrm.descendant_id == act_id,
+            )
+        )
+        return bool(await self._session.scalar(query))
@@ -19,8 +19,9 @@ class ActivityOrm(Base):
     parent: Mapped[ActivityOrm | None] = relationship(
         back_populates="children", remote_side="ActivityOrm.id", passive_deletes=True
     )
+    # Trees are fetched flat with one recursive query, see trees.py
     children: Mapped[list[ActivityOrm]] = relationship(
-        back_populates="parent", lazy="selectin"
+        back_populates="parent", lazy="raise"
     )
 
     organizations: Mapped[list[OrganizationOrm]] = relationship(
@@ -0,0 +1,41 @@
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Integer, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from rest_api_test.domain.activities.model import Activity
+
+from .mapper import ActivityTreeRow, trees_from_rows
+from .table import ActivityOrm
+
+
+async def load_activity_trees(
+    session: AsyncSession, roots: ColumnElement[bool], depth: int
+) -> dict[UUID, Activity]:
+    """
+    Trees of the activities matching `roots`, `depth` levels of children each,
+    by root id. One recursive query whatever the depth, instead of a SELECT
+    per level of nested selectinloads.
+    """
+    tree = (
+        select(
+            ActivityOrm.id,
+            ActivityOrm.parent_id,
+            ActivityOrm.name,
+            literal(0, Integer()).label("depth"),
+        )
+        .where(roots)
+        .cte("activity_tree", recursive=True)
+    )
+    child = aliased(ActivityOrm)
+    tree = tree.union_all(
+        select(child.id, child.parent_id, child.name, tree.c.depth + 1)
+        .join(tree, child.parent_id == tree.c.id)
+        .where(tree.c.depth < depth)
+    )
+    query = select(tree.c.id, tree.c.parent_id, tree.c.name, tree.c.depth).order_by(
+        tree.c.id
+    )
+    res = await session.execute(query)
+    return trees_from_rows(ActivityTreeRow(*row) for row in res.tuples())
@@ -1,7 +1,11 @@
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
+from sqlalchemy import Double, cast, select
+
 from rest_api_test.application.buildings.dto import BuildingIn, BuildingUpdate
 from rest_api_test.application.buildings.repo import BuildingRepository
+from rest_api_test.application.buildings.spatial_index import BuildingPoint
 from rest_api_test.application.exceptions.app_error import NotFound
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.domain.buildings.model import Building
@@ -23,10 +27,25 @@ class AlchemyBuildingRepo(BuildingRepository, AlchemyRepo[BuildingOrm]):
             return to_domain(entity)
         return None
 
+    async def get_points(self) -> list[BuildingPoint]:
+        query = select(
+            BuildingOrm.id,
+            cast(BuildingOrm.latitude, Double()),
+            cast(BuildingOrm.longitude, Double()),
+        )
+        res = await self._session.execute(query)
+        return [BuildingPoint(*row) for row in res.tuples()]
+
     async def create(self, data: BuildingIn) -> Building:
         entity = await self._create(data.model_dump())
         return to_domain(entity)
 
+    async def create_many(self, data: Sequence[BuildingIn]) -> list[UUID]:
+        return await self._create_many([d.model_dump() for d in data])
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._existing_ids(ids)
+
     async def update(self, bld_id: UUID, data: BuildingUpdate) -> Building:
         entity = await self._update_by_id(bld_id, data.model_dump())
         return to_domain(entity)
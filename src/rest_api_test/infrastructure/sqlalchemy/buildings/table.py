@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from sqlalchemy import Numeric
+from sqlalchemy import Computed, Double, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
@@ -8,12 +8,24 @@ from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
 
 class BuildingOrm(Base):
     __tablename__ = "buildings"
+    __table_args__ = (
+        # Serves bbox filters and the bounding-box prefilter of radius search
+        Index("ix_buildings_latitude_longitude", "latitude", "longitude"),
+    )
 
     address: Mapped[str]
 
     latitude: Mapped[Decimal] = mapped_column(Numeric(9, 6), nullable=False)
     longitude: Mapped[Decimal] = mapped_column(Numeric(9, 6), nullable=False)
 
+    # Precomputed radians for haversine, maintained by Postgres
+    lat_rad: Mapped[float] = mapped_column(
+        Double, Computed("radians(latitude::double precision)", persisted=True)
+    )
+    lon_rad: Mapped[float] = mapped_column(
+        Double, Computed("radians(longitude::double precision)", persisted=True)
+    )
+
     organizations: Mapped[list["OrganizationOrm"]] = relationship(
         back_populates="building", cascade="all, delete-orphan", passive_deletes=True
     )
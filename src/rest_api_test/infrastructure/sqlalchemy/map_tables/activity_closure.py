@@ -0,0 +1,20 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
+
+
+class ActivityClosureOrm(Base):
+    """Every ancestor -> descendant pair of the activity tree, self-pairs included."""
+
+    __tablename__ = "activities_closure"
+
+    ancestor_id: Mapped[UUID] = mapped_column(
+        ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[UUID] = mapped_column(
+        ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    depth: Mapped[int]
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
@@ -8,10 +8,12 @@ from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
 
 class OrganizationActivityMapOrm(Base):
     __tablename__ = "organizations_activities_map"
+    # One link per pair, the primary key also spans the surrogate id
+    __table_args__ = (UniqueConstraint("organization_id", "activity_id"),)
 
     organization_id: Mapped[UUID] = mapped_column(
         ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
     )
     activity_id: Mapped[UUID] = mapped_column(
-        ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True
+        ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True, index=True
     )
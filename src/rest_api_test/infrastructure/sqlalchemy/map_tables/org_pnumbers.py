@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
@@ -8,6 +8,8 @@ from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
 
 class OrganizationPNumbersMapOrm(Base):
     __tablename__ = "organizations_pnumbers_map"
+    # One link per pair, the primary key also spans the surrogate id
+    __table_args__ = (UniqueConstraint("organization_id", "phone_number_id"),)
 
     organization_id: Mapped[UUID] = mapped_column(
         ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
@@ -1,18 +1,21 @@
+from collections.abc import Mapping
+from uuid import UUID
+
+from rest_api_test.domain.activities.model import Activity
 from rest_api_test.domain.organizations.model import Organization
 from rest_api_test.domain.phone_numbers.table import PhoneNumber
-from rest_api_test.infrastructure.sqlalchemy.activities.mapper import (
-    to_domain as activity_to_domain,
-)
 
 from .table import OrganizationOrm
 
 
-def to_domain(orm: OrganizationOrm) -> Organization:
+def to_domain(
+    orm: OrganizationOrm, activity_trees: Mapping[UUID, Activity]
+) -> Organization:
     return Organization(
         id=orm.id,
         name=orm.name,
         building_id=orm.building_id,
-        activities=[activity_to_domain(a) for a in orm.activities],
+        activities=[activity_trees[a.id] for a in orm.activities],
         phone_numbers=[
             PhoneNumber(id=p.id, phone_number=p.phone_number) for p in orm.phone_numbers
         ],
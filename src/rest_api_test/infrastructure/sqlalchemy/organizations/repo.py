@@ -1,10 +1,33 @@
-from math import pi
+from collections.abc import Iterable, Sequence
+from decimal import Decimal
+from math import pi, radians
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import Float, Integer, Select, and_, cast, func, literal, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Text,
+    Uuid,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.util import AliasedClass
 
-from rest_api_test.application.interfaces.common.pagination import Pagination
+from rest_api_test.application.interfaces.common.pagination import (
+    Pagination,
+    RawJsonPage,
+)
 from rest_api_test.application.organizations.dto import (
     GeoBBox,
     GeoFilter,
@@ -13,9 +36,19 @@ from rest_api_test.application.organizations.dto import (
     OrganizationUpdate,
 )
 from rest_api_test.application.organizations.repo import OrganizationRepository
+from rest_api_test.domain.activities.model import Activity
+from rest_api_test.domain.buildings.model import Building
 from rest_api_test.domain.organizations.model import Organization
+from rest_api_test.domain.phone_numbers.table import PhoneNumber
+from rest_api_test.infrastructure.sqlalchemy.activities.mapper import (
+    to_domain as activity_to_domain,
+)
 from rest_api_test.infrastructure.sqlalchemy.activities.table import ActivityOrm
+from rest_api_test.infrastructure.sqlalchemy.activities.trees import load_activity_trees
 from rest_api_test.infrastructure.sqlalchemy.buildings.table import BuildingOrm
+from rest_api_test.infrastructure.sqlalchemy.map_tables.activity_closure import (
+    ActivityClosureOrm,
+)
 from rest_api_test.infrastructure.sqlalchemy.map_tables.org_activity import (
     OrganizationActivityMapOrm,
 )
@@ -23,13 +56,19 @@ from rest_api_test.infrastructure.sqlalchemy.map_tables.org_pnumbers import (
     OrganizationPNumbersMapOrm,
 )
 from rest_api_test.infrastructure.sqlalchemy.organizations.mapper import to_domain
+from rest_api_test.infrastructure.sqlalchemy.phone_numbers.table import PhoneNumberOrm
 from rest_api_test.infrastructure.sqlalchemy.setup.base_repo import AlchemyRepo
 from rest_api_test.utils.config.settings import get_settings
+from rest_api_test.utils.geo import coord_ceil, coord_floor, radius_bounding_boxes
 
 from .table import OrganizationOrm
 
 settings = get_settings()
 
+_EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+_PHONE_LINK_COLUMNS = ("organization_id", "phone_number_id")
+_ACTIVITY_LINK_COLUMNS = ("organization_id", "activity_id")
+
 
 class AlchemyOrganizationRepo(OrganizationRepository, AlchemyRepo[OrganizationOrm]):
     model = OrganizationOrm
@@ -38,168 +77,439 @@ class AlchemyOrganizationRepo(OrganizationRepository, AlchemyRepo[OrganizationOr
         self,
         pagination: Pagination | None = None,
         name: str | None = None,
+        search: str | None = None,
         building_id: UUID | None = None,
         activity_id: UUID | None = None,
         geo: GeoFilter | None = None,
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+        activities_depth: int | None = None,
     ) -> list[Organization]:
-        query = (
-            select(OrganizationOrm)
-            .distinct(OrganizationOrm.id)
-            .options(self._activities_tree_loader())
+        query = self._apply_filters(
+            select(OrganizationOrm),
+            name=name,
+            search=search,
+            building_id=building_id,
+            activity_id=activity_id,
+            building_ids=building_ids,
+            activity_ids=activity_ids,
         )
 
-        if name:
-            pattern = f"%{name}%"
-            query = query.where(OrganizationOrm.name.ilike(pattern))
+        if geo:
+            query = self._apply_geo_filter(query, geo)
 
-        if building_id:
-            query = query.where(OrganizationOrm.building_id == building_id)
+        query = self._paginate(query, pagination)
 
-        if activity_id:
-            activity_ids_stmt = self._activity_ids_with_descendants(activity_id)
+        res = await self._session.execute(query)
+        rows = res.scalars().all()
 
-            query = query.join(
-                OrganizationActivityMapOrm,
-                OrganizationActivityMapOrm.organization_id == OrganizationOrm.id,
-            ).where(OrganizationActivityMapOrm.activity_id.in_(activity_ids_stmt))
+        return await self._to_domain(rows, activities_depth)
+
+    async def get_all_json(
+        self,
+        pagination: Pagination | None = None,
+        name: str | None = None,
+        search: str | None = None,
+        building_id: UUID | None = None,
+        activity_id: UUID | None = None,
+        geo: GeoFilter | None = None,
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+    ) -> RawJsonPage:
+        query = self._apply_filters(
+            select(OrganizationOrm.id, self._organization_json()),
+            name=name,
+            search=search,
+            building_id=building_id,
+            activity_id=activity_id,
+            building_ids=building_ids,
+            activity_ids=activity_ids,
+        )
 
         if geo:
             query = self._apply_geo_filter(query, geo)
 
-        if pagination:
-            query = query.limit(pagination.limit).offset(pagination.offset)
+        query = self._paginate(query, pagination)
 
         res = await self._session.execute(query)
-        rows = res.scalars().all()
-
-        return [to_domain(o) for o in rows]
+        rows = res.tuples().all()
+
+        # One document per row keeps the page order of ORDER BY, only the
+        # enclosing array is assembled here
+        return RawJsonPage(
+            items=f"[{','.join(doc for _, doc in rows)}]".encode(),
+            count=len(rows),
+            last_id=rows[-1][0] if rows else None,
+        )
 
-    async def get_by_id(self, org_id: UUID) -> Organization | None:
-        query = (
-            select(OrganizationOrm)
-            .distinct(OrganizationOrm.id)
-            .where(OrganizationOrm.id == org_id)
-            .options(self._activities_tree_loader())
+    async def get_nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        name: str | None = None,
+        activity_id: UUID | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+        activities_depth: int | None = None,
+    ) -> list[tuple[Organization, float]]:
+        distance_m = self._distance_m(lat, lon)
+        base = self._apply_filters(
+            select(OrganizationOrm.id, distance_m).join(
+                BuildingOrm, BuildingOrm.id == OrganizationOrm.building_id
+            ),
+            name=name,
+            activity_id=activity_id,
+            activity_ids=activity_ids,
+        ).order_by(distance_m, OrganizationOrm.id)
+
+        # Expanding index-backed search: once k organizations are found within
+        # the radius nobody outside of it can be closer
+        radius_m = float(settings.orgs_nearest_start_radius_m)
+        half_circumference_m = pi * settings.earth_radius_m
+        while True:
+            query = base.limit(k)
+            bounded = radius_m < half_circumference_m
+            if bounded:
+                query = query.where(self._within_radius(lat, lon, radius_m))
+            res = await self._session.execute(query)
+            found = res.tuples().all()
+            if len(found) == k or not bounded:
+                break
+            radius_m *= 4
+
+        if not found:
+            return []
+        orgs_query = select(OrganizationOrm).where(
+            OrganizationOrm.id.in_([org_id for org_id, _ in found])
         )
+        res = await self._session.execute(orgs_query)
+        orgs = {
+            org.id: org
+            for org in await self._to_domain(res.scalars().all(), activities_depth)
+        }
+        return [(orgs[org_id], distance) for org_id, distance in found]
+
+    async def get_by_id(
+        self, org_id: UUID, activities_depth: int | None = None
+    ) -> Organization | None:
+        query = select(OrganizationOrm).where(OrganizationOrm.id == org_id)
         res = await self._session.scalar(query)
         if res:
-            return to_domain(res)
+            (org,) = await self._to_domain([res], activities_depth)
+            return org
+        return None
+
+    async def get_by_id_json(self, org_id: UUID) -> bytes | None:
+        query = select(self._organization_json()).where(OrganizationOrm.id == org_id)
+        doc = await self._session.scalar(query)
+        if doc is not None:
+            return doc.encode()
         return None
 
     async def create(self, payload: OrganizationIn) -> Organization:
-        org = await self._create(payload.model_dump())
-        return to_domain(org)
+        values = payload.model_dump()
+        with self._fk_not_found(building_id=Building):
+            org_id = await self._insert(values)
+        # Links are added separately, a new organization has none
+        return Organization(id=org_id, phone_numbers=[], activities=[], **values)
+
+    async def create_many(self, payloads: Sequence[OrganizationIn]) -> list[UUID]:
+        return await self._create_many(
+            [p.model_dump() for p in payloads], building_id=Building
+        )
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._existing_ids(ids)
 
     async def assign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> None:
-        payload = [
-            {"organization_id": org_id, "phone_number_id": phone_id} for phone_id in ids
-        ]
-        await self._add_relation(OrganizationPNumbersMapOrm, payload)
+        await self.add_phone_number_links([(org_id, phone_id) for phone_id in ids])
 
-    async def unassign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> None:
-        if not ids:
-            return
-        await self._drop_relation(
-            OrganizationPNumbersMapOrm,
-            OrganizationPNumbersMapOrm.organization_id == org_id,
-            OrganizationPNumbersMapOrm.phone_number_id.in_(ids),
+    async def unassign_phone_numbers(self, org_id: UUID, ids: list[UUID]) -> int:
+        return await self.remove_phone_number_links(
+            [(org_id, phone_id) for phone_id in ids]
         )
 
     async def assign_activities(self, org_id: UUID, ids: list[UUID]) -> None:
-        payload = [
-            {"organization_id": org_id, "activity_id": activity_id}
-            for activity_id in ids
-        ]
-        await self._add_relation(OrganizationActivityMapOrm, payload)
+        await self.add_activity_links([(org_id, activity_id) for activity_id in ids])
+
+    async def unassign_activities(self, org_id: UUID, ids: list[UUID]) -> int:
+        return await self.remove_activity_links(
+            [(org_id, activity_id) for activity_id in ids]
+        )
+
+    async def add_phone_number_links(self, links: Sequence[tuple[UUID, UUID]]) -> None:
+        with self._fk_not_found(
+            organization_id=Organization, phone_number_id=PhoneNumber
+        ):
+            await self._link_many(
+                OrganizationPNumbersMapOrm, _PHONE_LINK_COLUMNS, links
+            )
+
+    async def remove_phone_number_links(
+        self, links: Sequence[tuple[UUID, UUID]]
+    ) -> int:
+        return await self._unlink_many(
+            OrganizationPNumbersMapOrm, _PHONE_LINK_COLUMNS, links
+        )
 
-    async def unassign_activities(self, org_id: UUID, ids: list[UUID]) -> None:
-        if not ids:
-            return
-        await self._drop_relation(
-            OrganizationActivityMapOrm,
-            OrganizationActivityMapOrm.organization_id == org_id,
-            OrganizationActivityMapOrm.activity_id.in_(ids),
+    async def add_activity_links(self, links: Sequence[tuple[UUID, UUID]]) -> None:
+        with self._fk_not_found(organization_id=Organization, activity_id=Activity):
+            await self._link_many(
+                OrganizationActivityMapOrm, _ACTIVITY_LINK_COLUMNS, links
+            )
+
+    async def remove_activity_links(self, links: Sequence[tuple[UUID, UUID]]) -> int:
+        return await self._unlink_many(
+            OrganizationActivityMapOrm, _ACTIVITY_LINK_COLUMNS, links
         )
 
     async def update_by_id(
         self, org_id: UUID, payload: OrganizationUpdate
     ) -> Organization:
-        res = await self._update_by_id(org_id, payload.model_dump())
-        return to_domain(res)
+        with self._fk_not_found(building_id=Building):
+            res = await self._update_by_id(org_id, payload.model_dump())
+        (org,) = await self._to_domain([res])
+        return org
 
     async def delete_by_id(self, org_id: UUID) -> None:
         await self._delete(org_id)
 
-    def _activities_tree_loader(self):
+    def _apply_filters[Q: Select[Any]](
+        self,
+        query: Q,
+        *,
+        name: str | None = None,
+        search: str | None = None,
+        building_id: UUID | None = None,
+        activity_id: UUID | None = None,
+        building_ids: Sequence[UUID] | None = None,
+        activity_ids: Sequence[UUID] | None = None,
+    ) -> Q:
+        if name:
+            pattern = f"%{name}%"
+            query = query.where(OrganizationOrm.name.ilike(pattern))
+
+        if search:
+            # Trigram match with typo tolerance, best matches first.
+            # Threshold is pg_trgm.word_similarity_threshold set on connect
+            query = query.where(OrganizationOrm.name.op("%>")(search)).order_by(
+                func.word_similarity(search, OrganizationOrm.name).desc()
+            )
+
+        if building_id:
+            query = query.where(OrganizationOrm.building_id == building_id)
+
+        if building_ids is not None:
+            # Single array parameter instead of one bind per id
+            query = query.where(
+                OrganizationOrm.building_id
+                == any_(bindparam("building_ids", list(building_ids), ARRAY(Uuid())))
+            )
+
+        if activity_id:
+            query = self._with_activities(
+                query,
+                OrganizationActivityMapOrm.activity_id.in_(
+                    self._activity_ids_with_descendants(activity_id)
+                ),
+            )
+
+        if activity_ids is not None:
+            # Subtree already expanded by the caller (activity forest)
+            query = self._with_activities(
+                query,
+                OrganizationActivityMapOrm.activity_id
+                == any_(bindparam("activity_ids", list(activity_ids), ARRAY(Uuid()))),
+            )
+
+        return query
+
+    def _with_activities[Q: Select[Any]](
+        self, query: Q, activity_filter: ColumnElement[bool]
+    ) -> Q:
+        org_ids_stmt = select(OrganizationActivityMapOrm.organization_id).where(
+            activity_filter
+        )
+        # Semi-join keeps one row per organization, no DISTINCT needed
+        return query.where(OrganizationOrm.id.in_(org_ids_stmt))
+
+    async def _to_domain(
+        self, orgs: Sequence[OrganizationOrm], activities_depth: int | None = None
+    ) -> list[Organization]:
         """
-        Builds a nested selectinload chain for
-        OrganizationOrm.activities -> ActivityOrm.children
-        to the depth settings.activities_depth.
+        Maps organizations with their linked activities (loaded with the
+        organizations) expanded to trees of depth settings.activities_depth
+        (or `activities_depth`, 0 - linked activities only) by one query.
         """
-        loader = selectinload(OrganizationOrm.activities)
-        for _ in range(settings.activities_depth):
-            loader = loader.selectinload(ActivityOrm.children)
-        return loader
+        if activities_depth is None:
+            activities_depth = settings.activities_depth
+        linked = {a.id: a for org in orgs for a in org.activities}
+        if activities_depth and linked:
+            trees = await load_activity_trees(
+                self._session,
+                ActivityOrm.id
+                == any_(bindparam("activity_ids", list(linked), ARRAY(Uuid()))),
+                activities_depth,
+            )
+        else:
+            trees = {act_id: activity_to_domain(a) for act_id, a in linked.items()}
+        return [to_domain(org, trees) for org in orgs]
 
-    def _activity_ids_with_descendants(self, root_id: UUID) -> Select[tuple[UUID]]:
-        base = (
+    def _organization_json(self) -> ColumnElement[str]:
+        """
+        Whole organization document built by Postgres in the same statement:
+        phone numbers and activity subtrees to the depth settings.activities_depth.
+        Keys follow OrganizationOut, the value is fetched as text so the driver
+        doesn't parse it.
+        """
+        phone_numbers = (
             select(
-                ActivityOrm.id.label("id"), literal(0, type_=Integer()).label("depth")
+                func.coalesce(
+                    func.json_agg(
+                        func.json_build_object(
+                            "phone_number",
+                            PhoneNumberOrm.phone_number,
+                            "id",
+                            PhoneNumberOrm.id,
+                        )
+                    ),
+                    _EMPTY_JSON_ARRAY,
+                )
+            )
+            .select_from(PhoneNumberOrm)
+            .join(
+                OrganizationPNumbersMapOrm,
+                OrganizationPNumbersMapOrm.phone_number_id == PhoneNumberOrm.id,
+            )
+            .where(OrganizationPNumbersMapOrm.organization_id == OrganizationOrm.id)
+            .scalar_subquery()
+        )
+
+        activity = aliased(ActivityOrm)
+        activities = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        self._activity_json(activity, settings.activities_depth)
+                    ),
+                    _EMPTY_JSON_ARRAY,
+                )
+            )
+            .select_from(activity)
+            .join(
+                OrganizationActivityMapOrm,
+                OrganizationActivityMapOrm.activity_id == activity.id,
             )
-            .where(ActivityOrm.id == root_id)
-            .cte(name="activity_tree", recursive=True)
+            .where(OrganizationActivityMapOrm.organization_id == OrganizationOrm.id)
+            .scalar_subquery()
         )
 
-        children = (
-            select(ActivityOrm.id.label("id"), (base.c.depth + 1).label("depth"))
-            .join(ActivityOrm, ActivityOrm.parent_id == base.c.id)
-            .where(base.c.depth + 1 <= settings.activities_depth)
+        return cast(
+            func.json_build_object(
+                "id",
+                OrganizationOrm.id,
+                "name",
+                OrganizationOrm.name,
+                "phone_numbers",
+                phone_numbers,
+                "activities",
+                activities,
+                "building_id",
+                OrganizationOrm.building_id,
+            ),
+            Text,
         )
 
-        tree = base.union_all(children)
+    def _activity_json(
+        self, activity: AliasedClass[ActivityOrm], depth: int
+    ) -> ColumnElement[Any]:
+        # Same shape as the activities mapper: no children -> null
+        children: ColumnElement[Any] = null()
+        if depth > 0:
+            child = aliased(ActivityOrm)
+            children = (
+                select(func.json_agg(self._activity_json(child, depth - 1)))
+                .where(child.parent_id == activity.id)
+                .scalar_subquery()
+            )
+        return func.json_build_object(
+            "name",
+            activity.name,
+            "parent_id",
+            activity.parent_id,
+            "id",
+            activity.id,
+            "children",
+            children,
+        )
 
-        return select(tree.c.id)
+    def _activity_ids_with_descendants(self, root_id: UUID) -> Select[tuple[UUID]]:
+        """The whole subtree, however deep: the closure table holds every pair."""
+        return select(ActivityClosureOrm.descendant_id).where(
+            ActivityClosureOrm.ancestor_id == root_id
+        )
 
-    def _apply_geo_filter(
-        self, query: Select[tuple[OrganizationOrm]], geo: GeoFilter
-    ) -> Select[tuple[OrganizationOrm]]:
+    def _apply_geo_filter[Q: Select[Any]](self, query: Q, geo: GeoFilter) -> Q:
         query = query.join(BuildingOrm, BuildingOrm.id == OrganizationOrm.building_id)
 
         if isinstance(geo, GeoRadius):
-            lat = cast(BuildingOrm.latitude, Float())
-            lon = cast(BuildingOrm.longitude, Float())
-
-            lat0 = float(geo.lat)
-            lon0 = float(geo.lon)
-            radius_m = float(geo.radius_m)
-
-            # перевод в радианы
-            lat_rad = lat * (pi / 180.0)
-            lon_rad = lon * (pi / 180.0)
-            lat0_rad = literal(lat0 * (pi / 180.0))
-            lon0_rad = literal(lon0 * (pi / 180.0))
-
-            dlat = lat_rad - lat0_rad
-            dlon = lon_rad - lon0_rad
-
-            a = func.pow(func.sin(dlat / 2.0), 2) + func.cos(lat0_rad) * func.cos(
-                lat_rad
-            ) * func.pow(func.sin(dlon / 2.0), 2)
-            c = 2.0 * func.atan2(func.sqrt(a), func.sqrt(1.0 - a))
-            distance_m = settings.earth_radius_m * c
-
-            query = query.where(distance_m <= radius_m)
+            query = query.where(self._within_radius(geo.lat, geo.lon, geo.radius_m))
 
         elif isinstance(geo, GeoBBox):
             query = query.where(
-                and_(
-                    BuildingOrm.latitude >= geo.lat_min,
-                    BuildingOrm.latitude <= geo.lat_max,
-                    BuildingOrm.longitude >= geo.lon_min,
-                    BuildingOrm.longitude <= geo.lon_max,
+                self._coords_within(
+                    Decimal(str(geo.lat_min)),
+                    Decimal(str(geo.lat_max)),
+                    Decimal(str(geo.lon_min)),
+                    Decimal(str(geo.lon_max)),
                 )
             )
         else:
             pass
 
         return query
+
+    def _within_radius(
+        self, lat: float, lon: float, radius_m: float
+    ) -> ColumnElement[bool]:
+        # Index-backed prefilter, haversine only runs on the candidates
+        boxes = radius_bounding_boxes(lat, lon, radius_m, settings.earth_radius_m)
+        prefilter = or_(
+            *(
+                self._coords_within(
+                    coord_floor(box.lat_min),
+                    coord_ceil(box.lat_max),
+                    coord_floor(box.lon_min),
+                    coord_ceil(box.lon_max),
+                )
+                for box in boxes
+            )
+        )
+        return and_(prefilter, self._distance_m(lat, lon) <= float(radius_m))
+
+    def _coords_within(
+        self, lat_min: Decimal, lat_max: Decimal, lon_min: Decimal, lon_max: Decimal
+    ) -> ColumnElement[bool]:
+        # Bounds are bound as numeric so ix_buildings_latitude_longitude is usable
+        return and_(
+            BuildingOrm.latitude >= lat_min,
+            BuildingOrm.latitude <= lat_max,
+            BuildingOrm.longitude >= lon_min,
+            BuildingOrm.longitude <= lon_max,
+        )
+
+    def _distance_m(self, lat0: float, lon0: float) -> ColumnElement[float]:
+        """Haversine distance from the point to the building, in meters."""
+        lat_rad = BuildingOrm.lat_rad
+        lon_rad = BuildingOrm.lon_rad
+        lat0_rad = literal(radians(lat0))
+        lon0_rad = literal(radians(lon0))
+
+        dlat = lat_rad - lat0_rad
+        dlon = lon_rad - lon0_rad
+
+        a = func.pow(func.sin(dlat / 2.0), 2) + func.cos(lat0_rad) * func.cos(
+            lat_rad
+        ) * func.pow(func.sin(dlon / 2.0), 2)
+        c = 2.0 * func.atan2(func.sqrt(a), func.sqrt(1.0 - a))
+        return settings.earth_radius_m * c
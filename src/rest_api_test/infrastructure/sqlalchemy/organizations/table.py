@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from rest_api_test.infrastructure.sqlalchemy.activities.table import ActivityOrm
@@ -11,6 +11,15 @@ from rest_api_test.infrastructure.sqlalchemy.setup.base_model import Base
 
 class OrganizationOrm(Base):
     __tablename__ = "organizations"
+    __table_args__ = (
+        # Serves both fuzzy search and `ILIKE '%name%'` substring filter
+        Index(
+            "ix_organizations_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     name: Mapped[str]
 
@@ -18,8 +27,9 @@ class OrganizationOrm(Base):
         ForeignKey("buildings.id", ondelete="CASCADE"), nullable=False
     )
 
+    # Repos only need building_id, don't load the building with every organization
     building: Mapped[BuildingOrm] = relationship(
-        back_populates="organizations", lazy="selectin"
+        back_populates="organizations", lazy="raise"
     )
 
     activities: Mapped[list[ActivityOrm]] = relationship(
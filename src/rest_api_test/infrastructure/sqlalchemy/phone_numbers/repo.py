@@ -1,3 +1,4 @@
+from collections.abc import Iterable, Sequence
 from uuid import UUID
 
 from rest_api_test.application.exceptions.app_error import NotFound
@@ -27,6 +28,12 @@ class AlchemyPhoneNumberRepo(PhoneNumberRepository, AlchemyRepo[PhoneNumberOrm])
         entity = await self._create(data.model_dump())
         return to_domain(entity)
 
+    async def create_many(self, data: Sequence[PhoneNumberIn]) -> list[UUID]:
+        return await self._create_many([d.model_dump() for d in data])
+
+    async def existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        return await self._existing_ids(ids)
+
     async def update(self, pn_id: UUID, data: PhoneNumberUpdate) -> PhoneNumber:
         entity = await self._update_by_id(pn_id, data.model_dump())
         return to_domain(entity)
@@ -1,11 +1,27 @@
-from collections.abc import Mapping, Sequence
+import re
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
 from typing import Any, overload
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy import (
+    Select,
+    Uuid,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from rest_api_test.application.exceptions.app_error import NotFound
+from rest_api_test.application.exceptions.app_error import NotFound, ValidationError
 from rest_api_test.application.interfaces.common.pagination import Pagination
 from rest_api_test.utils.logging.logger import get_logger
 
@@ -13,6 +29,12 @@ from .base_model import Base
 
 logger = get_logger(__name__)
 
+_FOREIGN_KEY_VIOLATION = "23503"
+_UNIQUE_VIOLATION = "23505"
+# `Key (building_id)=(...) is not present in table "buildings".`,
+# `Key (number)=(...) already exists.`
+_KEY_DETAIL = re.compile(r"Key \((?P<column>\w+)\)=\((?P<value>[^)]*)\)")
+
 
 class AlchemyRepo[T: Base]:
     model: type[T]
@@ -21,17 +43,40 @@ class AlchemyRepo[T: Base]:
         self._session = session
 
     async def _get_all(self, pagination: Pagination | None = None) -> Sequence[T]:
-        query = select(self.model)
-        if pagination:
-            query = query.limit(pagination.limit).offset(pagination.offset)
+        query = self._paginate(select(self.model), pagination)
         res = await self._session.execute(query)
         return res.scalars().all()
 
+    def _paginate[Q: Select[Any]](self, query: Q, pagination: Pagination | None) -> Q:
+        """
+        Orders by primary key so pages are stable and index-backed.
+        In keyset mode seeks past `after_id` instead of skipping rows with OFFSET.
+        """
+        if not pagination:
+            return query
+        query = query.order_by(self.model.id).limit(pagination.limit)
+        if not pagination.keyset:
+            return query.offset(pagination.offset)
+        if pagination.after_id is not None:
+            query = query.where(self.model.id > pagination.after_id)
+        return query
+
     async def _get_by_id(self, id: UUID) -> T | None:
         query = select(self.model).where(self.model.id == id)
         res = await self._session.execute(query)
         return res.scalar_one_or_none()
 
+    async def _existing_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        """Which of the ids are present, in one query regardless of their number."""
+        ids = list(ids)
+        if not ids:
+            return set()
+        query = select(self.model.id).where(
+            self.model.id == any_(bindparam("ids", ids, ARRAY(Uuid())))
+        )
+        res = await self._session.execute(query)
+        return set(res.scalars().all())
+
     async def _count(self) -> int:
         query = select(func.count(self.model.id))
         res = await self._session.execute(query)
@@ -59,6 +104,28 @@ class AlchemyRepo[T: Base]:
         )
         return created_entities
 
+    async def _insert(self, values: Mapping[str, Any]) -> UUID:
+        """Single-row insert returning only the id, no entity loading."""
+        stmt = insert(self.model).values(values).returning(self.model.id)
+        new_id: UUID = (await self._session.execute(stmt)).scalar_one()
+        logger.debug("Created %s with id=%s", self.model.__name__, new_id)
+        return new_id
+
+    async def _create_many(
+        self, values: Sequence[Mapping[str, Any]], **references: type
+    ) -> list[UUID]:
+        """
+        Batched insert without RETURNING: ids are generated here, so they come
+        back in the order of `values`.
+        Constraint violations are reported as AppError, see `_violations`.
+        """
+        rows = [{**row, "id": uuid4()} for row in values]
+        if rows:
+            with self._violations(**references):
+                await self._session.execute(insert(self.model), rows)
+        logger.debug("Created %s entities of %s", len(rows), self.model.__name__)
+        return [row["id"] for row in rows]
+
     @overload
     async def _add_relation[V: type[Base]](
         self, link_model: V, values: Mapping[str, Any]
@@ -85,6 +152,58 @@ class AlchemyRepo[T: Base]:
         )
         return created_entities
 
+    async def _link_many(
+        self,
+        link_model: type[Base],
+        columns: tuple[str, str],
+        pairs: Sequence[tuple[UUID, UUID]],
+    ) -> int:
+        """
+        Inserts (left, right) links as two array parameters, whatever their number.
+        Links already present are skipped, `columns` must be covered by a unique
+        constraint.
+        """
+        if not pairs:
+            return 0
+        stmt = (
+            pg_insert(link_model)
+            .from_select(list(columns), self._unnest_pairs(pairs))
+            .on_conflict_do_nothing(index_elements=list(columns))
+        )
+        res = await self._session.execute(stmt)
+        created: int = getattr(res, "rowcount", 0)
+        logger.debug("Created %s relations in %s", created, link_model.__name__)
+        return created
+
+    async def _unlink_many(
+        self,
+        link_model: type[Base],
+        columns: tuple[str, str],
+        pairs: Sequence[tuple[UUID, UUID]],
+    ) -> int:
+        if not pairs:
+            return 0
+        left, right = (getattr(link_model, c) for c in columns)
+        stmt = delete(link_model).where(
+            tuple_(left, right).in_(self._unnest_pairs(pairs))
+        )
+        res = await self._session.execute(stmt)
+        deleted: int = getattr(res, "rowcount", 0)
+        logger.debug("Deleted %s relations from %s", deleted, link_model.__name__)
+        return deleted
+
+    def _unnest_pairs(self, pairs: Sequence[tuple[UUID, UUID]]) -> Select[Any]:
+        lefts, rights = zip(*pairs, strict=True)
+        links = (
+            func.unnest(
+                bindparam("lefts", list(lefts), ARRAY(Uuid())),
+                bindparam("rights", list(rights), ARRAY(Uuid())),
+            )
+            .table_valued("left_id", "right_id")
+            .render_derived(name="links")
+        )
+        return select(links.c.left_id, links.c.right_id)
+
     async def _drop_relation(self, link_model: type[Base], *conditions: Any) -> int:
         stmt = delete(link_model)
         if conditions:
@@ -108,10 +227,79 @@ class AlchemyRepo[T: Base]:
         logger.debug(f"Updated {updated}")
         return updated
 
+    async def _update_values(self, id: UUID, values: Mapping[str, Any]) -> None:
+        """`_update_by_id` for callers that reload the entity themselves."""
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id)
+            .values(values)
+            .returning(self.model.id)
+        )
+        if await self._session.scalar(stmt) is None:
+            raise NotFound(f"{self.model.__name__[:-3]} with id={id} not found")
+        logger.debug("Updated %s with id=%s", self.model.__name__, id)
+
     async def _delete(self, id: UUID) -> None:
-        entity = await self._session.get(self.model, id)
-        entity_repr = repr(entity)
-        if not entity:
+        """
+        One DELETE statement, dependent rows are removed by the ON DELETE rules
+        of the foreign keys instead of being loaded by the ORM first.
+        """
+        stmt = delete(self.model).where(self.model.id == id).returning(self.model.id)
+        if await self._session.scalar(stmt) is None:
             raise NotFound(f"{self.model.__name__[:-3]} with id={id} not found")
-        await self._session.delete(entity)
-        logger.debug(f"Deleted {entity_repr}")
+        logger.debug("Deleted %s with id=%s", self.model.__name__, id)
+
+    @contextmanager
+    def _fk_not_found(self, **references: type) -> Iterator[None]:
+        """
+        Reports a foreign key violation on one of `references` (column -> domain
+        entity) as NotFound of the missing entity, so writes can rely on the
+        constraint instead of selecting referenced rows beforehand.
+        The transaction is aborted by the violation, the caller's unit of work
+        rolls it back.
+        """
+        try:
+            yield
+        except IntegrityError as e:
+            missing = _missing_reference(e)
+            if missing is None or missing[0] not in references:
+                raise
+            column, value = missing
+            raise NotFound.domain_entity(references[column], value) from e
+
+    @contextmanager
+    def _violations(self, **references: type) -> Iterator[None]:
+        """
+        `_fk_not_found`, plus any other constraint violation reported as
+        ValidationError, for writes whose caller reports errors per item
+        instead of failing the request. The message names the violated key,
+        never the driver's error with the statement.
+        """
+        try:
+            with self._fk_not_found(**references):
+                yield
+        except IntegrityError as e:
+            raise ValidationError(self._violation_message(e)) from e
+
+    def _violation_message(self, e: IntegrityError) -> str:
+        entity = self.model.__name__[:-3]
+        sqlstate = getattr(e.orig, "sqlstate", None)
+        detail = getattr(e.orig.__cause__, "detail", None) or ""
+        match = _KEY_DETAIL.search(detail)
+        if sqlstate == _UNIQUE_VIOLATION and match is not None:
+            return f"{entity} with {match['column']} '{match['value']}' already exists"
+        if sqlstate == _FOREIGN_KEY_VIOLATION and match is not None:
+            return f"{entity} references a missing {match['column']} '{match['value']}'"
+        return f"{entity} violates a database constraint"
+
+
+def _missing_reference(e: IntegrityError) -> tuple[str, str] | None:
+    """(column, value) of the reference that failed a foreign key check."""
+    if getattr(e.orig, "sqlstate", None) != _FOREIGN_KEY_VIOLATION:
+        return None
+    # asyncpg's error, wrapped by the DBAPI adapter
+    detail = getattr(e.orig.__cause__, "detail", None) or ""
+    match = _KEY_DETAIL.search(detail)
+    if match is None:
+        return None
+    return match["column"], match["value"]
@@ -4,5 +4,13 @@ from rest_api_test.utils.config.settings import get_settings
 
 settings = get_settings()
 
-async_engine = create_async_engine(settings.db_dsn)
+async_engine = create_async_engine(
+    settings.db_dsn,
+    connect_args={
+        "server_settings": {
+            # Threshold of the `%>` operator used by organizations search
+            "pg_trgm.word_similarity_threshold": str(settings.orgs_search_min_score)
+        }
+    },
+)
 async_session_factory = async_sessionmaker(async_engine)
@@ -8,6 +8,10 @@ class _Settings(BaseSettings):
     api_port: int = 8001
     api_token_header_name: str = "x-api-key"
     api_token: str
+    # More keys as hex SHA-256 digests, one per line with an optional key id;
+    # re-read every api_keys_reload_s seconds, 0 - only at start
+    api_keys_file: str | None = None
+    api_keys_reload_s: int = 30
 
     logging_level: str
     logging_lib_level: str = "WARNING"
@@ -21,10 +25,75 @@ class _Settings(BaseSettings):
     db_name: str
 
     redis_dsn: str
+    # TTL of cached GET responses, writes evict what they change before that
+    cache_ttl_s: int = 300
+    # Misses of a key recomputed by one worker at a time: lock TTL and how long
+    # the other workers wait for its entry before recomputing it themselves
+    cache_lock_ttl_s: float = 5.0
+    cache_lock_wait_s: float = 2.0
+    # List routes serve entries this long past their TTL, refreshing them
+    # in the background (stale-while-revalidate)
+    cache_stale_s: int = 60
+    # X-Cache: HIT/STALE/MISS header on responses of cached routes
+    cache_status_header: bool = False
+    # Compression of values stored in Redis by both caches: none, zlib, or
+    # zstd/lz4 with the `cache-compression` extra; smaller values stay raw
+    cache_compression: str = "zlib"
+    cache_compression_min_bytes: int = 1024
+    # Codec default if unset
+    cache_compression_level: int | None = None
+    # In-process L1 in front of Redis for the key-value cache, kept coherent
+    # across workers over Redis pub/sub; entries live at most cache_l1_ttl_s
+    cache_l1_enabled: bool = False
+    cache_l1_max_entries: int = 10_000
+    cache_l1_max_bytes: int = 64 * 1024 * 1024
+    cache_l1_ttl_s: int = 30
+    # Read-through cache of get_by_id of all repositories in the key-value cache
+    entity_cache_enabled: bool = False
+    entity_cache_ttl_s: int = 600
+
+    # gzip/br compression of responses (br requires the `brotli` extra); cached
+    # responses are stored compressed per negotiated encoding
+    http_compression_enabled: bool = True
+    http_compression_min_bytes: int = 1024
+    http_compression_gzip_level: int = 6
+    http_compression_brotli_quality: int = 4
+
+    # Token buckets per API key and route: rate_limit_per_s tokens a second up
+    # to rate_limit_burst, or "rate/burst" per route name in rate_limit_routes,
+    # e.g. {"fill_database": "0.1/1"}. Cluster-wide in Redis, taking
+    # rate_limit_lease_size tokens at a time, or per worker if not cluster
+    rate_limit_enabled: bool = False
+    rate_limit_per_s: float = 20.0
+    rate_limit_burst: int = 40
+    rate_limit_routes: dict[str, str] = {}
+    rate_limit_cluster: bool = True
+    rate_limit_lease_size: int = 5
 
     # Activities depth - how much nested activities will be showed
     activities_depth: int = 2
     earth_radius_m: int = 6_371_000
+    # Minimal pg_trgm word similarity for organizations fuzzy search
+    orgs_search_min_score: float = 0.3
+    # First radius of the expanding nearest organizations search
+    orgs_nearest_start_radius_m: int = 1_000
+    # Serve organizations list/detail as JSON built by Postgres in one query
+    orgs_json_read_path: bool = False
+
+    # Bulk create endpoints: items per transaction and per request
+    bulk_chunk_size: int = 1_000
+    bulk_max_items: int = 50_000
+
+    # In-process buildings geo index, requires the `geo-index` extra
+    geo_index_enabled: bool = False
+    # Periodic full reload in case a pub/sub message of another worker was
+    # lost, 0 - disabled
+    geo_index_refresh_s: int = 0
+    # In-process snapshot of the activity trees serving activity reads
+    activity_forest_enabled: bool = False
+    # Periodic full reload in case a pub/sub message of another worker was
+    # lost, 0 - disabled
+    activity_forest_refresh_s: int = 0
 
     @property
     def db_dsn(self) -> str:
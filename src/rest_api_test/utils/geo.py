@@ -0,0 +1,52 @@
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+from math import asin, cos, degrees, radians, sin
+from typing import NamedTuple
+
+# Scale of buildings.latitude / buildings.longitude columns - Numeric(9, 6)
+_COORD_QUANT = Decimal("0.000001")
+
+
+class BoundingBox(NamedTuple):
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+
+
+def radius_bounding_boxes(
+    lat: float, lon: float, radius_m: float, earth_radius_m: float
+) -> list[BoundingBox]:
+    """
+    Returns boxes that fully contain the circle of `radius_m` around the point.
+    Two boxes are returned when the circle crosses the antimeridian.
+    """
+    ang = radius_m / earth_radius_m
+    dlat = degrees(ang)
+    lat_min, lat_max = lat - dlat, lat + dlat
+
+    # Circle covers a pole - every longitude is reachable
+    if lat_min <= -90 or lat_max >= 90:
+        return [BoundingBox(max(lat_min, -90.0), min(lat_max, 90.0), -180.0, 180.0)]
+
+    dlon = degrees(asin(min(1.0, sin(ang) / cos(radians(lat)))))
+    lon_min, lon_max = lon - dlon, lon + dlon
+
+    if lon_min < -180:
+        return [
+            BoundingBox(lat_min, lat_max, lon_min + 360, 180.0),
+            BoundingBox(lat_min, lat_max, -180.0, lon_max),
+        ]
+    if lon_max > 180:
+        return [
+            BoundingBox(lat_min, lat_max, lon_min, 180.0),
+            BoundingBox(lat_min, lat_max, -180.0, lon_max - 360),
+        ]
+    return [BoundingBox(lat_min, lat_max, lon_min, lon_max)]
+
+
+def coord_floor(value: float) -> Decimal:
+    return Decimal(value).quantize(_COORD_QUANT, rounding=ROUND_FLOOR)
+
+
+def coord_ceil(value: float) -> Decimal:
+    return Decimal(value).quantize(_COORD_QUANT, rounding=ROUND_CEILING)